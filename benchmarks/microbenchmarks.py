@@ -0,0 +1,277 @@
+''' Times the hot paths of the engine: Event construction, EventQueue
+    enqueue, dequeue and aggregate reads, PushOutletSocket.push,
+    PullInletSocket.pull, OutletSocket.transfer_events and Source.process,
+    with both queue classes, at several event rates and numbers of
+    registered Species. Registered Species cannot be removed, so each
+    number of Species is run in a fresh process. Results
+    are written as JSON, and a previous results file can be given to compare
+    against. Run from the repository root with
+    python -m benchmarks.microbenchmarks [--output results.json]
+    [--compare baseline.json]. Compare runs made on an otherwise idle
+    machine; timings of single cases can vary by tens of percent under
+    load.'''
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.event import Event
+from src.species import Species
+
+
+EVENT_RATES = (10, 100, 1000)
+SPECIES_COUNTS = (2, 8, 32)
+QUEUE_CLASSES = ('EventQueue', 'ArrayEventQueue')
+# Ratio of minimum times above which a case is reported as a regression.
+# The minimum is compared because it is the least affected by other load.
+THRESHOLD = 1.1
+
+def register_species(count):
+    ''' Registers water, fiber and count - 2 dissolved liquid Species.'''
+    species = [Species('water', {'state': 'liquid', 'density': 997.5}),
+               Species('fiber', {'state': 'solid', 'density': 1200})]
+    species += [Species(f'dissolved{i}', {'state': 'liquid', 'density': 1000})
+                for i in range(count - 2)]
+    Event.register_species(species)
+
+def queue_class(name):
+    from src.event_queue import EventQueue
+    from src.array_event_queue import ArrayEventQueue
+    return {'EventQueue': EventQueue, 'ArrayEventQueue': ArrayEventQueue}[name]
+
+def unit_magnitudes():
+    return {species: 1.0 for species in Event.registered_species}
+
+def filled(queue, count):
+    queue.clear()
+    queue.enqueue_uniform(unit_magnitudes(), count)
+    return queue
+
+def event_construct(queue_type, count):
+    generated_species = list(unit_magnitudes().items())
+    def body(_):
+        for _ in range(count):
+            Event(generated_species)
+    return lambda: None, body
+
+def event_from_magnitudes(queue_type, count):
+    magnitudes = list(unit_magnitudes().values())
+    def body(_):
+        for _ in range(count):
+            Event.from_magnitudes(magnitudes)
+    return lambda: None, body
+
+def queue_enqueue(queue_type, count):
+    magnitudes = list(unit_magnitudes().values())
+    def setup():
+        return queue_type(), [Event.from_magnitudes(magnitudes) for _ in range(count)]
+    def body(state):
+        queue, events = state
+        for event in events:
+            queue.enqueue(event)
+    return setup, body
+
+def queue_dequeue(queue_type, count):
+    queue = queue_type()
+    def body(queue):
+        for _ in range(count):
+            queue.dequeue()
+    return lambda: filled(queue, count), body
+
+def queue_aggregates(queue_type, count):
+    ''' Reads magnitude and species_magnitudes count times.'''
+    queue = filled(queue_type(), count)
+    def body(queue):
+        for _ in range(count):
+            queue.magnitude
+            queue.species_magnitudes
+    return lambda: queue, body
+
+def socket_push(queue_type, count):
+    from src.simulation import Simulation
+    from src.models import Source, Sink
+    simulation = Simulation(queue_class=queue_type)
+    source, sink = Source(simulation), Sink(simulation)
+    simulation.connect(source.outlet_sockets[0], sink.inlet_sockets[0])
+    socket = source.outlet_sockets[0]
+    socket.capacity = float('inf')
+    def setup():
+        sink.inlet_sockets[0].queue.clear()
+        return filled(socket.queue, count)
+    return setup, lambda _: socket.push()
+
+def socket_pull(queue_type, count):
+    from src.simulation import Simulation
+    from src.models import Tank, Pump
+    simulation = Simulation(queue_class=queue_type)
+    tank, pump = Tank(simulation), Pump(simulation)
+    socket = pump.inlet_sockets[1]
+    simulation.connect(tank.outlet_sockets[0], socket)
+    socket.capacity = float('inf')
+    def setup():
+        socket.queue.clear()
+        return filled(tank.outlet_sockets[0].queue, count)
+    return setup, lambda _: socket.pull()
+
+def socket_transfer_events(queue_type, count):
+    ''' Transfers the queue of a Splitter to both its outlets.'''
+    from src.simulation import Simulation
+    from src.models import Splitter
+    simulation = Simulation(queue_class=queue_type)
+    splitter = Splitter(simulation)
+    splitter.process()
+    def setup():
+        for socket in splitter.outlet_sockets:
+            socket.queue.clear()
+        queue = filled(splitter.queue, count)
+        splitter.inlet_flows = [queue.magnitude]
+        splitter.initial_queue_length = queue.length()
+        splitter.initial_species_volumes = queue.species_magnitudes
+    def body(_):
+        for socket in splitter.outlet_sockets:
+            socket.transfer_events()
+    return setup, body
+
+def source_process(queue_type, count):
+    from src.simulation import Simulation
+    from src.models import Source
+    simulation = Simulation(queue_class=queue_type)
+    source = Source(simulation, event_rate=count)
+    return source.outlet_sockets[0].queue.clear, lambda _: source.process()
+
+# Benchmarks whose cost does not depend on the queue class are only run once,
+# with a queue of None.
+benchmarks = {
+    'event.construct': (event_construct, False),
+    'event.from_magnitudes': (event_from_magnitudes, False),
+    'queue.enqueue': (queue_enqueue, True),
+    'queue.dequeue': (queue_dequeue, True),
+    'queue.aggregates': (queue_aggregates, True),
+    'socket.push': (socket_push, True),
+    'socket.pull': (socket_pull, True),
+    'socket.transfer_events': (socket_transfer_events, True),
+    'source.process': (source_process, True),
+}
+
+def measure(setup, body, min_time, min_repeats=5):
+    ''' Runs setup, then times body on its result, until body has run for
+        min_time seconds in total and at least min_repeats times. Returns the
+        times, not counting a first, untimed run.'''
+    body(setup())
+    times = []
+    while len(times) < min_repeats or sum(times) < min_time:
+        state = setup()
+        start = time.perf_counter()
+        body(state)
+        times.append(time.perf_counter() - start)
+    return times
+
+def run_species_count(species_count, event_rates, min_time):
+    ''' Runs every benchmark with species_count registered Species. Must run
+        in a process that has not registered any Species.'''
+    register_species(species_count)
+    results = []
+    for name, (factory, uses_queue) in benchmarks.items():
+        for queue_name in (QUEUE_CLASSES if uses_queue else (None,)):
+            for event_rate in event_rates:
+                setup, body = factory(queue_name and queue_class(queue_name), event_rate)
+                times = measure(setup, body, min_time)
+                median = statistics.median(times)
+                results.append({
+                    'benchmark': name,
+                    'queue': queue_name,
+                    'species': species_count,
+                    'event_rate': event_rate,
+                    'repeats': len(times),
+                    'min_s': min(times),
+                    'median_s': median,
+                    'median_ns_per_event': median / event_rate * 1e9
+                })
+    return results
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def case_key(result):
+    return (result['benchmark'], result['queue'], result['species'], result['event_rate'])
+
+def compare(results, baseline, threshold=THRESHOLD):
+    ''' Prints the ratio of the minimum time of each case in results to that
+        of the same case in baseline, marking those above threshold. Returns
+        the number of regressions.'''
+    baseline_results = {case_key(result): result for result in baseline['results']}
+    print(f'Compared with {baseline.get("commit") or "baseline"}:')
+    regressions = 0
+    for result in results:
+        previous = baseline_results.get(case_key(result))
+        if not previous:
+            continue
+        ratio = result['min_s'] / previous['min_s']
+        if ratio > threshold:
+            regressions += 1
+        name, queue, species, event_rate = case_key(result)
+        print(f'{name:<24} {queue or "-":<16} {species:>7} {event_rate:>6} {ratio:>7.2f}'
+              + ('  slower' if ratio > threshold else ''))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Times the engine hot paths.')
+    parser.add_argument('--output', default='microbenchmarks.json',
+                        help='file the results are written to')
+    parser.add_argument('--compare', help='results file of an earlier run to compare against')
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='seconds each case is run for')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='ratio to the baseline above which a case is reported as slower')
+    parser.add_argument('--species', type=int, nargs='+', default=SPECIES_COUNTS)
+    parser.add_argument('--event-rates', type=int, nargs='+', default=EVENT_RATES)
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for species_count in args.species:
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            results += executor.submit(run_species_count, species_count, args.event_rates,
+                                       args.min_time).result()
+
+    print(f'{"benchmark":<24} {"queue":<16} {"species":>7} {"events":>6} {"median us":>10} '
+          f'{"ns/event":>9}')
+    for result in results:
+        name, queue, species, event_rate = case_key(result)
+        print(f'{name:<24} {queue or "-":<16} {species:>7} {event_rate:>6} '
+              f'{result["median_s"] * 1e6:>10.1f} {result["median_ns_per_event"]:>9.0f}')
+
+    output = {
+        'commit': commit(),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'min_time': args.min_time,
+        'results': results
+    }
+    with open(args.output, 'w') as file:
+        json.dump(output, file, indent=1)
+    print(f'Results written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        print(f'{regressions} cases more than {args.threshold:.0%} of the baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+''' Measures the throughput of a dynamic parameter sweep over a 3 stage
+    cascade with increasing numbers of worker processes. Run from the
+    repository root with python -m benchmarks.parameter_sweep'''
+
+import os
+import time
+
+from src.flowsheets import cascade
+from src.sweep import sweep
+
+
+grid = {
+    'rrv': [0.05, 0.08, 0.11, 0.14],
+    'Pump1.capacity': [3000, 4000, 5000, 6000]
+}
+
+def main():
+    cores = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, cores} - {w for w in (2, 4) if w > cores})
+    print(f'{len(grid["rrv"]) * len(grid["Pump1.capacity"])} cases on {cores} cores')
+    print(f'{"workers":>7} {"seconds":>8} {"cases/s":>8} {"speedup":>8}')
+    baseline = None
+    for count in workers:
+        start = time.perf_counter()
+        result = sweep(cascade, grid, fixed={'event_rate': 100}, workers=count, rel_tol=1e-2,
+                       max_iterations=500)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f'{count:>7} {elapsed:>8.2f} {len(result) / elapsed:>8.1f} {baseline / elapsed:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
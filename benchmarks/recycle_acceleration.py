@@ -0,0 +1,64 @@
+''' Compares the number of sweeps the SteadyStateSolver needs to converge
+    the recycle loops of hydrocyclone cascades with plain substitution and
+    with each accelerator, and the number of iterations Simulation.run
+    takes to reach steady state from empty queues and after
+    Simulation.warm_start. Run from the repository root with
+    python -m benchmarks.recycle_acceleration'''
+
+import time
+
+from src.simulation import Simulation
+from src.array_event_queue import ArrayEventQueue
+from src.flowsheets import cascade
+from src.acceleration import Wegstein, Aitken
+
+
+accelerators = {
+    'none': lambda: None,
+    'wegstein': Wegstein,
+    'aitken': Aitken
+}
+
+def solve(stages, rrv, accelerator):
+    simulation = Simulation()
+    streams = cascade(simulation, stages=stages, rrv=rrv, rrw=1.5 * rrv)
+    start = time.perf_counter()
+    solver = simulation.solve_steady_state(accelerator=accelerator)
+    elapsed = time.perf_counter() - start
+    return solver.iterations, elapsed, streams['accepts'].flowrates
+
+def run_dynamic(stages, warm):
+    ''' Returns the iteration at which a cascade reached steady state and the
+        time taken, counting the warm start.'''
+    simulation = Simulation(queue_class=ArrayEventQueue)
+    cascade(simulation, stages=stages)
+    start = time.perf_counter()
+    if warm:
+        simulation.warm_start()
+    iteration = simulation.run_until_steady(2000)
+    return iteration, time.perf_counter() - start
+
+def main():
+    print(f'{"stages":>6} {"rrv":>5} ' + ' '.join(f'{name:>14}' for name in accelerators))
+    for stages in (3, 5, 8):
+        for rrv in (0.08, 0.3, 0.5):
+            results = {name: solve(stages, rrv, accelerator())
+                       for name, accelerator in accelerators.items()}
+            reference = results['none'][2]
+            for name, (_, _, flowrates) in results.items():
+                for species, flowrate in flowrates.items():
+                    assert abs(flowrate - reference[species]) <= 1e-6 * max(1, abs(flowrate)), name
+            print(f'{stages:>6} {rrv:>5} ' + ' '.join(
+                f'{iterations:>4} ({elapsed * 1000:5.2f}ms)' 
+                for iterations, elapsed, _ in results.values()))
+
+    print()
+    print(f'{"stages":>6} {"cold":>16} {"warm start":>16}')
+    for stages in (3, 5, 10, 25):
+        cold, warm = run_dynamic(stages, False), run_dynamic(stages, True)
+        print(f'{stages:>6} ' + ' '.join(f'{iteration:>5} ({elapsed:6.2f}s)'
+                                         for iteration, elapsed in (cold, warm)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+''' Runs the reference plants end to end, headless: the single-stage
+    hydrocyclone system and the 3-stage cascade from the README
+    demonstrations, and cascades with more stages, up to hundreds of
+    Modules, for scaling curves. For each plant and queue class it measures
+    the iterations and wall time taken to reach steady state, the iterations
+    per second once there, the largest and final number of live Events and
+    the peak memory of the process. Each run is made in a fresh process, so
+    peak memory is that of the run alone. Plants that take longer than the
+    time limit are given up on, so the largest cascades are only run to
+    steady state with ArrayEventQueues in a reasonable time. Results are written as JSON, and a
+    previous results file can be given to compare against. Run from the
+    repository root with python -m benchmarks.scenarios
+    [--output results.json] [--compare baseline.json]'''
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .microbenchmarks import commit, queue_class
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+STAGES = (10, 25, 50, 100)
+QUEUE_CLASSES = ('EventQueue', 'ArrayEventQueue')
+
+def scenarios(stages=STAGES):
+    ''' Returns (name, builder name, builder kwargs) for each plant.'''
+    plants = [('single_stage', 'single_stage', {}), ('cascade3', 'cascade', {'stages': 3})]
+    plants += [(f'cascade{count}', 'cascade', {'stages': count}) for count in stages]
+    return plants
+
+def peak_memory():
+    ''' Returns the peak resident set size of this process in MB, or None if
+        it cannot be measured here.'''
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere.
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+def run_scenario(name, builder_name, kwargs, queue_name, event_rate, max_iterations,
+                 rate_iterations, time_limit):
+    ''' Builds a plant and runs it until steady state, giving up after
+        max_iterations or time_limit seconds, then for rate_iterations more,
+        or time_limit / 10 seconds if that is shorter. Must run in a fresh
+        process for its peak memory to mean anything.'''
+    from src import flowsheets
+    from src.simulation import Simulation
+
+    memory_before = peak_memory()
+    simulation = Simulation(queue_class=queue_class(queue_name))
+    start = time.perf_counter()
+    getattr(flowsheets, builder_name)(simulation, event_rate=event_rate, **kwargs)
+    build_time = time.perf_counter() - start
+
+    # Only the iterations are timed, not the counting of live Events.
+    elapsed = 0.0
+    peak_live_events = 0
+    for _ in range(max_iterations):
+        start = time.perf_counter()
+        simulation.run()
+        elapsed += time.perf_counter() - start
+        peak_live_events = max(peak_live_events, simulation.live_events())
+        if simulation.monitor.steady or elapsed > time_limit:
+            break
+    steady = simulation.monitor.steady
+
+    start = time.perf_counter()
+    iterations = 0
+    while iterations < rate_iterations and time.perf_counter() - start < time_limit / 10:
+        simulation.run()
+        iterations += 1
+    rate_time = time.perf_counter() - start
+
+    return {
+        'scenario': name,
+        'queue': queue_name,
+        'modules': len(simulation.modules),
+        'streams': len(simulation.streams),
+        'event_rate': event_rate,
+        'build_s': build_time,
+        'steady': steady,
+        'steady_iteration': simulation.monitor.steady_iteration,
+        'time_to_steady_s': elapsed if steady else None,
+        'iterations_per_second': iterations / rate_time,
+        'peak_live_events': peak_live_events,
+        'final_live_events': simulation.live_events(),
+        'peak_memory_mb': peak_memory(),
+        'baseline_memory_mb': memory_before
+    }
+
+def compare(results, baseline):
+    ''' Prints the ratio of the iterations per second and time to steady
+        state of each run in results to those of the same run in baseline.'''
+    baseline_results = {(result['scenario'], result['queue'], result['event_rate']): result
+                        for result in baseline['results']}
+    print(f'Compared with {baseline.get("commit") or "baseline"}:')
+    print(f'{"scenario":<14} {"queue":<16} {"it/s ratio":>10} {"to steady ratio":>16}')
+    for result in results:
+        previous = baseline_results.get((result['scenario'], result['queue'],
+                                         result['event_rate']))
+        if not previous:
+            continue
+        steady_ratio = '-'
+        if result['time_to_steady_s'] and previous['time_to_steady_s']:
+            steady_ratio = f'{result["time_to_steady_s"] / previous["time_to_steady_s"]:.2f}'
+        print(f'{result["scenario"]:<14} {result["queue"]:<16} '
+              f'{result["iterations_per_second"] / previous["iterations_per_second"]:>10.2f} '
+              f'{steady_ratio:>16}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs the reference plants end to end.')
+    parser.add_argument('--output', default='scenarios.json',
+                        help='file the results are written to')
+    parser.add_argument('--compare', help='results file of an earlier run to compare against')
+    parser.add_argument('--stages', type=int, nargs='+', default=STAGES,
+                        help='numbers of stages of the synthetic cascades')
+    parser.add_argument('--queues', nargs='+', default=QUEUE_CLASSES, choices=QUEUE_CLASSES)
+    parser.add_argument('--event-rate', type=int, default=1000)
+    parser.add_argument('--max-iterations', type=int, default=2000,
+                        help='iterations after which a plant is given up on reaching steady state')
+    parser.add_argument('--rate-iterations', type=int, default=50,
+                        help='iterations timed after steady state')
+    parser.add_argument('--time-limit', type=float, default=60,
+                        help='seconds after which a plant is given up on reaching steady state')
+    args = parser.parse_args()
+
+    print(f'{"scenario":<14} {"queue":<16} {"modules":>7} {"steady at":>9} {"to steady s":>11} '
+          f'{"it/s":>8} {"peak events":>11} {"peak MB":>8}')
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for name, builder_name, kwargs in scenarios(args.stages):
+        for queue_name in args.queues:
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                result = executor.submit(run_scenario, name, builder_name, kwargs, queue_name,
+                                         args.event_rate, args.max_iterations,
+                                         args.rate_iterations, args.time_limit).result()
+            results.append(result)
+            steady_time = result['time_to_steady_s']
+            print(f'{name:<14} {queue_name:<16} {result["modules"]:>7} '
+                  f'{result["steady_iteration"] or "-":>9} '
+                  f'{f"{steady_time:.2f}" if steady_time else "-":>11} '
+                  f'{result["iterations_per_second"]:>8.1f} {result["peak_live_events"]:>11} '
+                  f'{result["peak_memory_mb"] or 0:>8.1f}')
+
+    output = {
+        'commit': commit(),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'event_rate': args.event_rate,
+        'max_iterations': args.max_iterations,
+        'results': results
+    }
+    with open(args.output, 'w') as file:
+        json.dump(output, file, indent=1)
+    print(f'Results written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
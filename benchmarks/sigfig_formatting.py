@@ -0,0 +1,55 @@
+''' Compares formatting the three values of a FiberReadout with sigfig.round
+    and with round_sigfigs, with and without cache hits. Run from the
+    repository root with python -m benchmarks.sigfig_formatting'''
+
+import random
+import timeit
+import warnings
+
+import sigfig
+
+from src.formatting import round_sigfigs
+
+
+def fiber_readout_values(count, seed=0):
+    ''' Returns count (total flow, consistency, tonnage) triples like those
+        shown by FiberReadouts.'''
+    rng = random.Random(seed)
+    values = []
+    for _ in range(count):
+        total_flow = rng.uniform(10, 5000)
+        solids_flow = total_flow * rng.uniform(0.001, 0.02)
+        values.append((total_flow, solids_flow / total_flow * 100, solids_flow * 60 * 24 / 1000))
+    return values
+
+def format_sigfig(values):
+    for total_flow, consistency, tonnage in values:
+        f'{sigfig.round(total_flow, sigfigs=3)} - ' \
+        f'{sigfig.round(consistency, sigfigs=3)} - ' \
+        f'{sigfig.round(tonnage, sigfigs=3)}'
+
+def format_fast(values):
+    for total_flow, consistency, tonnage in values:
+        f'{round_sigfigs(total_flow, 3)} - ' \
+        f'{round_sigfigs(consistency, 3)} - ' \
+        f'{round_sigfigs(tonnage, 3)}'
+
+def main():
+    warnings.simplefilter('ignore')
+    # 50 readouts over 20 ticks; values repeat from tick to tick at steady
+    # state, so the cache is hit after the first tick.
+    repeated = fiber_readout_values(50) * 20
+    unique = fiber_readout_values(1000, seed=1)
+
+    cases = [
+        ('sigfig.round', lambda: format_sigfig(repeated)),
+        ('round_sigfigs, uncached', lambda: (round_sigfigs.cache_clear(), format_fast(unique))),
+        ('round_sigfigs, cached', lambda: format_fast(repeated)),
+    ]
+    for name, case in cases:
+        seconds = min(timeit.repeat(case, number=5, repeat=5)) / 5
+        print(f'{name:<25} {seconds / 1000 * 1e6:8.2f} us per readout')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+''' Convergence accelerators for the tear Streams of recycle loops. An
+    accelerator is given the flows x fed into a loop and the flows g(x) that
+    came back out of it after a sweep, both as flat lists, and returns the
+    flows to feed into the next sweep. The flows of the tear Streams of a
+    loop are strongly coupled, so both accelerators extrapolate the whole
+    list along a single direction rather than each flow on its own.
+    Extrapolated flows are bounded and never negative, and are only ever
+    used as guesses: the flows of a converged loop always come from a plain
+    sweep of its Modules, so every Module's mass balance still holds.'''
+
+
+def dot(a, b):
+    return sum(ai * bi for ai, bi in zip(a, b))
+
+def difference(a, b):
+    return [ai - bi for ai, bi in zip(a, b)]
+
+
+class Wegstein:
+    ''' Wegstein's method. The flows x are replaced by q * x + (1 - q) * g(x),
+        where q = s / (s - 1) and s is the least squares slope of g estimated
+        from the last two sweeps. q is bounded to [q_min, q_max]; q = 0 is
+        plain substitution and negative values extrapolate.'''
+    def __init__(self, q_min=-5, q_max=0):
+        self.q_min = q_min
+        self.q_max = q_max
+        self.reset()
+
+    def reset(self):
+        ''' Forgets the flows of previous sweeps.'''
+        self.previous = None
+        self.q = 0
+
+    def accelerate(self, x, gx):
+        previous = self.previous
+        self.previous = (x, gx)
+        if previous is None:
+            return list(gx)
+
+        step = difference(x, previous[0])
+        squared_step = dot(step, step)
+        if squared_step == 0:
+            return list(gx)
+        slope = dot(step, difference(gx, previous[1])) / squared_step
+        q = slope / (slope - 1) if slope != 1 else self.q_min
+        self.q = min(max(q, self.q_min), self.q_max)
+        return [max(0, self.q * xi + (1 - self.q) * gxi) for xi, gxi in zip(x, gx)]
+
+
+class Aitken:
+    ''' Aitken's delta-squared method in its vector form, due to Irons and
+        Tuck. After every two plain substitution sweeps x0 -> x1 -> x2, the
+        flows are extrapolated to x2 - factor * (x2 - x1), with
+        factor = (x2 - x1).(d2 - d1) / |d2 - d1| ** 2, where d1 = x1 - x0 and
+        d2 = x2 - x1. The factor is bounded to [-max_factor, max_factor].'''
+    def __init__(self, max_factor=5):
+        self.max_factor = max_factor
+        self.reset()
+
+    def reset(self):
+        ''' Forgets the flows of previous sweeps.'''
+        self.iterates = []
+
+    def accelerate(self, x, gx):
+        if not self.iterates:
+            self.iterates.append(x)
+        self.iterates.append(gx)
+        if len(self.iterates) < 3:
+            return list(gx)
+
+        x0, x1, x2 = self.iterates
+        self.iterates = []
+        d1 = difference(x1, x0)
+        d2 = difference(x2, x1)
+        curvature = difference(d2, d1)
+        squared_curvature = dot(curvature, curvature)
+        if squared_curvature == 0:
+            return list(x2)
+        factor = dot(d2, curvature) / squared_curvature
+        factor = min(max(factor, -self.max_factor), self.max_factor)
+        return [max(0, x2i - factor * d2i) for x2i, d2i in zip(x2, d2)]
@@ -0,0 +1,264 @@
+''' On-disk archives of the full trajectory of a Simulation. A
+    TrajectoryWriter records, every iteration, the flowrate of each Species
+    and the Event count of every Stream, and the number of queued Events and
+    their total volume for every Module, counting its Sockets. Iterations are
+    gathered into blocks of chunk_size, and the data of each Stream and
+    Module in a block is compressed separately with zlib and appended to the
+    archive's data file by a background thread. After each block a line
+    giving the offset and length of every chunk is appended to the archive's
+    index file. A TrajectoryReader reads the index and only decompresses the
+    chunks of the Streams or Modules asked for, in the blocks that overlap
+    the iterations asked for. Both files are only ever appended to, so an
+    archive cut short, e.g. by a crash, still holds every block written
+    before.'''
+
+import os
+import json
+import zlib
+import queue
+import threading
+
+import numpy as np
+
+from .event import Event
+
+
+FORMAT = 'trajectory'
+VERSION = 1
+INDEX_FILE = 'index.jsonl'
+DATA_FILE = 'data.bin'
+
+def unique_names(models):
+    ''' Returns the names of models, with a count appended to repeated
+        names so that every name is unique.'''
+    names = []
+    counts = {}
+    for model in models:
+        counts[model.name] = counts.get(model.name, 0) + 1
+        names.append(model.name if counts[model.name] == 1
+                     else f'{model.name} ({counts[model.name]})')
+    return names
+
+def queue_metrics(module):
+    ''' Returns the number of Events queued in module and its Sockets and
+        their total volume.'''
+    queues = [module.queue] + [socket.queue for socket
+                               in module.inlet_sockets + module.outlet_sockets]
+    return (sum(queue.length() for queue in queues),
+            sum(queue.magnitude for queue in queues))
+
+
+class TrajectoryWriter:
+    ''' Writes the trajectory of a Simulation to an archive in the directory
+        at path, which is created if needed. Recording is opt-in: append the
+        writer to the Simulation's observers, and call close, or use it as a
+        context manager, to write the last partial block. Blocks are
+        compressed and written on a background thread, so stepping only
+        waits on the disk if more than max_pending blocks are waiting to be
+        written. If Streams or Modules are added or removed, the current
+        block is ended early and later blocks record the new set.'''
+    def __init__(self, path, chunk_size=1000, compression_level=1, max_pending=16):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.compression_level = compression_level
+        os.makedirs(path, exist_ok=True)
+        self.data_file = open(os.path.join(path, DATA_FILE), 'wb')
+        self.index_file = open(os.path.join(path, INDEX_FILE), 'w')
+        self.species = [species.name for species in Event.registered_species]
+        self.write_index_line({'format': FORMAT, 'version': VERSION, 'species': self.species,
+                               'stream_columns': self.species + ['event_count'],
+                               'module_columns': ['events', 'volume']})
+
+        self.streams = None
+        self.modules = None
+        self.count = 0
+        self.error = None
+        self.blocks = queue.Queue(max_pending)
+        self.thread = threading.Thread(target=self.write_blocks, name='TrajectoryWriter',
+                                       daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_index_line(self, record):
+        self.index_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.index_file.flush()
+
+    def start_block(self, simulation):
+        self.streams = list(simulation.streams)
+        self.modules = list(simulation.modules)
+        self.iterations = np.empty(self.chunk_size, dtype=np.int64)
+        self.stream_data = np.empty((len(self.streams), self.chunk_size, len(self.species) + 1))
+        self.module_data = np.empty((len(self.modules), self.chunk_size, 2))
+        self.count = 0
+
+    def end_block(self):
+        ''' Hands the recorded part of the current block to the background
+            thread.'''
+        if self.count:
+            count = self.count
+            self.blocks.put((self.iterations[:count], unique_names(self.streams),
+                             self.stream_data[:, :count], unique_names(self.modules),
+                             self.module_data[:, :count]))
+        self.streams = None
+        self.count = 0
+
+    def observe(self, simulation):
+        ''' Records the Streams and Modules of simulation in the iteration
+            just run.'''
+        if self.error:
+            raise self.error
+        if (self.streams is None or simulation.streams != self.streams
+            or simulation.modules != self.modules):
+            self.end_block()
+            self.start_block(simulation)
+
+        row = self.count
+        self.iterations[row] = simulation.iteration
+        registered_species = Event.registered_species
+        for stream_data, stream in zip(self.stream_data, self.streams):
+            stream_row = stream_data[row]
+            stream_row[:-1] = [stream.flowrates[species] for species in registered_species]
+            stream_row[-1] = stream.event_count
+        for module_data, module in zip(self.module_data, self.modules):
+            module_data[row] = queue_metrics(module)
+        self.count += 1
+        if self.count == self.chunk_size:
+            self.end_block()
+
+    def compress(self, array):
+        ''' Appends array, compressed, to the data file and returns its offset
+            and length.'''
+        data = zlib.compress(np.ascontiguousarray(array).tobytes(), self.compression_level)
+        offset = self.data_file.tell()
+        self.data_file.write(data)
+        return [offset, len(data)]
+
+    def write_blocks(self):
+        while True:
+            block = self.blocks.get()
+            if block is None:
+                return
+            if self.error:
+                continue
+            try:
+                iterations, stream_names, stream_data, module_names, module_data = block
+                record = {
+                    'first': int(iterations.min()),
+                    'last': int(iterations.max()),
+                    'count': len(iterations),
+                    'iterations': self.compress(iterations),
+                    'streams': [[name, *self.compress(data)]
+                                for name, data in zip(stream_names, stream_data)],
+                    'modules': [[name, *self.compress(data)]
+                                for name, data in zip(module_names, module_data)]
+                }
+                # The data is on disk before the index refers to it.
+                self.data_file.flush()
+                self.write_index_line(record)
+            except Exception as e:
+                self.error = e
+
+    def close(self):
+        ''' Writes the last partial block, waits for every block to be written
+            and closes the archive. Raises any error met while writing.'''
+        if self.thread.is_alive():
+            self.end_block()
+            self.blocks.put(None)
+            self.thread.join()
+            self.data_file.close()
+            self.index_file.close()
+        if self.error:
+            raise self.error
+
+
+class TrajectoryReader:
+    ''' Reads ranges of iterations of chosen Streams or Modules from an
+        archive written by a TrajectoryWriter.'''
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as index_file:
+            lines = [json.loads(line) for line in index_file if line.strip()]
+        header = lines[0]
+        if header.get('format') != FORMAT:
+            raise ValueError('Not a trajectory archive.')
+        if header['version'] > VERSION:
+            raise ValueError(f'Trajectory archive version {header["version"]} is newer than '
+                             f'the supported version {VERSION}.')
+        self.species = header['species']
+        self.stream_columns = header['stream_columns']
+        self.module_columns = header['module_columns']
+        self.blocks = lines[1:]
+
+    def names(self, kind):
+        names = []
+        for block in self.blocks:
+            names.extend(name for name, _, _ in block[kind] if name not in names)
+        return names
+
+    @property
+    def stream_names(self):
+        ''' Property. Returns the names of every Stream recorded.'''
+        return self.names('streams')
+
+    @property
+    def module_names(self):
+        ''' Property. Returns the names of every Module recorded.'''
+        return self.names('modules')
+
+    def __len__(self):
+        return sum(block['count'] for block in self.blocks)
+
+    def decompress(self, data_file, offset, length, dtype=np.float64):
+        data_file.seek(offset)
+        return np.frombuffer(zlib.decompress(data_file.read(length)), dtype=dtype)
+
+    def read(self, kind, names, start, stop):
+        column_count = len(self.stream_columns if kind == 'streams' else self.module_columns)
+        if names is None:
+            names = self.names(kind)
+        iterations = []
+        values = []
+        with open(os.path.join(self.path, DATA_FILE), 'rb') as data_file:
+            for block in self.blocks:
+                if ((start is not None and block['last'] < start)
+                    or (stop is not None and block['first'] >= stop)):
+                    continue
+                block_iterations = self.decompress(data_file, *block['iterations'], np.int64)
+                rows = np.ones(len(block_iterations), dtype=bool)
+                if start is not None:
+                    rows &= block_iterations >= start
+                if stop is not None:
+                    rows &= block_iterations < stop
+                chunks = {name: (offset, length) for name, offset, length in block[kind]}
+                block_values = np.full((len(names), int(rows.sum()), column_count), np.nan)
+                for i, name in enumerate(names):
+                    if name in chunks:
+                        block_values[i] = self.decompress(data_file, *chunks[name]).reshape(
+                            -1, column_count)[rows]
+                iterations.append(block_iterations[rows])
+                values.append(block_values)
+
+        if not values:
+            return np.zeros(0, dtype=np.int64), np.zeros((len(names), 0, column_count))
+        return np.concatenate(iterations), np.concatenate(values, axis=1)
+
+    def read_streams(self, names=None, start=None, stop=None):
+        ''' Returns the iterations from start up to but not including stop
+            that were recorded, and an array of shape (streams, iterations,
+            columns) of the flowrate of each Species and the Event count of
+            the Streams with the given names, or every Stream, in those
+            iterations. Values of Streams that did not exist in an iteration
+            are nan.'''
+        return self.read('streams', names, start, stop)
+
+    def read_modules(self, names=None, start=None, stop=None):
+        ''' Returns the iterations from start up to but not including stop
+            that were recorded, and an array of shape (modules, iterations, 2)
+            of the number of Events queued in the Modules with the given
+            names, or every Module, and their volume.'''
+        return self.read('modules', names, start, stop)
@@ -0,0 +1,203 @@
+import numpy as np
+
+from .event import Event
+from .event_queue import EventQueue
+
+class ArrayEventQueue(EventQueue):
+    ''' EventQueue backend that stores each queued Event as a row of a
+        preallocated 2-D float array, with one column per registered Species.
+        Events live between the head and tail indices. Events are only
+        instantiated when they are peeked at or dequeued individually, so sums
+        and transfers between ArrayEventQueues operate on whole slices.'''
+    def __init__(self, initial_capacity=64):
+        self.species = list(Event.registered_species)
+        self.rows = np.zeros((max(1, initial_capacity), len(self.species)))
+        self.head = 0
+        self.tail = 0
+
+        # Running per-Species totals of all queued rows.
+        self.totals = np.zeros(len(self.species))
+
+    def _reserve(self, count):
+        ''' Ensures there is room for count more rows after the tail, either by
+            moving the queued rows to the start of the array or by growing
+            it.'''
+        if self.tail + count <= len(self.rows):
+            return
+
+        length = self.tail - self.head
+        if length + count <= len(self.rows) // 2:
+            rows = self.rows
+        else:
+            rows = np.zeros((max(2 * len(self.rows), length + count), len(self.species)))
+        rows[:length] = self.rows[self.head:self.tail]
+        self.rows = rows
+        self.head = 0
+        self.tail = length
+
+    def _row_to_event(self, row):
+        return Event.from_magnitudes(row.tolist())
+
+    def _vector(self, species_magnitudes):
+        return [species_magnitudes.get(species, 0) for species in self.species]
+
+    @property
+    def live_rows(self):
+        ''' Property. Returns a view of the rows of all queued Events, front
+            first.'''
+        return self.rows[self.head:self.tail]
+
+    def peek(self):
+        ''' Returns the Event at the front of the queue.'''
+        if self.empty():
+            raise IndexError('peek from an empty queue')
+        return self._row_to_event(self.rows[self.head])
+
+    def enqueue(self, event):
+        ''' Adds an Event to the back of the queue.'''
+        self._reserve(1)
+        self.rows[self.tail] = event.magnitudes
+        self.totals += self.rows[self.tail]
+        self.tail += 1
+
+    def enqueue_rows(self, rows):
+        ''' Adds one Event per row of the 2-D array rows to the back of the
+            queue.'''
+        count = len(rows)
+        self._reserve(count)
+        self.rows[self.tail:self.tail + count] = rows
+        self.totals += rows.sum(axis=0)
+        self.tail += count
+
+    def enqueue_uniform(self, species_magnitudes, count, pool=None):
+        ''' Adds count identical Events, with magnitudes specified by the
+            species_magnitudes dict, to the back of the queue. pool is 
+            ignored, since queued rows are not Event objects.'''
+        self._reserve(count)
+        vector = np.array(self._vector(species_magnitudes), dtype=float)
+        self.rows[self.tail:self.tail + count] = vector
+        self.totals += count * vector
+        self.tail += count
+
+    def dequeue(self):
+        ''' Removes and returns the Event at the front of the queue.'''
+        event = self.peek()
+        self._discard(1)
+        return event
+
+    def _discard(self, count, removed=None):
+        ''' Removes count rows from the front of the queue. removed may be 
+            given as the column sums of those rows if they are already 
+            known.'''
+        if removed is None:
+            removed = self.rows[self.head:self.head + count].sum(axis=0)
+        self.totals -= removed
+        self.head += count
+        if self.head == self.tail:
+            self.clear()
+
+    def length(self):
+        ''' Returns the length of the queue.'''
+        return self.tail - self.head
+
+    def empty(self):
+        ''' Returns True if the queue is empty, False otherwise.'''
+        return self.tail == self.head
+
+    def clear(self):
+        ''' Removes all Events from the queue.'''
+        self.head = self.tail = 0
+        self.totals[:] = 0
+
+    def queued_rows(self):
+        ''' Returns a view of the rows of all queued Events, front first.'''
+        return self.live_rows
+
+    def restore_rows(self, rows, totals):
+        ''' Replaces the queued Events with the rows of the 2-D array rows,
+            whose column sums are totals. rows is used in place rather than
+            copied, so a memory-mapped array is only read from disk as its
+            rows are used. It must be writable, e.g. mapped copy-on-write.'''
+        if not len(rows):
+            self.clear()
+            return
+        self.rows = rows
+        self.head = 0
+        self.tail = len(rows)
+        self.totals = np.array(totals, dtype=float)
+
+    def purge(self, pool=None):
+        ''' Removes all Events from the queue. pool is ignored, since 
+            queued rows are not Event objects.'''
+        self.clear()
+
+    def transfer(self, destination, capacity=float('inf')):
+        ''' Moves Events from the front of this queue to the back of the
+            destination queue, stopping before the Event that would bring the
+            total magnitude moved above capacity. Returns a dictionary mapping
+            each registered Species to the magnitude that was moved.'''
+        if not isinstance(destination, ArrayEventQueue):
+            return super().transfer(destination, capacity)
+
+        rows = self.live_rows
+        if capacity == float('inf'):
+            count = len(rows)
+        else:
+            count = int(np.searchsorted(np.cumsum(rows.sum(axis=1)), capacity, side='right'))
+
+        moved = rows[:count]
+        moved_totals = self.totals.copy() if count == len(rows) else moved.sum(axis=0)
+        destination._reserve(count)
+        destination.rows[destination.tail:destination.tail + count] = moved
+        destination.tail += count
+        destination.totals += moved_totals
+        self._discard(count, moved_totals)
+        return dict(zip(self.species, moved_totals.tolist()))
+
+    def transfer_uniform(self, destination, count, species_magnitudes):
+        ''' Moves up to count Events from the front of this queue to the back
+            of the destination queue, setting the magnitudes of each moved
+            Event as specified by the species_magnitudes dict. Returns the
+            number of Events moved.'''
+        if not isinstance(destination, ArrayEventQueue):
+            return super().transfer_uniform(destination, count, species_magnitudes)
+
+        count = min(count, self.length())
+        destination.enqueue_uniform(species_magnitudes, count)
+        self._discard(count)
+        return count
+
+    def set_event_species_magnitude(self, event, species, magnitude):
+        ''' Not supported, since the Events returned by an ArrayEventQueue 
+            are copies of its rows.'''
+        raise NotImplementedError('Events queued in an ArrayEventQueue cannot be edited in place.')
+
+    def recompute_species_magnitudes(self):
+        ''' Returns a dictionary mapping each registered Species to its
+            aggregate magnitude in the queue, summed over every queued 
+            row.'''
+        return dict(zip(self.species, self.live_rows.sum(axis=0).tolist()))
+
+    def check_totals(self):
+        ''' Raises a RuntimeError if the running totals of this queue do not
+            match a full recompute.'''
+        expected = self.live_rows.sum(axis=0)
+        if not np.allclose(self.totals, expected, rtol=1e-9, atol=1e-9):
+            raise RuntimeError(f'Running totals are {self.totals.tolist()}, '
+                               f'expected {expected.tolist()}.')
+
+    @property
+    def magnitude(self):
+        ''' Property. Returns the total volume of all Events in the
+            queue.'''
+        if self.debug:
+            self.check_totals()
+        return float(self.totals.sum())
+
+    @property
+    def species_magnitudes(self):
+        ''' Property. Returns a dictionary mapping each registered Species to its
+            corresponding aggregate magnitude in the queue.'''
+        if self.debug:
+            self.check_totals()
+        return dict(zip(self.species, self.totals.tolist()))
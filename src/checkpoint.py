@@ -0,0 +1,136 @@
+''' Checkpoints of the dynamic state of a Simulation: the Events queued in
+    every Module and Socket, the flowrates of every Stream, the capacities
+    of pull Sockets, which Pumps adjust as they run, and the iteration.
+    Module settings are not included; they belong to the flowsheet, see
+    flowsheet_file. A checkpoint can be restored into any Simulation with
+    the same Modules and Streams, e.g. one loaded from the same flowsheet
+    file, to resume a run or to start what-if studies from a converged
+    state without repeating the warm-up.
+
+    A checkpoint file starts with MAGIC, the length of its JSON header as a
+    little-endian unsigned 64-bit integer and the header itself, padded to a
+    multiple of 8 bytes. The magnitudes of all queued Events follow as a
+    single C-ordered array of little-endian doubles with one row per Event
+    and one column per Species. The header gives the number of rows and the
+    running totals of each queue. On restore the array is memory-mapped
+    copy-on-write, and ArrayEventQueues use their rows in place, so
+    restoring takes the same time however many Events were queued and only
+    the rows that are used are read from disk.'''
+
+import json
+import struct
+
+import numpy as np
+
+from .event import Event
+from .models import PullInletSocket, PullOutletSocket
+
+
+MAGIC = b'DESCHKPT'
+# Incremented whenever the file format changes. Files written by another
+# version are rejected.
+VERSION = 1
+
+def queues(simulation):
+    ''' Returns the queues of simulation's Modules and Sockets, in the order
+        they are stored in checkpoints.'''
+    return [queue for module in simulation.modules
+            for queue in [module.queue] + [socket.queue for socket
+                                           in module.inlet_sockets + module.outlet_sockets]]
+
+def pull_sockets(simulation):
+    return [socket for module in simulation.modules
+            for socket in module.inlet_sockets + module.outlet_sockets
+            if isinstance(socket, (PullInletSocket, PullOutletSocket))]
+
+def save_checkpoint(simulation, path):
+    ''' Writes the dynamic state of simulation to the file at path.'''
+    species_count = len(Event.registered_species)
+    with simulation.lock:
+        simulation_queues = queues(simulation)
+        blocks = [np.asarray(queue.queued_rows(), dtype='<f8').reshape(-1, species_count)
+                  for queue in simulation_queues]
+        header = {
+            'version': VERSION,
+            'iteration': simulation.iteration,
+            'species': [species.name for species in Event.registered_species],
+            'modules': [[type(module).__name__, module.name] for module in simulation.modules],
+            # The running totals are saved rather than recomputed, so that a
+            # restored run continues bit for bit like the original.
+            'queues': [[len(block), [queue.species_magnitudes[species]
+                                     for species in Event.registered_species]]
+                       for queue, block in zip(simulation_queues, blocks)],
+            'streams': [[stream.name, [stream.flowrates[species]
+                                       for species in Event.registered_species],
+                         stream.event_count]
+                        for stream in simulation.streams],
+            'pull_capacities': [socket.capacity for socket in pull_sockets(simulation)]
+        }
+
+    encoded_header = json.dumps(header, separators=(',', ':')).encode()
+    encoded_header += b' ' * (-len(encoded_header) % 8)
+    with open(path, 'wb') as file:
+        file.write(MAGIC)
+        file.write(struct.pack('<Q', len(encoded_header)))
+        file.write(encoded_header)
+        for block in blocks:
+            file.write(np.ascontiguousarray(block).tobytes())
+
+def read_header(file):
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError('Not a checkpoint file.')
+    header_length, = struct.unpack('<Q', file.read(8))
+    header = json.loads(file.read(header_length))
+    if header['version'] != VERSION:
+        raise ValueError(f'Checkpoint file version {header["version"]} is not supported.')
+    return header, len(MAGIC) + 8 + header_length
+
+def check_compatible(simulation, header):
+    ''' Raises a ValueError if the checkpoint described by header was not
+        taken from a Simulation with the same Species, Modules and Streams as
+        simulation.'''
+    if header['species'] != [species.name for species in Event.registered_species]:
+        raise ValueError('The checkpoint was taken with different Species registered.')
+    if header['modules'] != [[type(module).__name__, module.name]
+                             for module in simulation.modules]:
+        raise ValueError('The checkpoint was taken from a flowsheet with different Modules.')
+    if [name for name, _, _ in header['streams']] != [stream.name
+                                                      for stream in simulation.streams]:
+        raise ValueError('The checkpoint was taken from a flowsheet with different Streams.')
+
+def load_checkpoint(simulation, path):
+    ''' Restores the dynamic state saved in the file at path into
+        simulation and returns simulation. Raises a ValueError if the file is
+        not a checkpoint of a Simulation with the same Species, Modules and
+        Streams.'''
+    with open(path, 'rb') as file:
+        header, offset = read_header(file)
+    check_compatible(simulation, header)
+
+    species_count = len(header['species'])
+    row_count = sum(count for count, _ in header['queues'])
+    if row_count:
+        # Mapped copy-on-write, so the queues can modify their rows without
+        # touching the file.
+        rows = np.memmap(path, dtype='<f8', mode='c', offset=offset,
+                         shape=(row_count, species_count)).view(np.ndarray)
+    else:
+        rows = np.zeros((0, species_count))
+
+    with simulation.lock:
+        start = 0
+        for queue, (count, totals) in zip(queues(simulation), header['queues']):
+            queue.restore_rows(rows[start:start + count], totals)
+            start += count
+
+        for stream, (_, flowrates, event_count) in zip(simulation.streams, header['streams']):
+            stream.flowrates = dict(zip(Event.registered_species, flowrates))
+            stream.event_count = event_count
+        for socket, capacity in zip(pull_sockets(simulation), header['pull_capacities']):
+            socket.capacity = capacity
+
+        simulation.iteration = header['iteration']
+        simulation.monitor.reset()
+        if simulation.freezer:
+            simulation.freezer.reset()
+    return simulation
@@ -0,0 +1,71 @@
+from .event import Event
+
+
+class SteadyStateMonitor:
+    ''' Observes a Simulation and detects when it has reached steady state.
+        After every iteration, the flowrates of each Stream are compared with
+        those of the previous iteration. Steady state is reached once every
+        flowrate has changed by no more than abs_tol + rel_tol * |flowrate|
+        for window consecutive iterations. If the flowrates move outside the
+        tolerances again, e.g. after a setting is changed, the monitor resets
+        and waits for the next steady state.'''
+    def __init__(self, rel_tol=1e-3, abs_tol=1e-6, window=10, auto_stop=False):
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.window = window
+        # If True, Simulation.running is cleared when steady state is reached.
+        self.auto_stop = auto_stop
+        self.reset()
+
+    def reset(self):
+        ''' Forgets all observed flowrates.'''
+        self.previous_flowrates = None
+        self.stable_iterations = 0
+        self.steady = False
+        self.steady_iteration = None
+        self.max_change = float('inf')
+
+    def stream_flowrates(self, simulation):
+        return [[stream.flowrates[species] for species in Event.registered_species]
+                for stream in simulation.streams]
+
+    def observe(self, simulation):
+        ''' Compares the flowrates of simulation's Streams in the iteration just
+            run with those of the previous iteration.'''
+        flowrates = self.stream_flowrates(simulation)
+        previous_flowrates = self.previous_flowrates
+        self.previous_flowrates = flowrates
+
+        if previous_flowrates is None or len(previous_flowrates) != len(flowrates):
+            self.stable_iterations = 0
+            return
+
+        within_tolerance = True
+        max_change = 0
+        for stream_flowrates, previous_stream_flowrates in zip(flowrates, previous_flowrates):
+            for flowrate, previous_flowrate in zip(stream_flowrates, previous_stream_flowrates):
+                change = abs(flowrate - previous_flowrate)
+                max_change = max(max_change, change)
+                if change > self.abs_tol + self.rel_tol * abs(flowrate):
+                    within_tolerance = False
+        self.max_change = max_change
+
+        if not within_tolerance:
+            self.stable_iterations = 0
+            self.steady = False
+            self.steady_iteration = None
+            return
+
+        self.stable_iterations += 1
+        if not self.steady and self.stable_iterations >= self.window:
+            self.steady = True
+            self.steady_iteration = simulation.iteration
+            if self.auto_stop:
+                simulation.running = False
+
+    @property
+    def message(self):
+        ''' Property. Returns a description of the monitor's state.'''
+        if self.steady:
+            return f'Steady state reached at iteration {self.steady_iteration}'
+        return f'Not at steady state (largest change {self.max_change:.3g})'
@@ -2,6 +2,7 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QDialog, QLabel, QLineEdit
 
 from .model_dialog import Ui_Dialog
+from .event import Event
 
 class ModelDialog(QDialog):
     def __init__(self, model, rows=10, columns=5):
@@ -35,8 +36,21 @@ class ModelDialog(QDialog):
         if self.cancel():
             super().reject()
 
+    def edit(self, function, *args):
+        ''' Queues a change to the model, applied by the Simulation between 
+            iterations.'''
+        self.model.simulation.queue_edit(function, *args)
+
+    def volumetric_fractions(self):
+        ''' Returns the model's volumetric_fractions dict, or an even split
+            of the registered Species if it has none.'''
+        if self.model.volumetric_fractions:
+            return self.model.volumetric_fractions
+        return {species: 1 / len(Event.registered_species) 
+                for species in Event.registered_species}
+
     def ok(self):
-        self.model.name = self.fields_table.cellWidget(0, 1).text()
+        self.edit(setattr, self.model, 'name', self.fields_table.cellWidget(0, 1).text())
         return True
 
     def cancel(self):
@@ -52,14 +66,14 @@ class SourceDialog(ModelDialog):
         self.fields_table.setCellWidget(1, 1, QLineEdit(str(self.model.capacity())))
         self.fields_table.setCellWidget(1, 2, QLabel(f'm\N{SUPERSCRIPT THREE} / min'))
         i = 2
-        for species, fraction in self.model.volumetric_fractions.items():
+        for species, fraction in self.volumetric_fractions().items():
             self.fields_table.setCellWidget(i, 0, QLabel(species.name))
             self.fields_table.setCellWidget(i, 1, QLineEdit(str(fraction)))
             i += 1
 
     def ok(self):
         super().ok()
-        self.model.set_capacity(float(self.fields_table.cellWidget(1, 1).text()))
+        self.edit(self.model.set_capacity, float(self.fields_table.cellWidget(1, 1).text()))
         accum = 0
         for j in range(2, self.fields_table.rowCount()):
             try:
@@ -70,13 +84,15 @@ class SourceDialog(ModelDialog):
         if accum != 1:
             return False
 
-        for species, fraction in self.model.volumetric_fractions.items():
+        volumetric_fractions = {}
+        for species, fraction in self.volumetric_fractions().items():
             for j in range(self.fields_table.rowCount()):
                 try:
                     if self.fields_table.cellWidget(j, 0).text() == species.name:
-                        self.model.volumetric_fractions[species] = float(self.fields_table.cellWidget(j, 1).text())
+                        volumetric_fractions[species] = float(self.fields_table.cellWidget(j, 1).text())
                 except Exception:
                     pass
+        self.edit(setattr, self.model, 'volumetric_fractions', volumetric_fractions)
         
         return True
 
@@ -88,7 +104,7 @@ class TankDialog(ModelDialog):
         super().init_dialog()
 
         i = 1
-        for species, fraction in self.model.volumetric_fractions.items():
+        for species, fraction in self.volumetric_fractions().items():
             self.fields_table.setCellWidget(i, 0, QLabel(species.name))
             self.fields_table.setCellWidget(i, 1, QLineEdit(str(fraction)))
             i += 1
@@ -105,13 +121,15 @@ class TankDialog(ModelDialog):
         if accum != 1:
             return False
 
-        for species, fraction in self.model.volumetric_fractions.items():
+        volumetric_fractions = {}
+        for species, fraction in self.volumetric_fractions().items():
             for j in range(self.fields_table.rowCount()):
                 try:
                     if self.fields_table.cellWidget(j, 0).text() == species.name:
-                        self.model.volumetric_fractions[species] = float(self.fields_table.cellWidget(j, 1).text())
+                        volumetric_fractions[species] = float(self.fields_table.cellWidget(j, 1).text())
                 except Exception:
                     pass
+        self.edit(setattr, self.model, 'volumetric_fractions', volumetric_fractions)
         
         return True
 
@@ -128,7 +146,7 @@ class PumpDialog(ModelDialog):
 
     def ok(self):
         super().ok()
-        self.model.set_capacity(float(self.fields_table.cellWidget(1, 1).text()))
+        self.edit(self.model.set_capacity, float(self.fields_table.cellWidget(1, 1).text()))
         return True
 
 
@@ -146,8 +164,8 @@ class HydrocycloneDialog(ModelDialog):
 
     def ok(self):
         super().ok()
-        self.model.rrv = float(self.fields_table.cellWidget(1, 1).text())
-        self.model.rrw = float(self.fields_table.cellWidget(2, 1).text())
+        self.edit(setattr, self.model, 'rrv', float(self.fields_table.cellWidget(1, 1).text()))
+        self.edit(setattr, self.model, 'rrw', float(self.fields_table.cellWidget(2, 1).text()))
         return True
 
 
@@ -1,21 +1,39 @@
-from .species import Species
+from array import array
+
+from .species import Species, SpeciesRegistry
 
 class Event:
-    registered_species = [] 
-    count = 0
+    ''' A parcel of flow. Its magnitudes are stored in a fixed-length array of
+        doubles, indexed by the position of each Species in
+        registered_species. Instances have no __dict__; the number of live
+        Events is tracked by the queues holding them rather than by the
+        Event class.'''
+    __slots__ = ('magnitudes',)
+
+    registry = SpeciesRegistry()
+    # Views of the registry's list and index dict.
+    registered_species = registry.species
+    species_indices = registry.indices
+    zero_magnitudes = array('d')
+
     def __init__(self, generated_species):
         if len(self.registered_species) == 0:
             raise RuntimeError('You must register at least one species')
-    
-        self._species_magnitudes = {species: 0 for species in self.registered_species}
+
+        self.magnitudes = self.zero_magnitudes[:]
 
         for species, magnitude in generated_species:
-            self._species_magnitudes[species] = magnitude
+            self.magnitudes[self.species_indices[species]] = magnitude
 
-        Event.count += 1
-    
-    def __del__(self):
-        Event.count -= 1
+    @classmethod
+    def from_magnitudes(cls, magnitudes):
+        ''' Class method. Returns an Event whose magnitudes are given by the
+            sequence magnitudes, in the order of registered_species.'''
+        if len(magnitudes) != len(cls.registered_species):
+            raise ValueError('A magnitude must be given for every registered species.')
+        event = cls.__new__(cls)
+        event.magnitudes = array('d', magnitudes)
+        return event
 
     @classmethod
     def register_species(cls, species):
@@ -23,40 +41,36 @@ class Event:
         if type(species) is not list:
             species = [species]
         for _species in species:
-            cls.registered_species.append(_species)
+            cls.registry.register(_species)
+        cls.zero_magnitudes = array('d', [0.0]) * len(cls.registered_species)
 
     def aggregate_magnitude(self):
-        ''' Returns the total magnitude of all Species contained in this 
+        ''' Returns the total magnitude of all Species contained in this
             Event.'''
-        total_magnitude = 0
-
-        for species in self._species_magnitudes:
-            total_magnitude += self._species_magnitudes[species]
-
-        return total_magnitude
+        return sum(self.magnitudes)
 
     def species_magnitude(self, species):
-        ''' Returns the magnitude of a specific Species contained in this 
+        ''' Returns the magnitude of a specific Species contained in this
             Event.'''
-        return self._species_magnitudes[species]
+        return self.magnitudes[self.species_indices[species]]
 
     def set_species_magnitude(self, species, magnitude):
-        ''' Sets the magnitude of a specific Species contained in this Event to 
+        ''' Sets the magnitude of a specific Species contained in this Event to
             magnitude.'''
-        self._species_magnitudes[species] = magnitude
+        self.magnitudes[self.species_indices[species]] = magnitude
 
     def add_species_magnitude(self, species, magnitude):
-        ''' Adds magnitude to a specific Species contained in this 
+        ''' Adds magnitude to a specific Species contained in this
             Event.'''
-        self._species_magnitudes[species] += magnitude
+        self.magnitudes[self.species_indices[species]] += magnitude
 
     def split_species_magnitude(self, species, split_fraction):
-        ''' Multiplies the magnitude of a specific Species contained in 
-            this Event by split_fraction and returns the magnitude that 
+        ''' Multiplies the magnitude of a specific Species contained in
+            this Event by split_fraction and returns the magnitude that
             was removed.'''
         if split_fraction < 0 or split_fraction > 1:
             raise ValueError('split_fraction must be between 0 and 1 (inclusive).')
 
         magnitude = self.species_magnitude(species)
         self.set_species_magnitude(species, split_fraction * magnitude)
-        return (split_fraction * magnitude, (1 - split_fraction) * magnitude)
\ No newline at end of file
+        return (split_fraction * magnitude, (1 - split_fraction) * magnitude)
@@ -0,0 +1,73 @@
+from .event import Event
+
+class EventPool:
+    ''' Bounded free list of Events. Events purged from the Simulation are
+        released to the pool and handed back out, with new magnitudes, the
+        next time a Module generates flow, instead of being deallocated and
+        reallocated every iteration.'''
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.free)
+
+    def acquire(self, species_magnitudes):
+        ''' Returns an Event with magnitudes specified by the
+            species_magnitudes iterable of (Species, magnitude) tuples, reusing
+            a released Event if one is available.'''
+        if not self.free:
+            self.misses += 1
+            return Event(species_magnitudes)
+
+        self.hits += 1
+        event = self.free.pop()
+        event.magnitudes[:] = Event.zero_magnitudes
+        for species, magnitude in species_magnitudes:
+            event.magnitudes[Event.species_indices[species]] = magnitude
+        return event
+
+    def acquire_magnitudes(self, magnitudes):
+        ''' Returns an Event with magnitudes given by the array('d')
+            magnitudes, in the order of Event.registered_species, reusing a
+            released Event if one is available.'''
+        if not self.free:
+            self.misses += 1
+            return Event.from_magnitudes(magnitudes)
+
+        self.hits += 1
+        event = self.free.pop()
+        event.magnitudes[:] = magnitudes
+        return event
+
+    def release(self, event):
+        ''' Returns event to the pool. The Event is dropped if the pool is
+            full.'''
+        if len(self.free) < self.max_size:
+            self.free.append(event)
+        else:
+            self.dropped += 1
+
+    def release_all(self, events):
+        ''' Returns every Event in the iterable events to the pool, dropping
+            any that do not fit.'''
+        room = self.max_size - len(self.free)
+        events = list(events)
+        self.free.extend(events[:room])
+        self.dropped += max(0, len(events) - room)
+
+    @property
+    def hit_rate(self):
+        ''' Property. Returns the fraction of acquired Events that were
+            reused.'''
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def reset_counters(self):
+        ''' Sets the hit, miss and dropped counters to 0.'''
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
@@ -1,11 +1,42 @@
+import math
+
+from array import array
 from collections import deque
 
 from .event import Event
 
 class EventQueue:
+    # When True, every read of a queue's running totals is checked against a
+    # full recompute over its Events.
+    debug = False
+
     def __init__(self):
         self.events = deque()
 
+        # Running per-Species totals of all queued Events, kept up to date on
+        # every enqueue, dequeue and edit made through the queue.
+        self._species = list(Event.registered_species)
+        self._species_totals = {species: 0 for species in self._species}
+
+    def _add_totals(self, species_magnitudes, sign=1):
+        for species, magnitude in species_magnitudes.items():
+            self._species_totals[species] += sign * magnitude
+
+    def _add_event_totals(self, event, sign=1):
+        for species, magnitude in zip(self._species, event.magnitudes):
+            self._species_totals[species] += sign * magnitude
+
+    def _reset_totals(self):
+        for species in self._species_totals:
+            self._species_totals[species] = 0
+
+    def _removed(self):
+        ''' Called after Events are removed from the queue. Clears the rounding
+            error accumulated in the running totals once the queue is
+            empty.'''
+        if not self.events:
+            self._reset_totals()
+
     def peek(self):
         ''' Returns the Event at the front of the queue.'''
         return self.events[0]
@@ -13,10 +44,26 @@ class EventQueue:
     def enqueue(self, event):
         ''' Adds an Event to the back of the queue.'''
         self.events.append(event)
+        self._add_event_totals(event)
+
+    def enqueue_uniform(self, species_magnitudes, count, pool=None):
+        ''' Adds count identical Events, with magnitudes specified by the 
+            species_magnitudes dict, to the back of the queue. The Events are 
+            taken from pool if one is given.'''
+        magnitudes = array('d', [species_magnitudes.get(species, 0) for species in self._species])
+        if pool is None:
+            self.events.extend([Event.from_magnitudes(magnitudes) for _ in range(count)])
+        else:
+            self.events.extend([pool.acquire_magnitudes(magnitudes) for _ in range(count)])
+        self._add_totals({species: magnitude * count 
+                          for species, magnitude in zip(self._species, magnitudes)})
 
     def dequeue(self):
         ''' Removes and returns the Event at the front of the queue.'''
-        return self.events.popleft()
+        event = self.events.popleft()
+        self._add_event_totals(event, -1)
+        self._removed()
+        return event
 
     def length(self):
         ''' Returns the length of the queue.'''
@@ -26,6 +73,121 @@ class EventQueue:
         ''' Returns True if the queue is empty, False otherwise.'''
         return len(self.events) == 0
 
+    def clear(self):
+        ''' Removes all Events from the queue.'''
+        self.events.clear()
+        self._reset_totals()
+
+    def queued_rows(self):
+        ''' Returns the magnitudes of all queued Events, front first.'''
+        return [event.magnitudes for event in self.events]
+
+    def restore_rows(self, rows, totals):
+        ''' Replaces the queued Events with one Event per row of the 2-D array
+            rows, whose column sums are totals.'''
+        self.events.clear()
+        self.events.extend([Event.from_magnitudes(row) for row in rows.tolist()])
+        self._species_totals = dict(zip(self._species, totals))
+
+    def purge(self, pool=None):
+        ''' Removes all Events from the queue, releasing them to pool if one 
+            is given.'''
+        if pool is not None:
+            pool.release_all(self.events)
+        self.clear()
+
+    def set_event_species_magnitude(self, event, species, magnitude):
+        ''' Sets the magnitude of species in an Event that is in this queue.
+            Queued Events must be edited through this method so the queue's
+            running totals stay correct.'''
+        self._species_totals[species] += magnitude - event.species_magnitude(species)
+        event.set_species_magnitude(species, magnitude)
+
+    def transfer(self, destination, capacity=float('inf')):
+        ''' Moves Events from the front of this queue to the back of the
+            destination queue, stopping before the Event that would bring the
+            total magnitude moved above capacity. Returns a dictionary mapping
+            each registered Species to the magnitude that was moved.'''
+        if type(self) is not EventQueue or type(destination) is not EventQueue:
+            transferred = {species: 0 for species in Event.registered_species}
+            transferred_magnitude = 0
+            while (not self.empty()
+                   and transferred_magnitude
+                   + self.peek().aggregate_magnitude()
+                   <= capacity):
+                event = self.dequeue()
+                destination.enqueue(event)
+                transferred_magnitude += event.aggregate_magnitude()
+                for species in Event.registered_species:
+                    transferred[species] += event.species_magnitude(species)
+            return transferred
+
+        # Both queues are EventQueues, so the running totals can be updated
+        # once for the whole transfer. The running totals can differ from the
+        # sum of the Events' magnitudes by rounding, so when capacity is
+        # within rounding of them the Events are counted one by one, as 
+        # every other queue does.
+        magnitude = self.magnitude
+        if capacity == float('inf') or capacity - magnitude > 1e-9 * (1 + abs(magnitude)):
+            transferred = dict(self._species_totals)
+            destination.events.extend(self.events)
+            self.events.clear()
+        else:
+            transferred = {species: 0 for species in Event.registered_species}
+            transferred_magnitude = 0
+            while self.events:
+                event = self.events[0]
+                magnitude = event.aggregate_magnitude()
+                if transferred_magnitude + magnitude > capacity:
+                    break
+                destination.events.append(self.events.popleft())
+                transferred_magnitude += magnitude
+                for species, species_magnitude in zip(self._species, event.magnitudes):
+                    transferred[species] += species_magnitude
+            self._add_totals(transferred, -1)
+
+        destination._add_totals(transferred)
+        self._removed()
+        return transferred
+
+    def transfer_uniform(self, destination, count, species_magnitudes):
+        ''' Moves up to count Events from the front of this queue to the back
+            of the destination queue, setting the magnitudes of each moved
+            Event as specified by the species_magnitudes dict. Returns the
+            number of Events moved.'''
+        if type(self) is not EventQueue or type(destination) is not EventQueue:
+            transferred = 0
+            while not self.empty() and transferred < count:
+                event = self.dequeue()
+                for species, magnitude in species_magnitudes.items():
+                    event.set_species_magnitude(species, magnitude)
+                destination.enqueue(event)
+                transferred += 1
+            return transferred
+
+        # Both queues are EventQueues, so the running totals can be updated
+        # once for the whole transfer.
+        transferred = min(count, len(self.events))
+        if transferred == len(self.events):
+            removed = dict(self._species_totals)
+        else:
+            removed = {species: 0 for species in self._species}
+            for i in range(transferred):
+                for species, magnitude in zip(self._species, self.events[i].magnitudes):
+                    removed[species] += magnitude
+
+        magnitudes = array('d', [species_magnitudes[species] for species in self._species])
+        for _ in range(transferred):
+            event = self.events.popleft()
+            event.magnitudes[:] = magnitudes
+            destination.events.append(event)
+
+        self._add_totals(removed, -1)
+        self._removed()
+        destination._add_totals({species: magnitude * transferred
+                                 for species, magnitude in species_magnitudes.items()})
+        return transferred
+
     def events_per_magnitude(self, event_magnitude):
         ''' Returns the number of Events, starting at the front of the queue,
             that contains, in aggregate, the magnitude specified by event_magnitude.
@@ -39,21 +201,37 @@ class EventQueue:
         else:
             return 0
 
+    def recompute_species_magnitudes(self):
+        ''' Returns a dictionary mapping each registered Species to its
+            aggregate magnitude in the queue, summed over every queued
+            Event.'''
+        res = {species: 0 for species in Event.registered_species}
+        for event in self.events:
+            for species in Event.registered_species:
+                res[species] += event.species_magnitude(species)
+        return res
+
+    def check_totals(self):
+        ''' Raises a RuntimeError if the running totals of this queue do not
+            match a full recompute.'''
+        for species, total in self.recompute_species_magnitudes().items():
+            if not math.isclose(self._species_totals[species], total,
+                                rel_tol=1e-9, abs_tol=1e-9):
+                raise RuntimeError(f'Running total of {species.name} is '
+                                   f'{self._species_totals[species]}, expected {total}.')
+
     @property
     def magnitude(self):
-        ''' Property. Returns the total volume of all Events in the 
+        ''' Property. Returns the total volume of all Events in the
             queue.'''
-        res = 0
-        for event in self.events:
-            res += event.aggregate_magnitude()
-        return res
+        if self.debug:
+            self.check_totals()
+        return sum(self._species_totals.values())
 
     @property
     def species_magnitudes(self):
-        ''' Property. Returns a dictionary mapping each registered Species to its 
+        ''' Property. Returns a dictionary mapping each registered Species to its
             corresponding aggregate magnitude in the queue.'''
-        res = {species: 0 for species in Event.registered_species}
-        for event in self.events:
-            for species in Event.registered_species:
-                res[species] += event.species_magnitude(species)
-        return res
\ No newline at end of file
+        if self.debug:
+            self.check_totals()
+        return dict(self._species_totals)
@@ -0,0 +1,192 @@
+''' Saving and loading of flowsheets. A flowsheet file is JSON holding the
+    registered Species and the Modules, Streams and Readouts of a Simulation:
+    each Module's type, name, settings and Socket capacities, the Sockets
+    each Stream connects, the Stream each Readout displays and the layout of
+    every View. Loading rebuilds the Modules without creating any Views, so
+    a flowsheet can be loaded headless. The layout read for each Model is
+    kept in its layout attribute, from which the GUI creates Views as they
+    scroll into sight; Models without a View are saved with that layout
+    unchanged. Infinite numbers, such as the capacity of a Sink, are stored
+    as the strings 'inf' and '-inf', so that files are strict JSON.'''
+
+import json
+import math
+
+from .event import Event
+from .species import Species
+from .simulation import Simulation
+from .models import Source, Tank, Pump, Sink, Splitter, Hydrocyclone, Joiner, Readout, FiberReadout
+
+
+FORMAT = 'flowsheet'
+# Incremented whenever the file format changes. Files written by a later
+# version are rejected.
+VERSION = 1
+
+# Maps the type names stored in flowsheet files to Module and Readout types.
+# Custom Module types must be added before files containing them are loaded.
+module_classes = {cls.__name__: cls for cls in (Source, Tank, Pump, Sink, Splitter,
+                                                Hydrocyclone, Joiner)}
+readout_classes = {cls.__name__: cls for cls in (Readout, FiberReadout)}
+
+# Attributes saved for each Module type, besides its capacity and those of its
+# Sockets. Subclasses save the attributes of their parents.
+saved_attributes = {
+    Source: ('volumetric_fractions', 'event_rate'),
+    Tank: ('volumetric_fractions', 'event_rate'),
+    Splitter: ('split_fraction',),
+    Hydrocyclone: ('rrv', 'rrw')
+}
+
+def layout(model):
+    ''' Returns the layout of model's View, or the layout it was loaded with
+        if it has no View.'''
+    if model.view:
+        return model.view.layout()
+    return model.layout
+
+def module_attributes(module):
+    names = []
+    for module_class in type(module).__mro__:
+        names.extend(name for name in saved_attributes.get(module_class, ())
+                     if name not in names)
+    return names
+
+def save_value(value):
+    ''' Returns value with any Species keys replaced by their names and
+        infinite numbers replaced by 'inf' or '-inf'.'''
+    if isinstance(value, dict):
+        return {key.name if isinstance(key, Species) else key: save_value(item)
+                for key, item in value.items()}
+    if isinstance(value, float) and math.isinf(value):
+        return 'inf' if value > 0 else '-inf'
+    return value
+
+def load_value(simulation, value):
+    ''' Returns value with any Species names in its keys replaced by the
+        registered Species and 'inf' and '-inf' replaced by infinite
+        numbers.'''
+    if isinstance(value, dict):
+        return {simulation.species(key): load_value(simulation, item)
+                for key, item in value.items()}
+    if value in ('inf', '-inf'):
+        return float(value)
+    return value
+
+def flowsheet_to_dict(simulation):
+    ''' Returns a dict describing the flowsheet of simulation, ready to be
+        written as JSON.'''
+    module_indices = {module: i for i, module in enumerate(simulation.modules)}
+    modules = [{
+        'type': type(module).__name__,
+        'name': module.name,
+        'capacity': save_value(module.capacity()),
+        'attributes': {name: save_value(getattr(module, name))
+                       for name in module_attributes(module)},
+        'inlet_capacities': [save_value(socket.capacity) for socket in module.inlet_sockets],
+        'outlet_capacities': [save_value(socket.capacity) for socket in module.outlet_sockets],
+        'layout': layout(module)
+    } for module in simulation.modules]
+
+    streams = []
+    stream_indices = {}
+    for stream in simulation.streams:
+        inlet_socket, outlet_socket = stream.inlet_socket, stream.outlet_socket
+        if not inlet_socket or not outlet_socket:
+            continue
+        stream_indices[stream] = len(streams)
+        streams.append({
+            'name': stream.name,
+            'from': [module_indices[inlet_socket.module],
+                     inlet_socket.module.outlet_sockets.index(inlet_socket)],
+            'to': [module_indices[outlet_socket.module],
+                   outlet_socket.module.inlet_sockets.index(outlet_socket)],
+            'layout': layout(stream)
+        })
+
+    readouts = [{
+        'type': type(readout).__name__,
+        'name': readout.name,
+        'stream': stream_indices[readout.stream],
+        'layout': layout(readout)
+    } for readout in simulation.displays if readout.stream in stream_indices]
+
+    return {
+        'format': FORMAT,
+        'version': VERSION,
+        'species': [{'name': species.name, 'properties': species.properties}
+                    for species in Event.registered_species],
+        'modules': modules,
+        'streams': streams,
+        'readouts': readouts
+    }
+
+def flowsheet_from_dict(data, simulation):
+    ''' Adds the Modules, Streams and Readouts described by data, as returned
+        by flowsheet_to_dict, to simulation. Species in data that are not
+        registered yet are registered. Raises a ValueError if data is not a
+        flowsheet of a supported version, or if it has Species that are not
+        registered and a Simulation has run since the last one was
+        created.'''
+    if data.get('format') != FORMAT:
+        raise ValueError('Not a flowsheet file.')
+    if data.get('version', 0) > VERSION:
+        raise ValueError(f'Flowsheet file version {data["version"]} is newer than the '
+                         f'supported version {VERSION}.')
+
+    registered_names = {species.name for species in Event.registered_species}
+    new_species = [Species(record['name'], record['properties']) for record in data['species']
+                   if record['name'] not in registered_names]
+    if new_species and Event.registry.frozen:
+        raise ValueError('The flowsheet has Species that cannot be registered into a '
+                         'Simulation that has run: '
+                         + ', '.join(species.name for species in new_species))
+    if new_species:
+        Event.register_species(new_species)
+
+    modules = []
+    for record in data['modules']:
+        module = module_classes[record['type']](simulation, record['name'])
+        module.set_capacity(load_value(simulation, record['capacity']))
+        for name, value in record['attributes'].items():
+            setattr(module, name, load_value(simulation, value))
+        module.layout = record['layout']
+        modules.append(module)
+
+    streams = []
+    for record in data['streams']:
+        outlet_module, outlet_index = record['from']
+        inlet_module, inlet_index = record['to']
+        stream = simulation.connect(modules[outlet_module].outlet_sockets[outlet_index],
+                                    modules[inlet_module].inlet_sockets[inlet_index],
+                                    record['name'])
+        stream.layout = record['layout']
+        streams.append(stream)
+
+    # Connecting pull Sockets copies capacities between them, so the saved
+    # capacities are restored afterwards.
+    for module, record in zip(modules, data['modules']):
+        for socket, capacity in zip(module.inlet_sockets, record['inlet_capacities']):
+            socket.capacity = load_value(simulation, capacity)
+        for socket, capacity in zip(module.outlet_sockets, record['outlet_capacities']):
+            socket.capacity = load_value(simulation, capacity)
+
+    for record in data['readouts']:
+        readout = simulation.add_readout(streams[record['stream']],
+                                         readout_classes[record['type']], record['name'])
+        readout.layout = record['layout']
+    return simulation
+
+def save_flowsheet(simulation, path):
+    ''' Writes the flowsheet of simulation to the file at path.'''
+    with open(path, 'w') as file:
+        json.dump(flowsheet_to_dict(simulation), file, separators=(',', ':'), allow_nan=False)
+
+def load_flowsheet(path, simulation=None):
+    ''' Loads the flowsheet in the file at path into simulation, or into a new
+        headless Simulation if none is given, and returns the Simulation.'''
+    with open(path) as file:
+        data = json.load(file)
+    if simulation is None:
+        simulation = Simulation()
+    return flowsheet_from_dict(data, simulation)
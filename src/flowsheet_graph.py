@@ -0,0 +1,163 @@
+''' Functions for analysing the graph formed by the Modules of a Simulation
+    and the Streams connecting them. Flow always travels from a Module's
+    outlet Socket to the inlet Socket of the Module at the other end of the
+    Stream, for both push and pull Streams.'''
+
+from .models import PullOutletSocket
+
+
+def outlet_streams(module):
+    ''' Returns the connected Streams leaving module, in outlet Socket
+        order.'''
+    return [socket.stream for socket in module.outlet_sockets
+            if socket.stream and socket.mate]
+
+def inlet_streams(module):
+    ''' Returns the connected Streams entering module, in inlet Socket
+        order.'''
+    return [socket.stream for socket in module.inlet_sockets
+            if socket.stream and socket.mate]
+
+def downstream_modules(module):
+    ''' Returns the Modules fed by module, in outlet Socket order.'''
+    return [stream.outlet_socket.module for stream in outlet_streams(module)]
+
+def upstream_modules(module):
+    ''' Returns the Modules feeding module, in inlet Socket order.'''
+    return [stream.inlet_socket.module for stream in inlet_streams(module)]
+
+def strongly_connected_components(modules):
+    ''' Returns the strongly connected components of the graph of modules as
+        lists of Modules. Components are ordered so that every component comes
+        after all components feeding it. Uses an iterative version of
+        Tarjan's algorithm.'''
+    modules = list(modules)
+    members = set(modules)
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in modules:
+        if root in index:
+            continue
+        work = [(root, iter(downstream_modules(root)))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            module, successors = work[-1]
+            for successor in successors:
+                if successor not in members:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(downstream_modules(successor))))
+                    break
+                elif successor in on_stack:
+                    lowlink[module] = min(lowlink[module], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[module])
+                if lowlink[module] == index[module]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.append(member)
+                        if member is module:
+                            break
+                    components.append(component)
+
+    # Tarjan's algorithm finds components downstream first.
+    components.reverse()
+    return components
+
+def is_cyclic(component):
+    ''' Returns True if the strongly connected component contains a recycle
+        loop.'''
+    if len(component) > 1:
+        return True
+    module = component[0]
+    return module in downstream_modules(module)
+
+def order_component(component, modules):
+    ''' Returns the Modules of component in the order they should be
+        evaluated and the Streams that must be torn to break its recycle
+        loops. The order is a depth-first ordering starting from the
+        Modules fed from outside the component, taken in the order they
+        appear in modules. Torn Streams are those that feed a Module
+        evaluated no later than the one they leave.'''
+    members = set(component)
+    entries = [module for module in modules if module in members
+               and any(upstream not in members for upstream in upstream_modules(module))]
+    roots = entries + [module for module in modules if module in members]
+
+    visited = set()
+    postorder = []
+    for root in roots:
+        if root in visited:
+            continue
+        visited.add(root)
+        work = [(root, iter(downstream_modules(root)))]
+        while work:
+            module, successors = work[-1]
+            for successor in successors:
+                if successor in members and successor not in visited:
+                    visited.add(successor)
+                    work.append((successor, iter(downstream_modules(successor))))
+                    break
+            else:
+                work.pop()
+                postorder.append(module)
+
+    order = postorder[::-1]
+    position = {module: i for i, module in enumerate(order)}
+    tear_streams = [stream for module in order for stream in outlet_streams(module)
+                    if stream.outlet_socket.module in members
+                    and position[stream.outlet_socket.module] <= position[module]]
+    return order, tear_streams
+
+def is_pull_supplier(module):
+    ''' Returns True if module has no connected inlets and only supplies flow
+        on demand through pull outlets, as a Tank does.'''
+    return (not inlet_streams(module) and bool(outlet_streams(module))
+            and all(isinstance(socket, PullOutletSocket) for socket in module.outlet_sockets))
+
+def execution_order(modules):
+    ''' Returns modules in the order they should be simulated each
+        iteration. Strongly connected components are taken upstream first,
+        so flow travels as far downstream as possible in a single iteration.
+        The Modules of each recycle loop are ordered by order_component,
+        starting from the Module fed earliest in the order built so far, so
+        the result does not depend on the order Modules were added in. Pull
+        suppliers are left out of the graph and scheduled immediately before
+        the first Module pulling from them: the Modules pushing into a Pump
+        run before it computes its demand, and the Events generated by its
+        Tank are pulled in the same iteration.'''
+    suppliers = [module for module in modules if is_pull_supplier(module)]
+    order = []
+    for component in strongly_connected_components(
+            [module for module in modules if module not in suppliers]):
+        if not is_cyclic(component):
+            order.extend(component)
+            continue
+        position = {module: i for i, module in enumerate(order)}
+        def feed_position(module):
+            return min((position[upstream] for upstream in upstream_modules(module)
+                        if upstream in position), default=len(position))
+        order.extend(order_component(component, sorted(component, key=feed_position))[0])
+
+    scheduled = [supplier for supplier in suppliers
+                 if not any(downstream in order for downstream in downstream_modules(supplier))]
+    for module in order:
+        for upstream in upstream_modules(module):
+            if upstream in suppliers and upstream not in scheduled:
+                scheduled.append(upstream)
+        scheduled.append(module)
+    return scheduled
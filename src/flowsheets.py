@@ -0,0 +1,83 @@
+''' Builders for the reference hydrocyclone systems shown in the README
+    demonstrations. Each builder adds its Modules and Streams to the given
+    Simulation, names every Module uniquely and returns a dict of the
+    Streams of interest.'''
+
+from .models import Source, Tank, Pump, Sink, Hydrocyclone, Joiner
+
+
+def default_fractions(simulation, fiber_fraction):
+    ''' Returns volumetric fractions of fiber_fraction fiber in water.'''
+    return {simulation.species('water'): 1 - fiber_fraction,
+            simulation.species('fiber'): fiber_fraction}
+
+def single_stage(simulation, source_flow=1000, pump_capacity=5000, rrv=0.08, rrw=0.14,
+                 event_rate=1000):
+    ''' Builds the single-stage hydrocyclone system: a Source and a dilution
+        Tank feeding a Pump, which feeds a Hydrocyclone whose accepts and
+        rejects go to Sinks.'''
+    source = Source(simulation, 'Source', source_flow, default_fractions(simulation, 0.01), event_rate)
+    tank = Tank(simulation, 'Tank1', 0, default_fractions(simulation, 0.00014), event_rate)
+    pump = Pump(simulation, 'Pump1', pump_capacity)
+    hydrocyclone = Hydrocyclone(simulation, 'Stage1', rrv=rrv, rrw=rrw)
+    accepts = Sink(simulation, 'Accepts')
+    rejects = Sink(simulation, 'Rejects')
+
+    connect = simulation.connect
+    return {
+        'feed': connect(source.outlet_sockets[0], pump.inlet_sockets[0], 'Feed'),
+        'dilution1': connect(tank.outlet_sockets[0], pump.inlet_sockets[1], 'Dilution1'),
+        'stage1_feed': connect(pump.outlet_sockets[0], hydrocyclone.inlet_sockets[0], 'Stage1Feed'),
+        'accepts': connect(hydrocyclone.outlet_sockets[0], accepts.inlet_sockets[0], 'Accepts'),
+        'rejects': connect(hydrocyclone.outlet_sockets[1], rejects.inlet_sockets[0], 'Rejects')
+    }
+
+def cascade(simulation, stages=3, source_flow=1000, pump_capacity=5000, capacity_ratio=0.25,
+            rrv=0.08, rrw=0.14, event_rate=1000):
+    ''' Builds a forward hydrocyclone cascade with the given number of stages.
+        Stage 1 is fed by a Source and sends its accepts to a Sink. The rejects
+        of each stage feed the next stage, whose accepts are recycled to the
+        feed of the stage before it through a Joiner. The rejects of the last
+        stage go to a Sink. Each stage has its own Pump and dilution Tank, with
+        each Pump's capacity capacity_ratio times that of the stage before
+        it.'''
+    connect = simulation.connect
+    source = Source(simulation, 'Source', source_flow, default_fractions(simulation, 0.01), event_rate)
+    streams = {}
+    upstream_socket = source.outlet_sockets[0]
+    joiners = []
+    hydrocyclones = []
+
+    for stage in range(1, stages + 1):
+        pump = Pump(simulation, f'Pump{stage}', pump_capacity * capacity_ratio ** (stage - 1))
+        fiber_fraction = 0.00014 if stage == 1 else 0
+        tank = Tank(simulation, f'Tank{stage}', 0, default_fractions(simulation, fiber_fraction), event_rate)
+        hydrocyclone = Hydrocyclone(simulation, f'Stage{stage}', rrv=rrv, rrw=rrw)
+
+        if stage < stages:
+            joiner = Joiner(simulation, f'Joiner{stage}')
+            streams[f'stage{stage}_inlet'] = connect(upstream_socket, joiner.inlet_sockets[0],
+                                                     f'Stage{stage}Inlet')
+            connect(joiner.outlet_sockets[0], pump.inlet_sockets[0], f'Joiner{stage}Outlet')
+            joiners.append(joiner)
+        else:
+            streams[f'stage{stage}_inlet'] = connect(upstream_socket, pump.inlet_sockets[0],
+                                                     f'Stage{stage}Inlet')
+        streams[f'dilution{stage}'] = connect(tank.outlet_sockets[0], pump.inlet_sockets[1],
+                                              f'Dilution{stage}')
+        streams[f'stage{stage}_feed'] = connect(pump.outlet_sockets[0], hydrocyclone.inlet_sockets[0],
+                                                f'Stage{stage}Feed')
+
+        if stage > 1:
+            streams[f'stage{stage}_accepts'] = connect(hydrocyclone.outlet_sockets[0],
+                                                       joiners[stage - 2].inlet_sockets[1],
+                                                       f'Stage{stage}Accepts')
+        upstream_socket = hydrocyclone.outlet_sockets[1]
+        hydrocyclones.append(hydrocyclone)
+
+    accepts = Sink(simulation, 'Accepts')
+    rejects = Sink(simulation, 'Rejects')
+    streams['accepts'] = connect(hydrocyclones[0].outlet_sockets[0], accepts.inlet_sockets[0], 'Accepts')
+    streams['rejects'] = connect(upstream_socket, rejects.inlet_sockets[0], 'Rejects')
+    streams['feed'] = streams['stage1_inlet']
+    return streams
@@ -0,0 +1,40 @@
+''' Fast number formatting for Readouts.'''
+
+import numbers
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096, typed=True)
+def round_sigfigs(value, sigfigs=3):
+    ''' Returns value rounded to sigfigs significant figures. Gives the same
+        results as sigfig.round(value, sigfigs=sigfigs) for finite values:
+        the shortest decimal representation of value is rounded half away
+        from zero, and ints stay ints. Numpy scalars are converted to int or
+        float first. Results are memoised, since Readouts show the same
+        values tick after tick.'''
+    if not value or value != value or value in (float('inf'), float('-inf')):
+        return value
+
+    # Integers are kept exact; anything else, including numpy scalars whose
+    # repr is not a plain number, is rounded as a float.
+    value = int(value) if isinstance(value, numbers.Integral) else float(value)
+    text = repr(value)
+    sign = ''
+    if text[0] == '-':
+        sign = '-'
+        text = text[1:]
+    mantissa, _, exponent = text.partition('e')
+    whole, _, fraction = mantissa.partition('.')
+    digits = (whole + fraction).lstrip('0')
+    # Power of ten of the last digit in digits.
+    exponent = int(exponent or 0) - len(fraction)
+    if len(digits) <= sigfigs:
+        return value
+
+    exponent += len(digits) - sigfigs
+    kept = int(digits[:sigfigs])
+    if digits[sigfigs] >= '5':
+        kept += 1
+    if isinstance(value, int):
+        return int(f'{sign}{kept}') * 10 ** exponent
+    return float(f'{sign}{kept}e{exponent}')
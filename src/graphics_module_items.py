@@ -7,7 +7,7 @@ class GraphicsModuleItem(QGraphicsPixmapItem):
         self.model = model
 
     def mousePressEvent(self, event):
-        self.model.dialog = self.model.dialog_class(self.model)
+        self.model.dialog = self.model.view.dialog_class(self.model)
         self.model.dialog.show()
 
 class GraphicsPushSocketItem(QGraphicsRectItem):
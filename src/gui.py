@@ -1,16 +1,26 @@
 from enum import Enum
 
-from PyQt5.QtWidgets import QAction, QPushButton, QLabel, QWidget, QGraphicsScene, QMainWindow, QGraphicsItem, QGraphicsLineItem, QGraphicsRectItem
+from PyQt5.QtWidgets import QAction, QFileDialog, QInputDialog, QPushButton, QLabel, QWidget, QGraphicsScene, QMainWindow, QGraphicsItem, QGraphicsLineItem, QGraphicsRectItem
 from PyQt5.QtGui import QGuiApplication, QPixmap, QWindow, QPen, QTransform, QColor
-from PyQt5.QtCore import QTimer, pyqtSlot, QEvent, Qt, QLineF, QPoint, QPointF, QRectF
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, QEvent, Qt, QLineF, QPoint, QPointF, QRectF
 
 from .simulation import Simulation
+from .incremental import SubgraphFreezer
+from .simulation_thread import SimulationThread
 from .main_window import Ui_MainWindow
 from .models import Source, Tank, Pump, Sink, Stream, Socket, Splitter, Hydrocyclone, Joiner, Pump, Readout, FiberReadout
 from .event import Event
-from .views import StreamView, ReadoutView
+from .views import StreamView, ReadoutView, attach_view, restore_view
+from .flowsheet_file import save_flowsheet, load_flowsheet
+from .checkpoint import save_checkpoint, load_checkpoint
+from .profiler_panel import ProfilerPanel
 
 
+class SnapshotRelay(QObject):
+    ''' Delivers Snapshots emitted on the SimulationThread to slots on the UI 
+        thread.'''
+    snapshot_ready = pyqtSignal(object)
+
 
 class ApplicationWindow(QMainWindow):
     class State(Enum):
@@ -46,14 +56,46 @@ class ApplicationWindow(QMainWindow):
         self.show()
 
         self.views = []
-        self.simulation = Simulation(self)
-       
-        self.timer = QTimer()
-        self.timer.setInterval(100)
-        self.timer.timeout.connect(self.simulation.run)
-
+        # Models loaded from a flowsheet file whose Views have not been 
+        # created yet, because they have not been scrolled into sight.
+        self.pending_views = []
+        # File the flowsheet was last loaded from or saved to.
+        self.path = None
+        self.relay = SnapshotRelay()
+        self.relay.snapshot_ready.connect(self.show_snapshot)
+
+        self.ui.actionNew.triggered.connect(self.new_flowsheet)
+        self.ui.actionOpen.triggered.connect(self.open_flowsheet)
+        self.ui.actionSave.triggered.connect(self.save_flowsheet)
+        self.ui.actionSave_As.triggered.connect(self.save_flowsheet_as)
+        self.ui.graphicsView.horizontalScrollBar().valueChanged.connect(self.attach_visible_views)
+        self.ui.graphicsView.verticalScrollBar().valueChanged.connect(self.attach_visible_views)
         self.ui.actionStart.triggered.connect(self.run_sim)
         self.ui.actionStop.triggered.connect(self.stop_sim)
+        self.action_solve = self.ui.toolBar_2.addAction('Solve')
+        self.action_solve.triggered.connect(self.solve_steady_state)
+        self.action_auto_stop = self.ui.toolBar_2.addAction('Auto-stop')
+        self.action_auto_stop.setCheckable(True)
+        self.action_auto_stop.toggled.connect(self.set_auto_stop)
+        self.action_max_speed = self.ui.toolBar_2.addAction('Max speed')
+        self.action_max_speed.setCheckable(True)
+        self.action_max_speed.toggled.connect(self.set_max_speed)
+        self.action_fast_forward = self.ui.toolBar_2.addAction('Fast-forward')
+        self.action_fast_forward.triggered.connect(self.fast_forward)
+        self.action_save_state = self.ui.toolBar_2.addAction('Save state')
+        self.action_save_state.triggered.connect(self.save_state)
+        self.action_load_state = self.ui.toolBar_2.addAction('Load state')
+        self.action_load_state.triggered.connect(self.load_state)
+        self.action_profile = self.ui.toolBar_2.addAction('Profile')
+        self.action_profile.setCheckable(True)
+        self.action_profile.toggled.connect(self.set_profiling)
+        self.profiler_panel = ProfilerPanel(self)
+        self.profiler_panel.closed.connect(lambda: self.action_profile.setChecked(False))
+        self.addDockWidget(Qt.RightDockWidgetArea, self.profiler_panel)
+        self.profiler_panel.hide()
+        self.new_simulation()
+        self.rate_label = QLabel()
+        self.statusBar().addPermanentWidget(self.rate_label)
         self.ui.actionSource.triggered.connect(self.create_source_slot)
         self.ui.actionTank.triggered.connect(self.create_tank_slot)
         self.ui.actionPump.triggered.connect(self.create_pump_slot)
@@ -79,6 +121,101 @@ class ApplicationWindow(QMainWindow):
         self.floating_model = None
         self.floating_line = None
 
+    def new_simulation(self):
+        ''' Replaces the Simulation with a new, empty one.'''
+        # Whole-Event rounding makes flows jitter far above the default 
+        # tolerances, so Modules are frozen once they are steady to about 
+        # the precision Readouts display.
+        self.simulation = Simulation(self, freezer=SubgraphFreezer(rel_tol=1e-3))
+        # The Simulation is stepped on a background thread and its results
+        # are shown on the UI thread as Snapshots arrive.
+        self.simulation_thread = SimulationThread(self.simulation, 0.1, 
+                                                  self.relay.snapshot_ready.emit)
+        self.steady = False
+        self.simulation.monitor.auto_stop = self.action_auto_stop.isChecked()
+        self.simulation_thread.max_speed = self.action_max_speed.isChecked()
+        self.profiler_panel.profiler = self.simulation.profiler
+        if self.action_profile.isChecked():
+            self.simulation.profiler.enable()
+
+    def clear_flowsheet(self):
+        ''' Stops the Simulation and removes every Model and View.'''
+        self.stop_sim()
+        self.floating_model = None
+        self.floating_line = None
+        self.scene.clear()
+        self.views = []
+        self.pending_views = []
+        self.new_simulation()
+
+    def new_flowsheet(self):
+        self.clear_flowsheet()
+        self.path = None
+
+    def open_flowsheet(self):
+        path, _ = QFileDialog.getOpenFileName(self, 'Open flowsheet', '', 'Flowsheets (*.json)')
+        if not path:
+            return
+        self.clear_flowsheet()
+        try:
+            load_flowsheet(path, self.simulation)
+        except (OSError, ValueError, KeyError) as e:
+            self.clear_flowsheet()
+            self.statusBar().showMessage(f'Could not open {path}: {e}')
+            return
+        self.path = path
+
+        # Views are only created for the part of the scene in sight, the 
+        # rest as it is scrolled to.
+        self.pending_views = [model for model in self.simulation.modules 
+                              + self.simulation.streams + self.simulation.displays
+                              if model.layout]
+        scene_rect = self.scene.sceneRect()
+        for model in self.pending_views:
+            if model.layout.get('bounds'):
+                scene_rect |= QRectF(*model.layout['bounds'])
+        self.scene.setSceneRect(scene_rect)
+        self.attach_visible_views()
+        self.statusBar().showMessage(f'Opened {path}')
+
+    def attach_visible_views(self):
+        ''' Creates the Views of loaded Models that are in sight.'''
+        if not self.pending_views:
+            return
+        view = self.ui.graphicsView
+        visible_rect = view.mapToScene(view.viewport().rect()).boundingRect()
+        pending_views = []
+        with self.simulation.lock:
+            for model in self.pending_views:
+                bounds = model.layout.get('bounds')
+                if bounds is None or visible_rect.intersects(QRectF(*bounds)):
+                    restore_view(model, self.scene)
+                else:
+                    pending_views.append(model)
+        self.pending_views = pending_views
+
+    def save_flowsheet(self):
+        if not self.path:
+            self.save_flowsheet_as()
+            return
+        try:
+            with self.simulation.lock:
+                save_flowsheet(self.simulation, self.path)
+        except OSError as e:
+            self.statusBar().showMessage(f'Could not save {self.path}: {e}')
+            return
+        self.statusBar().showMessage(f'Saved {self.path}')
+
+    def save_flowsheet_as(self):
+        path, _ = QFileDialog.getSaveFileName(self, 'Save flowsheet', '', 'Flowsheets (*.json)')
+        if path:
+            self.path = path
+            self.save_flowsheet()
+
+    def closeEvent(self, event):
+        self.simulation_thread.stop()
+        super().closeEvent(event)
+
     def map_from_global_to_scene(self, pos):
         pos = self.ui.graphicsView.parent().mapFromParent(pos)
         pos = self.ui.graphicsView.mapFromParent(pos)
@@ -151,9 +288,16 @@ class ApplicationWindow(QMainWindow):
                 self.state = ApplicationWindow.idle
                 self.floating_model = None
 
+        elif event.type() == QEvent.Resize and source is self.ui.graphicsView.viewport():
+            self.attach_visible_views()
+
         return super(ApplicationWindow, self).eventFilter(source, event)
 
     def mousePressEvent(self, event):
+        with self.simulation.lock:
+            self.handle_mouse_press(event)
+
+    def handle_mouse_press(self, event):
         scene_pos = self.map_from_global_to_scene(event.pos())
         if self.state is ApplicationWindow.idle:
             stream = self.check_for_click_collisions(scene_pos)
@@ -171,15 +315,93 @@ class ApplicationWindow(QMainWindow):
 
     def run_sim(self):
         self.state = ApplicationWindow.running
-        self.timer.start()
+        self.simulation_thread.start()
 
     def stop_sim(self):
         self.state = ApplicationWindow.idle
-        self.timer.stop()
+        self.simulation_thread.stop()
+
+    @pyqtSlot(object)
+    def show_snapshot(self, snapshot):
+        ''' Updates the displays from a Snapshot of the Simulation. The
+            QGraphicsScene merges the updates of changed items into one 
+            repaint, and the viewport is only repainted if a display changed.'''
+        changed = False
+        for display in self.simulation.displays:
+            if display.stream in snapshot.flowrates:
+                changed |= display.update(snapshot.flowrates[display.stream])
+        if changed:
+            self.ui.graphicsView.viewport().update()
+        if self.profiler_panel.isVisible():
+            self.profiler_panel.refresh()
+        self.rate_label.setText(f'Iteration {snapshot.iteration}  '
+                                f'{snapshot.iterations_per_second:.0f} iterations/s')
+        if snapshot.steady != self.steady:
+            self.steady = snapshot.steady
+            self.statusBar().showMessage(snapshot.message)
+        if not snapshot.running and self.state is ApplicationWindow.running:
+            self.stop_sim()
+
+    def set_auto_stop(self, auto_stop):
+        self.simulation.queue_edit(setattr, self.simulation.monitor, 'auto_stop', auto_stop)
+
+    def set_max_speed(self, max_speed):
+        self.simulation_thread.max_speed = max_speed
+
+    def set_profiling(self, profiling):
+        ''' Enables or disables the Profiler and shows or hides its panel.'''
+        if profiling:
+            self.simulation.profiler.enable()
+            self.profiler_panel.show()
+            self.profiler_panel.refresh(force=True)
+        else:
+            self.simulation.profiler.disable()
+            self.profiler_panel.hide()
+
+    def fast_forward(self):
+        iterations, ok = QInputDialog.getInt(self, 'Fast-forward', 'Iterations', 100, 1, 10 ** 7)
+        if ok:
+            self.simulation_thread.fast_forward(iterations)
+
+    def solve_steady_state(self):
+        try:
+            solver = self.simulation.warm_start()
+        except RuntimeError as e:
+            self.statusBar().showMessage(str(e))
+            return
+        self.statusBar().showMessage(f'Steady state solved in {solver.iterations} iterations')
+
+    def save_state(self):
+        ''' Saves a checkpoint of the queued Events and flowrates of the 
+            Simulation.'''
+        path, _ = QFileDialog.getSaveFileName(self, 'Save state', '', 'Checkpoints (*.chk)')
+        if not path:
+            return
+        try:
+            save_checkpoint(self.simulation, path)
+        except OSError as e:
+            self.statusBar().showMessage(f'Could not save {path}: {e}')
+            return
+        self.statusBar().showMessage(f'Saved state at iteration {self.simulation.iteration - 1}')
+
+    def load_state(self):
+        ''' Restores a checkpoint of the queued Events and flowrates of the 
+            Simulation, taken from the same flowsheet.'''
+        path, _ = QFileDialog.getOpenFileName(self, 'Load state', '', 'Checkpoints (*.chk)')
+        if not path:
+            return
+        try:
+            with self.simulation.lock:
+                load_checkpoint(self.simulation, path)
+                self.simulation.update_displays()
+        except (OSError, ValueError) as e:
+            self.statusBar().showMessage(f'Could not load {path}: {e}')
+            return
+        self.statusBar().showMessage(f'Loaded state at iteration {self.simulation.iteration - 1}')
 
     def check_for_click_collisions(self, pos):
         for stream in self.simulation.streams:
-            if stream.view.check_for_joint_line_collision(pos):
+            if stream.view and stream.view.check_for_joint_line_collision(pos):
                 return stream
         return None
 
@@ -192,7 +414,7 @@ class ApplicationWindow(QMainWindow):
             elif species.name == 'water':
                 volume_fractions[species] = 0.99
 
-        self.add_module(Source(self, 'Source', 1000, volume_fractions))
+        self.add_module(Source(self.simulation, 'Source', 1000, volume_fractions))
 
     @pyqtSlot()
     def create_tank_slot(self):
@@ -203,30 +425,31 @@ class ApplicationWindow(QMainWindow):
             elif species.name == 'water':
                 volume_fractions[species] = 0.99986
 
-        self.add_module(Tank(self, 'Tank', 0, volume_fractions))
+        self.add_module(Tank(self.simulation, 'Tank', 0, volume_fractions))
 
     @pyqtSlot()
     def create_pump_slot(self):
-        self.add_module(Pump(self))
+        self.add_module(Pump(self.simulation))
 
     @pyqtSlot()
     def create_sink_slot(self):
-        self.add_module(Sink(self))
+        self.add_module(Sink(self.simulation))
 
     @pyqtSlot()
     def create_splitter_slot(self):
-        self.add_module(Splitter(self))
+        self.add_module(Splitter(self.simulation))
 
     @pyqtSlot()
     def create_hydrocyclone_slot(self):
-        self.add_module(Hydrocyclone(self))
+        self.add_module(Hydrocyclone(self.simulation))
 
     @pyqtSlot()
     def create_joiner_slot(self):
-        self.add_module(Joiner(self))
+        self.add_module(Joiner(self.simulation))
             
     def add_module(self, module):
         self.state = self.placing_module
+        attach_view(module)
         module.view.add_to_scene(self.scene)
         width = module.view.graphics_item.pixmap().width()
         height = module.view.graphics_item.pixmap().height()
@@ -238,6 +461,10 @@ class ApplicationWindow(QMainWindow):
         self.floating_model = None
 
     def socket_clicked(self, graphics_item, event):
+        with self.simulation.lock:
+            self.handle_socket_click(graphics_item, event)
+
+    def handle_socket_click(self, graphics_item, event):
         scene_pos = graphics_item.mapToScene(event.pos())
         if self.state == ApplicationWindow.idle:
             self.create_stream(scene_pos)
@@ -245,7 +472,8 @@ class ApplicationWindow(QMainWindow):
             self.complete_stream(scene_pos)
 
     def create_stream(self, pos):
-        self.floating_model = Stream(self)
+        self.floating_model = Stream(self.simulation)
+        attach_view(self.floating_model)
         
         line = QLineF(pos, pos)
         self.floating_line = self.scene.addLine(line)
@@ -306,7 +534,8 @@ class ApplicationWindow(QMainWindow):
     @pyqtSlot()
     def create_readout(self):
         self.state = self.placing_readout
-        self.floating_model = Readout(self)
+        self.floating_model = Readout(self.simulation)
+        attach_view(self.floating_model)
         self.scene.addItem(self.floating_model.view.graphics_item)
    
         width = self.floating_model.view.graphics_item.rect().width()
@@ -317,7 +546,8 @@ class ApplicationWindow(QMainWindow):
     @pyqtSlot()
     def create_fiber_readout(self):
         self.state = self.placing_readout
-        self.floating_model = FiberReadout(self)
+        self.floating_model = FiberReadout(self.simulation)
+        attach_view(self.floating_model)
         self.scene.addItem(self.floating_model.view.graphics_item)
    
         width = self.floating_model.view.graphics_item.rect().width()
@@ -0,0 +1,86 @@
+import numpy as np
+
+from .event import Event
+
+
+class FlowrateHistory:
+    ''' Records the flowrate of every Species in every Stream of a Simulation
+        for the last capacity iterations. Recording is opt-in: append the
+        history to the Simulation's observers. Values are kept in a
+        preallocated array with one row per Stream and Species, so the
+        history of each flowrate is a contiguous column of iterations and
+        memory use does not grow however long the Simulation runs. Every
+        value is written twice, capacity iterations apart, so the recorded
+        iterations are always a contiguous window of the array, and the
+        arrays returned are views of it rather than copies. Views are
+        read-only and are overwritten as the window moves on; copy them to
+        keep them. The history is cleared if Streams are added or
+        removed.'''
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.streams = []
+        self.reset()
+
+    def reset(self, streams=()):
+        ''' Clears the history and allocates room for the flowrates of
+            streams.'''
+        self.streams = list(streams)
+        self.stream_indices = {stream: i for i, stream in enumerate(self.streams)}
+        self.species = list(Event.registered_species)
+        self.data = np.zeros((len(self.streams), len(self.species), 2 * self.capacity))
+        self._iterations = np.zeros(2 * self.capacity, dtype=np.int64)
+        # Slot the next iteration is written to, and the number recorded.
+        self.position = 0
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def observe(self, simulation):
+        ''' Records the flowrates of simulation's Streams in the iteration just
+            run.'''
+        if simulation.streams != self.streams or len(self.species) != len(Event.registered_species):
+            self.reset(simulation.streams)
+        values = [[stream.flowrates[species] for species in self.species]
+                  for stream in self.streams]
+        for slot in (self.position, self.position + self.capacity):
+            self.data[:, :, slot] = values
+            self._iterations[slot] = simulation.iteration
+        self.position = (self.position + 1) % self.capacity
+        self.length = min(self.length + 1, self.capacity)
+
+    def _window(self, array):
+        ''' Returns a read-only view of the recorded iterations along the last
+            axis of array, oldest first.'''
+        start = (self.position - self.length) % self.capacity
+        view = array[..., start:start + self.length]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def iterations(self):
+        ''' Property. Returns a view of the recorded iteration numbers, oldest
+            first.'''
+        return self._window(self._iterations)
+
+    @property
+    def flowrates(self):
+        ''' Property. Returns a view of the recorded flowrates, with shape
+            (streams, species, iterations).'''
+        return self._window(self.data)
+
+    def stream_flowrates(self, stream):
+        ''' Returns a view of the recorded flowrates of stream, with shape
+            (species, iterations).'''
+        return self._window(self.data[self.stream_indices[stream]])
+
+    def series(self, stream, species):
+        ''' Returns a view of the recorded flowrates of species in stream.'''
+        return self._window(self.data[self.stream_indices[stream], self.species.index(species)])
+
+    def save(self, path):
+        ''' Writes the recorded iterations and flowrates, along with the names
+            of the Streams and Species, to an .npz file at path.'''
+        np.savez(path, iterations=self.iterations, flowrates=self.flowrates,
+                 streams=np.array([stream.name for stream in self.streams]),
+                 species=np.array([species.name for species in self.species]))
@@ -0,0 +1,136 @@
+from .flowsheet_graph import (upstream_modules, downstream_modules, outlet_streams,
+                              is_pull_supplier)
+
+
+class SubgraphFreezer:
+    ''' Skips the Modules of a Simulation whose inputs have stopped changing.
+        A Module becomes stable once its parameters and the flowrates of its
+        inlet and outlet Streams have stayed within abs_tol + rel_tol * |flow|
+        of the previous iteration for window consecutive iterations. Stable
+        Modules are frozen in upstream-closed groups, so that no active
+        Module ever pushes Events into a frozen one; whole recycle loops
+        freeze together and Tanks only freeze along with the Pumps pulling
+        from them. Frozen Modules are not simulated and the Events queued in
+        them stay where they are. A frozen Module feeding an active one
+        replays its last outlet flows into it instead.
+
+        The parameters of frozen Modules are checked every iteration. When
+        one changes, e.g. from a dialog, that Module, everything downstream
+        of it and the Tanks supplying them are thawed, while the rest of the
+        sheet stays frozen.'''
+    def __init__(self, rel_tol=1e-9, abs_tol=1e-12, window=10):
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.window = window
+        self.frozen = set()
+        self.reset()
+
+    def reset(self):
+        ''' Thaws every Module and forgets all observed flowrates.'''
+        self.frozen.clear()
+        self.signatures = {}
+        self.stable_iterations = {}
+        # Flowrates and Event count replayed into each Stream leaving a
+        # frozen Module.
+        self.replays = {}
+
+    def signature(self, module):
+        ''' Returns the parameters of module and the flowrates of its
+            connected Streams.'''
+        streams = [socket.stream for socket in module.inlet_sockets + module.outlet_sockets
+                   if socket.stream]
+        return module.parameters(), [list(stream.flowrates.values()) for stream in streams]
+
+    def unchanged(self, signature, previous_signature):
+        parameters, flowrates = signature
+        previous_parameters, previous_flowrates = previous_signature
+        if parameters != previous_parameters or len(flowrates) != len(previous_flowrates):
+            return False
+        for stream_flowrates, previous_stream_flowrates in zip(flowrates, previous_flowrates):
+            for flowrate, previous_flowrate in zip(stream_flowrates, previous_stream_flowrates):
+                if abs(flowrate - previous_flowrate) > self.abs_tol + self.rel_tol * abs(flowrate):
+                    return False
+        return True
+
+    def simulate(self, simulation):
+        ''' Runs one iteration of simulation, simulating active Modules and
+            replaying the outlet flows of frozen ones, then updates which
+            Modules are frozen.'''
+        self.thaw_edited()
+        pool = simulation.event_pool
+        for module in simulation.schedule:
+            if module in self.frozen:
+                self.replay(module, pool)
+            else:
+                module.simulate()
+        self.update(simulation.schedule)
+
+    def replay(self, module, pool):
+        ''' Pushes the flows recorded when module was frozen into the active
+            Modules it feeds.'''
+        for stream in outlet_streams(module):
+            if stream.outlet_socket.module in self.frozen or stream not in self.replays:
+                continue
+            species_flows, count = self.replays[stream]
+            if count:
+                species_event_flows = {species: flow / count
+                                       for species, flow in species_flows.items()}
+                stream.outlet_socket.queue.enqueue_uniform(species_event_flows, count, pool)
+
+    def thaw_edited(self):
+        ''' Thaws every frozen Module whose parameters have changed, along with
+            its downstream Modules and their pull suppliers.'''
+        edited = [module for module in self.frozen
+                  if module.parameters() != self.signatures[module][0]]
+        if edited:
+            self.thaw(edited)
+
+    def thaw(self, modules):
+        ''' Thaws modules and every Module downstream of them.'''
+        pending = list(modules)
+        while pending:
+            module = pending.pop()
+            self.stable_iterations[module] = 0
+            self.signatures.pop(module, None)
+            if module not in self.frozen:
+                continue
+            self.frozen.discard(module)
+            pending.extend(downstream_modules(module))
+            pending.extend(upstream for upstream in upstream_modules(module)
+                           if is_pull_supplier(upstream))
+
+    def update(self, schedule):
+        ''' Counts the iterations each active Module has been stable for and
+            freezes the largest upstream-closed group of stable Modules.'''
+        candidates = set()
+        for module in schedule:
+            if module in self.frozen:
+                continue
+            signature = self.signature(module)
+            previous_signature = self.signatures.get(module)
+            if previous_signature is not None and self.unchanged(signature, previous_signature):
+                self.stable_iterations[module] = self.stable_iterations.get(module, 0) + 1
+            else:
+                self.stable_iterations[module] = 0
+            self.signatures[module] = signature
+            if self.stable_iterations[module] >= self.window:
+                candidates.add(module)
+
+        # Drop candidates fed by an active Module, and Tanks supplying one,
+        # until the remaining candidates form an upstream-closed group.
+        changed = True
+        while changed:
+            changed = False
+            for module in list(candidates):
+                if (any(upstream not in candidates and upstream not in self.frozen
+                        for upstream in upstream_modules(module))
+                    or is_pull_supplier(module)
+                    and any(downstream not in candidates
+                            for downstream in downstream_modules(module))):
+                    candidates.discard(module)
+                    changed = True
+
+        for module in candidates:
+            for stream in outlet_streams(module):
+                self.replays[stream] = (dict(stream.flowrates), stream.event_count)
+        self.frozen.update(candidates)
@@ -1,25 +1,67 @@
 import math
-import sigfig
 
 from enum import Enum
 
-from .event_queue import EventQueue
 from .event import Event
-from .views import (ReadoutView, StreamView, SocketView, SourceView, 
-                    TankView, PumpView, SinkView, SplitterView, 
-                    HydrocycloneView, JoinerView, PumpView)
-from .dialogs import ModelDialog, PumpDialog, TankDialog, SourceDialog, HydrocycloneDialog
 from .species import Species
+from .formatting import round_sigfigs
 
 
+def species_volumes(volumetric_fractions, volume):
+    ''' Returns a dict that splits volume among the registered Species as 
+        specified by the volumetric_fractions dict, or evenly if 
+        volumetric_fractions is not provided.'''
+    volumes = {}
+    for species in Event.registered_species:
+        if volumetric_fractions:
+            fraction = volumetric_fractions[species]
+        else:
+            fraction = 1 / len(Event.registered_species)
+        volumes[species] = fraction * volume
+    return volumes
+
+def capped_flows(species_flows, capacity):
+    ''' Returns species_flows scaled down proportionally so that their total 
+        does not exceed capacity.'''
+    total_flow = sum(species_flows.values())
+    if total_flow <= capacity:
+        return dict(species_flows)
+    return {species: flow * capacity / total_flow for species, flow in species_flows.items()}
+
+def fiber_properties(flowrates):
+    ''' Returns the total flow, the consistency in percent solids by volume
+        and the solids tonnage per day of the species flowrates dict. The
+        consistency is 0 if there is no flow. The Species registry must be
+        frozen.'''
+    registry = Event.registry
+    flowrates = registry.vector(flowrates)
+    total_liquid_flow = 0
+    for i in registry.liquid_indices:
+        total_liquid_flow += flowrates[i]
+    total_solid_flow = 0
+    for i in registry.solid_indices:
+        total_solid_flow += flowrates[i]
+
+    total_flow = total_liquid_flow + total_solid_flow
+    consistency = total_solid_flow / total_flow * 100 if total_flow else 0
+    tonnage = total_solid_flow * 60 * 24 / 1000
+    return total_flow, consistency, tonnage
+
 
 class Model:
-    def __init__(self, gui, name='Model'):
-        self.gui = gui
+    def __init__(self, simulation, name='Model'):
+        self.simulation = simulation
         self.name = name
         self.view = None
-        self.dialog_class = ModelDialog
         self.dialog = None
+        # Layout loaded from a flowsheet file for a View not created yet.
+        self.layout = None
+
+    @property
+    def gui(self):
+        ''' Property. Returns the ApplicationWindow of this Model instance's 
+            Simulation, or None if the Simulation is running headless.'''
+        return self.simulation.gui
 
     def cleanup(self):
         ''' Override this method to define what happens soon before 
@@ -27,11 +69,13 @@ class Model:
         pass
 
 class Readout(Model):
-    def __init__(self, gui, name='Readout'):
-        super().__init__(gui, name)
-        self.view = ReadoutView(self)
-        self.gui.simulation.displays.append(self)
+    def __init__(self, simulation, name='Readout'):
+        super().__init__(simulation, name)
+        self.simulation.displays.append(self)
         self.stream = None
+        self.text = ''
+        # Flowrates the current text was formatted from.
+        self.formatted_flowrates = None
 
     def connect_to_stream(self, stream):
         if stream.readout:
@@ -41,21 +85,44 @@ class Readout(Model):
 
         return True
 
-    def update(self):
-        ''' Gets the current iteration's flowrates of the connected 
-            Stream and updates the displayed text view.'''
-        flowrates = self.stream.flowrates
+    def set_text(self, text):
+        ''' Stores text as this Readout instance's current output and 
+            displays it in the text view, if one is attached. The text view 
+            is only touched if its text differs. Returns True if text differs
+            from the previous output.'''
+        changed = text != self.text
+        self.text = text
+        if self.view and self.view.text_item and self.view.shown_text != text:
+            self.view.text_item.setPlainText(text)
+            self.view.shown_text = text
+        return changed
+
+    def format(self, flowrates):
+        ''' Returns the text displayed for the flowrates dict.'''
         output = ''
         for species in Event.registered_species:
             output += f'{species.name}: {round(flowrates[species], 3)}\n'
-        output = output[:-1]
-        self.view.text_item.setPlainText(output)
+        return output[:-1]
+
+    def update(self, flowrates=None):
+        ''' Gets the current iteration's flowrates of the connected 
+            Stream, or the given flowrates dict, and updates the displayed 
+            text view. The text is only rebuilt if the flowrates have 
+            changed. Returns True if the displayed text changed.'''
+        if not self.stream:
+            return False
+        if flowrates is None:
+            flowrates = self.stream.flowrates
+        if flowrates == self.formatted_flowrates:
+            return self.set_text(self.text)
+        self.formatted_flowrates = dict(flowrates)
+        return self.set_text(self.format(flowrates))
     
     def cleanup(self):
         ''' Removes this Readout instance from any lists that may be 
             tracking it.'''
         try:
-            self.gui.simulation.displays.remove(self)
+            self.simulation.displays.remove(self)
         except Exception:
             pass
 
@@ -75,50 +142,30 @@ class Readout(Model):
             pass
 
 class FiberReadout(Readout):
-    def __init__(self, gui, name='Readout'):
-        super().__init__(gui, name)
+    def __init__(self, simulation, name='Readout'):
+        super().__init__(simulation, name)
 
-    def update(self):
-        ''' Overrides parent's update method to display values relevant to 
+    def format(self, flowrates):
+        ''' Overrides parent's format method to display values relevant to 
             paper manufacturing.'''
-        flowrates = self.stream.flowrates
-        liquid_flowrates = {}
-        total_liquid_flow = 0
-        solid_flowrates = {}
-        total_solid_flow = 0
-        for species, flowrate in flowrates.items():
-            try:
-                if species.properties['state'] == 'liquid':
-                    liquid_flowrates[species] = flowrate
-                    total_liquid_flow += flowrate
-                elif species.properties['state'] == 'solid':
-                    solid_flowrates[species] = flowrate
-                    total_solid_flow += flowrate
-            except KeyError as e:
-                print('All species must have a "state" property.')
-
-        total_flow = total_liquid_flow + total_solid_flow
-        
+        total_flow, consistency, tonnage = fiber_properties(flowrates)
         if not total_flow:
             output = ''
         else:
-            consistency = total_solid_flow / total_flow * 100
-            tonnage = total_solid_flow * 60 * 24 / 1000
-            output = f'{sigfig.round(total_flow, sigfigs=3)} - ' \
-                     f'{sigfig.round(consistency, sigfigs=3)} - ' \
-                     f'{sigfig.round(tonnage, sigfigs=3)}'
+            output = f'{round_sigfigs(total_flow, 3)} - ' \
+                     f'{round_sigfigs(consistency, 3)} - ' \
+                     f'{round_sigfigs(tonnage, 3)}'
 
-        self.view.text_item.setPlainText(output)
+        return output
 
 
 class Stream(Model):
-    def __init__(self, gui, name='Stream'):
-        super().__init__(gui, name)
+    def __init__(self, simulation, name='Stream'):
+        super().__init__(simulation, name)
         self.inlet_socket = None
         self.outlet_socket = None
         self.readout = None
-        self.gui.simulation.streams.append(self)
-        self.view = StreamView(self)
+        self.simulation.streams.append(self)
         self.reset_flowrates()
 
     def cleanup(self):
@@ -135,7 +182,7 @@ class Stream(Model):
             pass
 
         try:
-            self.gui.simulation.streams.remove(self)
+            self.simulation.streams.remove(self)
         except Exception:
             pass
 
@@ -175,16 +222,17 @@ class Stream(Model):
     def reset_flowrates(self):
         ''' Sets all of this Stream instance's flowrates to 0.'''
         self.flowrates = {species: 0 for species in Event.registered_species}
+        # Number of Events that carried the flowrates.
+        self.event_count = 0
 
 
 class Socket(Model):
-    def __init__(self, gui, module, capacity=float('inf'), name='Socket'): 
-        super().__init__(gui, name)
+    def __init__(self, simulation, module, capacity=float('inf'), name='Socket'): 
+        super().__init__(simulation, name)
         self.module = module
         self.capacity = capacity
-        self.queue = EventQueue()
+        self.queue = self.simulation.queue_class()
         self.stream = None
-        self.view = SocketView(self)
 
     @property
     def mate(self):
@@ -206,14 +254,18 @@ class Socket(Model):
         ''' Assigns a Stream to this Socket instance. Updates view 
             to reflect connected state.'''
         self.stream = stream
-        self.view.set_connected(True)
+        self.simulation.topology_changed()
+        if self.view:
+            self.view.set_connected(True)
         return True 
 
     def disconnect(self):
         ''' Removes this Socket instance's Stream. Updates view to
             reflect disconnected state.'''
         self.stream = None
-        self.view.set_connected(False)
+        self.simulation.topology_changed()
+        if self.view:
+            self.view.set_connected(False)
         return True 
 
     @property
@@ -233,27 +285,19 @@ class Socket(Model):
         pass
 
 class InletSocket(Socket):
-    def __init__(self, gui, module, capacity=float('inf'), name='Inlet'):
-        super().__init__(gui, module, capacity, name)
+    def __init__(self, simulation, module, capacity=float('inf'), name='Inlet'):
+        super().__init__(simulation, module, capacity, name)
 
     def transfer_events(self):
         ''' Transfers Events from this Socket instance to its 
             Module.'''
-        transferred_flow = 0
-        while (not self.queue.empty() 
-               and transferred_flow 
-               + self.queue.peek().aggregate_magnitude() 
-               <= self.capacity):
-            event = self.queue.dequeue()
-            self.module.queue.enqueue(event)
-            transferred_flow += event.aggregate_magnitude()
-     
-        return transferred_flow
+        transferred_flows = self.queue.transfer(self.module.queue, self.capacity)
+        return sum(transferred_flows.values())
 
 
 class PushInletSocket(InletSocket):
-    def __init__(self, gui, module, capacity=float('inf'), name='Inlet'):
-        super().__init__(gui, module, capacity, name)
+    def __init__(self, simulation, module, capacity=float('inf'), name='Inlet'):
+        super().__init__(simulation, module, capacity, name)
  
     def connect(self, stream):
         ''' Checks stream for conflicting Socket. If none are 
@@ -266,8 +310,8 @@ class PushInletSocket(InletSocket):
         return super().connect(stream)
 
 class PullInletSocket(InletSocket):
-    def __init__(self, gui, module, capacity=0, name='Inlet'):
-        super().__init__(gui, module, capacity, name)
+    def __init__(self, simulation, module, capacity=0, name='Inlet'):
+        super().__init__(simulation, module, capacity, name)
 
     def connect(self, stream):
         ''' Checks stream for conflicting Socket. If none are 
@@ -284,23 +328,15 @@ class PullInletSocket(InletSocket):
 
     def pull(self):
         ''' Pulls Events from the connected Stream's other Socket.'''
-        pulled_amount = 0
         self.mate.capacity = self.capacity
-        self.stream.reset_flowrates()
-        while (not self.mate.queue.empty() 
-               and pulled_amount 
-               + self.mate.queue.peek().aggregate_magnitude() 
-               <= self.capacity):
-            event = self.mate.queue.dequeue()
-            self.queue.enqueue(event)
-            pulled_amount += event.aggregate_magnitude()
-            for species in event.registered_species:
-                self.stream.flowrates[species] += event.species_magnitude(species)
+        length = self.queue.length()
+        self.stream.flowrates = self.mate.queue.transfer(self.queue, self.capacity)
+        self.stream.event_count = self.queue.length() - length
 
 
 class OutletSocket(Socket):
-    def __init__(self, gui, module, capacity=float('inf'), name='Outlet'):
-        super().__init__(gui, module, capacity, name)
+    def __init__(self, simulation, module, capacity=float('inf'), name='Outlet'):
+        super().__init__(simulation, module, capacity, name)
         
         # dict that specifies the fraction of the connected Module's 
         # volumetric feed flow that goes to this OutletSocket for each 
@@ -340,23 +376,20 @@ class OutletSocket(Socket):
                                         * outflow 
                                         / self.module.total_inlet_flow), self.module.queue.length())
 
-        events_processed = 0
-        transferred_flow = 0
-        while not self.module.queue.empty() and events_processed < event_share:
-            event = self.module.queue.dequeue()
-            for species in Event.registered_species:
-                species_event_volume = species_outflows[species] / event_share
-                event.set_species_magnitude(species, species_event_volume)
-                transferred_flow += species_event_volume
+        if not event_share:
+            return 0
 
-            self.queue.enqueue(event)
-            events_processed += 1
+        # Each transferred Event carries an equal part of this outlet's flow.
+        species_event_volumes = {species: species_outflows[species] / event_share 
+                                 for species in Event.registered_species}
+        events_processed = self.module.queue.transfer_uniform(self.queue, event_share, 
+                                                              species_event_volumes)
         
-        return transferred_flow
+        return events_processed * sum(species_event_volumes.values())
 
 class PushOutletSocket(OutletSocket):
-    def __init__(self, gui, module, capacity=float('inf'), name='Outlet'):
-        super().__init__(gui, module, capacity, name)
+    def __init__(self, simulation, module, capacity=float('inf'), name='Outlet'):
+        super().__init__(simulation, module, capacity, name)
 
     def connect(self, stream):
         ''' Checks stream for conflicting Socket. If none are 
@@ -370,21 +403,13 @@ class PushOutletSocket(OutletSocket):
 
     def push(self):
         ''' Pushes Events to the connected Stream's other Socket.'''
-        pushed_amount = 0
-        self.stream.reset_flowrates()
-        while (not self.queue.empty() 
-               and pushed_amount 
-               + self.queue.peek().aggregate_magnitude() 
-               <= self.capacity):  
-            event = self.queue.dequeue()
-            self.mate.queue.enqueue(event)
-            pushed_amount += event.aggregate_magnitude()
-            for species in event.registered_species:
-                self.stream.flowrates[species] += event.species_magnitude(species)
+        length = self.queue.length()
+        self.stream.flowrates = self.queue.transfer(self.mate.queue, self.capacity)
+        self.stream.event_count = length - self.queue.length()
 
 class PullOutletSocket(OutletSocket):
-    def __init__(self, gui, module, capacity=0, name='Outlet'):
-        super().__init__(gui, module, capacity, name)
+    def __init__(self, simulation, module, capacity=0, name='Outlet'):
+        super().__init__(simulation, module, capacity, name)
 
     def connect(self, stream):
         ''' Checks stream for conflicting Socket. If none are 
@@ -401,18 +426,20 @@ class PullOutletSocket(OutletSocket):
 
 
 class Module(Model):
-    def __init__(self, gui, name='Module'):
-        super().__init__(gui, name)    
+    def __init__(self, simulation, name='Module'):
+        super().__init__(simulation, name)    
         self._capacity = 0    
-        self.gui.simulation.modules.append(self)
+        self.simulation.modules.append(self)
+        self.simulation.topology_changed()
         self.inlet_sockets = []
         self.inlet_flows = []
         self.outlet_sockets = []
         self.outlet_flows = []
-        self.queue = EventQueue()
+        self.queue = self.simulation.queue_class()
 
     def __del__(self):
-        self.gui.simulation.modules.remove(self)
+        self.simulation.modules.remove(self)
+        self.simulation.topology_changed()
  
     def capacity(self):
         return self._capacity
@@ -420,16 +447,38 @@ class Module(Model):
     def set_capacity(self, capacity):
         self._capacity = capacity
 
+    def parameters(self):
+        ''' Returns a tuple of the settings that determine this Module 
+            instance's outlet flows for given inlet flows. Subclasses with 
+            settings of their own must extend it. The capacities of pull 
+            Sockets are left out, since they are set from the pulling Pump's 
+            pushed inlet flow every iteration rather than by the user.'''
+        return (self._capacity,) + tuple(socket.capacity for socket 
+                                         in self.inlet_sockets + self.outlet_sockets
+                                         if not isinstance(socket, (PullInletSocket, 
+                                                                    PullOutletSocket)))
+
     def generate_flow(self, socket, species_flows):
         ''' Instantiates an Event as specified by species_flows dict and 
-            enqueues it to socket's queue.'''
-        socket.queue.enqueue(Event(species_flows))
+            enqueues it to socket's queue. The Event is taken from the 
+            Simulation's EventPool if it has one.'''
+        if self.simulation.event_pool is not None:
+            socket.queue.enqueue(self.simulation.event_pool.acquire(species_flows))
+        else:
+            socket.queue.enqueue(Event(species_flows))
+
 
+    def generate_flows(self, socket, species_flows, count):
+        ''' Enqueues count identical Events, as specified by species_flows 
+            dict, to socket's queue in one operation. The Events are taken 
+            from the Simulation's EventPool if it has one.'''
+        socket.queue.enqueue_uniform(species_flows, count, self.simulation.event_pool)
 
     def purge_flow(self):
         ''' Purges all Events from this Module instance's queue, removing them
-            from the Simulation.'''
-        self.queue.events.clear()
+            from the Simulation and releasing them to the Simulation's 
+            EventPool if it has one.'''
+        self.queue.purge(self.simulation.event_pool)
 
     def add_inlet_socket(self, socket):
         ''' Adds socket to the end of this Module instance's 
@@ -469,6 +518,14 @@ class Module(Model):
     def process(self):
         ''' Override this method to define a Module subclass' behaviour.'''
         raise NotImplementedError
+
+    def steady_state(self, inlet_flows):
+        ''' Override this method to define a Module subclass' steady state 
+            behaviour. inlet_flows is a list with a dict of species flows for 
+            each inlet Socket. Must return a dict mapping Sockets to the dict 
+            of species flows in their Streams, for every outlet Socket and any 
+            inlet Socket whose flow the Module determines itself.'''
+        raise NotImplementedError
         
     def postprocess(self):
         ''' Resets this Module instance's attributes relating to outlet flows
@@ -495,15 +552,13 @@ class Module(Model):
 
 
 class Source(Module):
-    def __init__(self, gui, name='Source', capacity=10000, 
+    def __init__(self, simulation, name='Source', capacity=10000, 
                  volumetric_fractions=None, event_rate=1000):
-        super().__init__(gui, name)
-        self.add_outlet_socket(PushOutletSocket(self.gui, self, capacity))
+        super().__init__(simulation, name)
+        self.add_outlet_socket(PushOutletSocket(self.simulation, self, capacity))
         self.set_capacity(capacity)
         self.volumetric_fractions = volumetric_fractions
         self.event_rate = event_rate
-        self.view = SourceView(self)
-        self.dialog_class = SourceDialog
 
     def process(self):
         ''' Generates Events as specified by this Source instance's 
@@ -511,36 +566,32 @@ class Source(Module):
             Species registered to the Event class if volumetric_fractions is
             not provided.'''
         socket = self.outlet_sockets[0]
-        outlet_amount = 0
-        for i in range(self.event_rate):
-            volume = socket.capacity / self.event_rate
-            generated_species = []
-            if self.volumetric_fractions:
-                for species in Event.registered_species:
-                    fraction = self.volumetric_fractions[species]
-                    generated_species.append((species, fraction * volume))
-            else:
-                for species in Event.registered_species:
-                    fraction = 1 / len(Event.registered_species)
-                    generated_species.append((species, fraction * volume))
-
-            # Create events at outlet socket
-            self.generate_flow(socket, generated_species)
-            outlet_amount += volume
+        volume = socket.capacity / self.event_rate
+        generated_species = species_volumes(self.volumetric_fractions, volume)
+
+        # Create events at outlet socket
+        self.generate_flows(socket, generated_species, self.event_rate)
+
+    def steady_state(self, inlet_flows):
+        ''' Returns this Source instance's constant outlet flows.'''
+        socket = self.outlet_sockets[0]
+        return {socket: species_volumes(self.volumetric_fractions, socket.capacity)}
+
+    def parameters(self):
+        return super().parameters() + (self.event_rate, 
+                                       tuple((self.volumetric_fractions or {}).items()))
 
     def set_capacity(self, capacity):
         self._capacity = capacity
         self.outlet_sockets[0].capacity = capacity
 
 class Tank(Module):
-    def __init__(self, gui, name='Tank', capacity=0, 
+    def __init__(self, simulation, name='Tank', capacity=0, 
                  volumetric_fractions=None, event_rate=1000):
-        super().__init__(gui, name)
-        self.add_outlet_socket(PullOutletSocket(self.gui, self, capacity))
+        super().__init__(simulation, name)
+        self.add_outlet_socket(PullOutletSocket(self.simulation, self, capacity))
         self.volumetric_fractions = volumetric_fractions
         self.event_rate = event_rate
-        self.view = TankView(self)
-        self.dialog_class = TankDialog
 
     def process(self):
         ''' Generates Events as specified by this Source instance's 
@@ -548,54 +599,64 @@ class Tank(Module):
             Species registered to the Event class if volumetric_fractions is
             not provided.'''
         socket = self.outlet_sockets[0]
-        outlet_amount = 0
         flow_demand = socket.capacity
-        for i in range(self.event_rate):
-            volume = flow_demand / self.event_rate
-            generated_species = []
-            if self.volumetric_fractions:
-                for species in Event.registered_species:
-                    fraction = self.volumetric_fractions[species]
-                    generated_species.append((species, fraction * volume))
-            else:
-                for species in Event.registered_species:
-                    fraction = 1 / len(Event.registered_species)
-                    generated_species.append((species, fraction * volume))
+        volume = flow_demand / self.event_rate
+        generated_species = species_volumes(self.volumetric_fractions, volume)
         
-            # Create events at outlet socket
-            self.generate_flow(socket, generated_species)
-            outlet_amount += volume
+        # Create events at outlet socket
+        self.generate_flows(socket, generated_species, self.event_rate)
+
+    def supply(self, volume):
+        ''' Returns the species flows this Tank instance supplies when volume 
+            is pulled from it.'''
+        return species_volumes(self.volumetric_fractions, volume)
+
+    def steady_state(self, inlet_flows):
+        ''' A Tank's outlet flow is set by the Module pulling from it, so 
+            nothing is determined here.'''
+        return {}
+
+    def parameters(self):
+        return super().parameters() + (self.event_rate, 
+                                       tuple((self.volumetric_fractions or {}).items()))
 
 
 class Sink(Module):
-    def __init__(self, gui, name='Sink', capacity=float('inf')):
-        super().__init__(gui, name)
-        self.add_inlet_socket(PushInletSocket(self.gui, self, capacity))
+    def __init__(self, simulation, name='Sink', capacity=float('inf')):
+        super().__init__(simulation, name)
+        self.add_inlet_socket(PushInletSocket(self.simulation, self, capacity))
         self.set_capacity(capacity)
-        self.view = SinkView(self)
 
     def process(self):
         ''' Removes all flow to this Sink instance from the Simulation.'''
         self.purge_flow()
 
+    def steady_state(self, inlet_flows):
+        ''' Sinks have no outlets.'''
+        return {}
+
 
 class Splitter(Module):
-    def __init__(self, gui, name='Splitter', capacity=float('inf'), split_fraction=.25):
-        super().__init__(gui, name)
+    def __init__(self, simulation, name='Splitter', capacity=float('inf'), split_fraction=.25):
+        super().__init__(simulation, name)
         self.split_fraction = split_fraction
-        self.add_inlet_socket(PushInletSocket(self.gui, self, capacity))
-        self.add_outlet_socket(PushOutletSocket(self.gui, self, name='Outlet1'))
-        self.add_outlet_socket(PushOutletSocket(self.gui, self, name='Outlet2'))
+        self.add_inlet_socket(PushInletSocket(self.simulation, self, capacity))
+        self.add_outlet_socket(PushOutletSocket(self.simulation, self, name='Outlet1'))
+        self.add_outlet_socket(PushOutletSocket(self.simulation, self, name='Outlet2'))
         self.set_capacity(capacity)
-        self.view = SplitterView(self)
 
     def process(self):
         ''' Splits flow to this Splitter instance evenly across all Species 
             registered to the Event class, between its two outlets in the 
             proportion specified by the split_fraction.'''
-        inlet_socket = self.inlet_sockets[0]
         outlet_socket1, outlet_socket2 = self.outlet_sockets
+        outlet1_flow_fractions, outlet2_flow_fractions = self.flow_fractions()
+        outlet_socket1.set_flow_fractions(outlet1_flow_fractions)
+        outlet_socket2.set_flow_fractions(outlet2_flow_fractions)
 
+    def flow_fractions(self):
+        ''' Returns the fraction of each Species' feed flow sent to each of 
+            this Splitter instance's outlets, as a pair of dicts.'''
         outlet1_flow_fractions = {}
         outlet2_flow_fractions = {}
 
@@ -603,112 +664,136 @@ class Splitter(Module):
             outlet1_flow_fractions[species] = self.split_fraction
             outlet2_flow_fractions[species] = (1 - self.split_fraction)
 
-        outlet_socket1.set_flow_fractions(outlet1_flow_fractions)
-        outlet_socket2.set_flow_fractions(outlet2_flow_fractions)
+        return outlet1_flow_fractions, outlet2_flow_fractions
+
+    def parameters(self):
+        return super().parameters() + (self.split_fraction,)
+
+    def steady_state(self, inlet_flows):
+        ''' Splits the feed flow between this Splitter instance's outlets.'''
+        feed_flows = capped_flows(inlet_flows[0], self.inlet_sockets[0].capacity)
+        return {socket: {species: feed_flows[species] * fractions[species] 
+                         for species in feed_flows}
+                for socket, fractions in zip(self.outlet_sockets, self.flow_fractions())}
 
 
 class Hydrocyclone(Module):
-    def __init__(self, gui, name='Hydrocyclone', capacity=float('inf'), rrv=0.08, rrw=0.14):
-        super().__init__(gui, name)
+    def __init__(self, simulation, name='Hydrocyclone', capacity=float('inf'), rrv=0.08, rrw=0.14):
+        super().__init__(simulation, name)
         self.rrv = rrv # Reject rate by volume
         self.rrw = rrw # Reject rate by weight (solids only)
-        self.add_inlet_socket(PushInletSocket(self.gui, self, capacity, name='Feed'))
-        self.add_outlet_socket(PushOutletSocket(self.gui, self, name='Accepts'))
-        self.add_outlet_socket(PushOutletSocket(self.gui, self, name='Rejects'))
+        self.add_inlet_socket(PushInletSocket(self.simulation, self, capacity, name='Feed'))
+        self.add_outlet_socket(PushOutletSocket(self.simulation, self, name='Accepts'))
+        self.add_outlet_socket(PushOutletSocket(self.simulation, self, name='Rejects'))
         self.set_capacity(capacity)
-        self.view = HydrocycloneView(self)
-        self.dialog_class = HydrocycloneDialog
 
     def process(self):
         ''' Splits the flow to this Hydrocyclone instance's inlet socket 
             between its accepts and rejects Sockets as specified by its 
             rrv and rrw.'''
         accepts_socket, rejects_socket = self.outlet_sockets
+        accepts_flow_fractions, rejects_flow_fractions = self.flow_fractions(self.queue.species_magnitudes)
+        accepts_socket.set_flow_fractions(accepts_flow_fractions)
+        rejects_socket.set_flow_fractions(rejects_flow_fractions)
+
+    def steady_state(self, inlet_flows):
+        ''' Splits the feed flow between this Hydrocyclone instance's accepts 
+            and rejects as specified by its rrv and rrw.'''
+        feed_flows = capped_flows(inlet_flows[0], self.inlet_sockets[0].capacity)
+        return {socket: {species: feed_flows[species] * fractions[species] 
+                         for species in feed_flows}
+                for socket, fractions in zip(self.outlet_sockets, self.flow_fractions(feed_flows))}
+
+    def parameters(self):
+        return super().parameters() + (self.rrv, self.rrw)
+
+    def flow_fractions(self, queued_flows):
+        ''' Returns the fraction of each Species' flow in the queued_flows 
+            dict that goes to the accepts and to the rejects, as a pair of 
+            dicts. Works on vectors indexed by the Species registry, which 
+            the Simulation freezes before it runs.'''
+        registry = Event.registry
+        densities = registry.densities
+        feed_flows = registry.vector(queued_flows)
+        rejects_flows = [0] * len(feed_flows)
+
+        total_rejects_flow = sum(feed_flows) * self.rrv
+
+        # Solids are rejected by weight.
+        total_rejects_solids_flow = 0
+        for i in registry.solid_indices:
+            rejects_mass_flow = feed_flows[i] * densities[i] * self.rrw
+            rejects_flows[i] = rejects_mass_flow / densities[i]
+            total_rejects_solids_flow += rejects_flows[i]
+
+        # The rest of the rejects flow is split among the liquids in 
+        # proportion to their feed flows.
+        total_rejects_liquids_flow = total_rejects_flow - total_rejects_solids_flow
+        total_feed_liquids_flow = 0
+        for i in registry.liquid_indices:
+            total_feed_liquids_flow += feed_flows[i]
+        if total_feed_liquids_flow:
+            for i in registry.liquid_indices:
+                rejects_flows[i] = (total_rejects_liquids_flow 
+                                    * (feed_flows[i] / total_feed_liquids_flow))
+
         accepts_flow_fractions = {}
         rejects_flow_fractions = {}
-    
-        total_feed_flow = self.queue.magnitude 
-        feed_flows = {} 
-        feed_mass_flows = {} 
-        feed_liquids_flows = {} 
-        total_feed_liquids_flow = 0 
-        liquid_ratios = {} 
-        feed_solids_flows = {} 
-
-        rejects_flows = {} 
-        rejects_mass_flows = {} 
-        total_rejects_solids_flow = 0 
-        total_rejects_flow = total_feed_flow * self.rrv 
-
-        # Separate liquids from solids and store volumes of each species.
-        for species in Event.registered_species:
-            try:
-                feed_flows[species] = self.queue.species_magnitudes[species]
-                feed_mass_flows[species] = (feed_flows[species] * species.properties['density'])
-                if species.properties['state'] == 'liquid':
-                    feed_liquids_flows[species] = self.queue.species_magnitudes[species]
-                    total_feed_liquids_flow += feed_liquids_flows[species]
-                elif species.properties['state'] == 'solid':
-                    feed_solids_flows[species] = self.queue.species_magnitudes[species]
-                    rejects_mass_flows[species] = feed_mass_flows[species] * self.rrw
-                    rejects_flows[species] = (rejects_mass_flows[species] / species.properties['density'])
-                    total_rejects_solids_flow += rejects_flows[species]
-  
-            except KeyError as e:
-                print('All species must have "state" and "density" properties.')
-
-        total_rejects_liquids_flow = total_rejects_flow - total_rejects_solids_flow 
-
-        # Calculate and store rejects flows for all liquids.
-        for liquid, volume in feed_liquids_flows.items():
-            try:
-                ratio = volume / total_feed_liquids_flow
-            except ZeroDivisionError as e:
-                print(e)
-                ratio = 0
-            rejects_flows[liquid] = total_rejects_liquids_flow * ratio
-
-        # Calculate and store flow fractions for accepts and rejects
-        for species in Event.registered_species:
-            try:
-                rejects_fraction = rejects_flows[species] / feed_flows[species]
-            except ZeroDivisionError as e:
-                print(e)
-                rejects_fraction = 0
-            accepts_fraction = 1 - rejects_fraction
+        for species, feed_flow, rejects_flow in zip(registry.species, feed_flows, rejects_flows):
+            rejects_fraction = rejects_flow / feed_flow if feed_flow else 0
             rejects_flow_fractions[species] = rejects_fraction
-            accepts_flow_fractions[species] = accepts_fraction
+            accepts_flow_fractions[species] = 1 - rejects_fraction
         
-        accepts_socket.set_flow_fractions(accepts_flow_fractions)
-        rejects_socket.set_flow_fractions(rejects_flow_fractions)
+        return accepts_flow_fractions, rejects_flow_fractions
 
 
 class Joiner(Module):
-    def __init__(self, gui, name='Joiner', 
+    def __init__(self, simulation, name='Joiner', 
                  inlet_capacity1=float('inf'), inlet_capacity2=float('inf')):
-        super().__init__(gui, name)
-        self.add_inlet_socket(PushInletSocket(self.gui, self, inlet_capacity1, 'Inlet1'))
-        self.add_inlet_socket(PushInletSocket(self.gui, self, inlet_capacity2, 'Inlet2'))
-        self.add_outlet_socket(PushOutletSocket(self.gui, self, inlet_capacity1 + inlet_capacity2, 'Outlet'))
+        super().__init__(simulation, name)
+        self.add_inlet_socket(PushInletSocket(self.simulation, self, inlet_capacity1, 'Inlet1'))
+        self.add_inlet_socket(PushInletSocket(self.simulation, self, inlet_capacity2, 'Inlet2'))
+        self.add_outlet_socket(PushOutletSocket(self.simulation, self, inlet_capacity1 + inlet_capacity2, 'Outlet'))
         self.set_capacity(inlet_capacity1 + inlet_capacity2)
-        self.view = JoinerView(self)
 
     def process(self):
         ''' Passively joins the flow from this Joiner instance's two inlet 
             Sockets and pushes it to its outlet Socket.'''
         pass
 
+    def steady_state(self, inlet_flows):
+        ''' Returns the combined flow of this Joiner instance's inlets.'''
+        joined_flows = {species: 0 for species in Event.registered_species}
+        for socket, species_flows in zip(self.inlet_sockets, inlet_flows):
+            for species, flow in capped_flows(species_flows, socket.capacity).items():
+                joined_flows[species] += flow
+        return {self.outlet_sockets[0]: joined_flows}
+
 class Pump(Module):
-    def __init__(self, gui, name='Pump', capacity=5000):
-        super().__init__(gui, name)
-        self.add_inlet_socket(PushInletSocket(self.gui, self, capacity, 'Inlet1'))
-        self.add_inlet_socket(PullInletSocket(self.gui, self, 0, 'Inlet2'))
-        self.add_outlet_socket(PushOutletSocket(self.gui, self, float('inf'), 'Outlet'))
+    def __init__(self, simulation, name='Pump', capacity=5000):
+        super().__init__(simulation, name)
+        self.add_inlet_socket(PushInletSocket(self.simulation, self, capacity, 'Inlet1'))
+        self.add_inlet_socket(PullInletSocket(self.simulation, self, 0, 'Inlet2'))
+        self.add_outlet_socket(PushOutletSocket(self.simulation, self, float('inf'), 'Outlet'))
         self.set_capacity(capacity)
-        self.view = PumpView(self)
-        self.dialog_class = PumpDialog
 
     def process(self):
         push_inlet_socket, pull_inlet_socket = self.inlet_sockets
         pushed_inlet_flow = self.inlet_flows[0]
-        pull_inlet_socket.capacity = self.capacity() - pushed_inlet_flow
\ No newline at end of file
+        pull_inlet_socket.capacity = self.capacity() - pushed_inlet_flow
+
+    def steady_state(self, inlet_flows):
+        ''' Makes up the difference between this Pump instance's capacity and 
+            its pushed inlet flow by pulling from the Tank connected to its 
+            pull inlet.'''
+        push_inlet_socket, pull_inlet_socket = self.inlet_sockets
+        pushed_flows = capped_flows(inlet_flows[0], push_inlet_socket.capacity)
+        demand = max(0, self.capacity() - sum(pushed_flows.values()))
+
+        pulled_flows = {species: 0 for species in Event.registered_species}
+        if pull_inlet_socket.mate and hasattr(pull_inlet_socket.mate.module, 'supply'):
+            pulled_flows = pull_inlet_socket.mate.module.supply(demand)
+
+        outlet_flows = {species: pushed_flows[species] + pulled_flows[species] 
+                        for species in pushed_flows}
+        return {pull_inlet_socket: pulled_flows, self.outlet_sockets[0]: outlet_flows}
\ No newline at end of file
@@ -0,0 +1,228 @@
+''' Monte Carlo uncertainty propagation through headless Simulations.
+    Settings such as Source.capacity, Source.volumetric_fractions or
+    Hydrocyclone.rrv are sampled from distributions, each sample is built
+    and run to steady state as in a parameter sweep, and the flow,
+    consistency and tonnage of every Stream the builder returns are
+    accumulated into RunningStatistics. Samples are run in chunks on a
+    ProcessPoolExecutor. Each chunk draws its samples from its own random
+    stream, spawned from a single seed, so results are reproducible whatever
+    the number of workers. Only the statistics of each chunk are sent back,
+    and only a few chunks are in flight at a time, so memory use does not
+    grow with the number of samples.'''
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from .models import fiber_properties
+from .array_event_queue import ArrayEventQueue
+from .sweep import build_case, solve_case
+
+
+class Normal:
+    ''' Normal distribution, clipped to [low, high].'''
+    def __init__(self, mean, std, low=-math.inf, high=math.inf):
+        self.mean = mean
+        self.std = std
+        self.low = low
+        self.high = high
+
+    def sample(self, rng):
+        return float(np.clip(rng.normal(self.mean, self.std), self.low, self.high))
+
+
+class Uniform:
+    ''' Uniform distribution on [low, high).'''
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng):
+        return float(rng.uniform(self.low, self.high))
+
+
+class Triangular:
+    ''' Triangular distribution on [left, right] peaking at mode.'''
+    def __init__(self, left, mode, right):
+        self.left = left
+        self.mode = mode
+        self.right = right
+
+    def sample(self, rng):
+        return float(rng.triangular(self.left, self.mode, self.right))
+
+
+class Fractions:
+    ''' Volumetric fractions in which the fraction of species, a Species name,
+        is drawn from distribution and the balance Species makes up the
+        rest, e.g. Fractions('fiber', Normal(0.01, 0.001, low=0)) for a
+        Source's volumetric_fractions.'''
+    def __init__(self, species, distribution, balance='water'):
+        self.species = species
+        self.distribution = distribution
+        self.balance = balance
+
+    def sample(self, rng):
+        fraction = min(max(self.distribution.sample(rng), 0), 1)
+        return {self.species: fraction, self.balance: 1 - fraction}
+
+
+class RunningStatistics:
+    ''' Count, mean, variance, minimum and maximum of a stream of values,
+        updated one value at a time with Welford's algorithm, and optionally
+        a histogram over fixed bin edges. Statistics of separate streams are
+        combined with merge.'''
+    def __init__(self, bins=None):
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared differences from the mean.
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.bins = None if bins is None else np.asarray(bins, dtype=float)
+        self.histogram = None if bins is None else np.zeros(len(bins) - 1, dtype=int)
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        if self.histogram is not None:
+            self.histogram += np.histogram([value], self.bins)[0]
+
+    def merge(self, other):
+        ''' Adds the values counted by other to this RunningStatistics.'''
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        if self.histogram is not None:
+            self.histogram += other.histogram
+
+    @property
+    def variance(self):
+        ''' Property. Returns the sample variance, or nan for fewer than two
+            values.'''
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self):
+        ''' Property. Returns the sample standard deviation.'''
+        return math.sqrt(self.variance)
+
+    def summary(self):
+        return {'count': self.count, 'mean': self.mean, 'std': self.std,
+                'min': self.minimum, 'max': self.maximum}
+
+
+def output_names(streams):
+    return [f'{name}.{output}' for name in streams for output in ('flow', 'consistency', 'tonnage')]
+
+def run_chunk(builder, distributions, seed_sequence, samples, fixed=None, bins=None,
+              queue_class=ArrayEventQueue, **options):
+    ''' Runs samples cases with settings drawn from distributions, a dict of
+        objects with a sample(rng) method keyed by setting, using a random
+        generator seeded from seed_sequence. The settings in fixed are
+        applied to every case. Returns a dict of RunningStatistics of the
+        flow, consistency and tonnage of each Stream, named 'stream.output',
+        with histograms over the bins given for each name in bins, and the
+        number of cases that did not reach steady state.'''
+    rng = np.random.default_rng(seed_sequence)
+    bins = bins or {}
+    statistics = {}
+    unsteady = 0
+    for _ in range(samples):
+        settings = dict(fixed or {})
+        settings.update({name: distribution.sample(rng)
+                         for name, distribution in distributions.items()})
+        simulation, streams = build_case(builder, settings, queue_class)
+        _, steady = solve_case(simulation, **options)
+        unsteady += not steady
+        values = [value for stream in streams.values()
+                  for value in fiber_properties(stream.flowrates)]
+        for name, value in zip(output_names(streams), values):
+            if name not in statistics:
+                statistics[name] = RunningStatistics(bins.get(name))
+            statistics[name].add(value)
+    return statistics, unsteady
+
+def _run_chunk(arguments):
+    *arguments, options = arguments
+    return run_chunk(*arguments, **options)
+
+
+class MonteCarloResult:
+    ''' Statistics accumulated by monte_carlo. samples is the number of
+        samples run so far, unsteady how many of them did not reach steady
+        state and statistics a dict of RunningStatistics keyed by
+        'stream.output'.'''
+    def __init__(self):
+        self.samples = 0
+        self.unsteady = 0
+        self.statistics = {}
+
+    def merge(self, statistics, samples, unsteady):
+        self.samples += samples
+        self.unsteady += unsteady
+        for name, chunk_statistics in statistics.items():
+            if name in self.statistics:
+                self.statistics[name].merge(chunk_statistics)
+            else:
+                self.statistics[name] = chunk_statistics
+
+    def summary(self):
+        ''' Returns a dict of the summary of each output's statistics.'''
+        return {name: statistics.summary() for name, statistics in self.statistics.items()}
+
+
+def monte_carlo(builder, distributions, samples, seed=None, fixed=None, workers=None,
+                chunk_size=10, bins=None, **options):
+    ''' Runs samples cases of the flowsheet built by builder with settings
+        drawn from distributions, as described by run_chunk, and yields the
+        MonteCarloResult after each chunk of chunk_size samples has been
+        merged into it. Chunks are run on a ProcessPoolExecutor with the given
+        number of worker processes, by default one per core, or in this
+        process if workers is 1. Other keyword arguments are passed to
+        solve_case.'''
+    seed_sequence = np.random.SeedSequence(seed)
+    chunks = (min(chunk_size, samples - start) for start in range(0, samples, chunk_size))
+    result = MonteCarloResult()
+
+    def arguments(chunk_samples):
+        return (builder, distributions, seed_sequence.spawn(1)[0], chunk_samples, fixed, bins,
+                options)
+
+    if workers == 1:
+        for chunk_samples in chunks:
+            statistics, unsteady = _run_chunk(arguments(chunk_samples))
+            result.merge(statistics, chunk_samples, unsteady)
+            yield result
+        return
+
+    workers = workers or os.cpu_count() or 1
+    # At most two chunks per worker are queued, so that neither the pending
+    # futures nor their results pile up.
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        while True:
+            for chunk_samples in chunks:
+                pending[executor.submit(_run_chunk, arguments(chunk_samples))] = chunk_samples
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                statistics, unsteady = future.result()
+                result.merge(statistics, pending.pop(future), unsteady)
+                yield result
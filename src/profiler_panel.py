@@ -0,0 +1,71 @@
+import time
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (QDockWidget, QTableWidget, QTableWidgetItem, QPushButton,
+                             QVBoxLayout, QWidget, QLabel)
+
+
+class ProfilerPanel(QDockWidget):
+    ''' Dock widget showing the stats of a Profiler, slowest phases first.
+        The table is refreshed at most once every interval seconds.'''
+    closed = pyqtSignal()
+    columns = ['Kind', 'Name', 'Phase', 'Calls', 'Total ms', 'Mean \N{MICRO SIGN}s',
+               'Longest \N{MICRO SIGN}s', 'Events']
+
+    def __init__(self, parent=None, rows=100, interval=1.0):
+        super().__init__('Profile', parent)
+        self.profiler = None
+        self.rows = rows
+        self.interval = interval
+        self.last_refresh = 0.0
+
+        self.summary = QLabel()
+        self.table = QTableWidget(0, len(self.columns))
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setFocusPolicy(Qt.NoFocus)
+        reset_button = QPushButton('Reset')
+        reset_button.clicked.connect(self.reset)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.summary)
+        layout.addWidget(self.table)
+        layout.addWidget(reset_button)
+        widget = QWidget()
+        widget.setLayout(layout)
+        self.setWidget(widget)
+
+    def closeEvent(self, event):
+        super().closeEvent(event)
+        self.closed.emit()
+
+    def reset(self):
+        if self.profiler:
+            self.profiler.reset()
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        ''' Fills the table from the Profiler's stats, unless it was filled
+            less than interval seconds ago.'''
+        now = time.perf_counter()
+        if not self.profiler or not (force or now - self.last_refresh >= self.interval):
+            return
+        self.last_refresh = now
+        rows = self.profiler.table()
+        total = sum(row['total'] for row in rows if row['kind'] == 'module')
+        self.summary.setText(f'{self.profiler.iterations} iterations profiled, '
+                             f'{total * 1e3:.1f} ms in Modules')
+        rows = rows[:self.rows]
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            values = [row['kind'], row['name'], row['phase'], row['calls'],
+                      f'{row["total"] * 1e3:.2f}', f'{row["mean"] * 1e6:.1f}',
+                      f'{row["longest"] * 1e6:.1f}', row['events']]
+            for j, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if j >= 3:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(i, j, item)
+        self.table.setUpdatesEnabled(True)
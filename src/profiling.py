@@ -0,0 +1,170 @@
+import time
+
+
+class TimingStats:
+    ''' Number of calls, total and longest wall time and number of Events
+        handled by one phase of one Model.'''
+    def __init__(self, kind, model, phase):
+        self.kind = kind
+        self.model = model
+        self.phase = phase
+        self.calls = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.events = 0
+
+    @property
+    def name(self):
+        ''' Property. Returns the name of the Model, prefixed with the name of
+            its Module for Sockets.'''
+        if self.kind == 'socket':
+            return f'{self.model.module.name}.{self.model.name}'
+        return self.model.name
+
+    @property
+    def mean(self):
+        return self.total / self.calls if self.calls else 0.0
+
+    def add(self, elapsed, events):
+        self.calls += 1
+        self.total += elapsed
+        self.longest = max(self.longest, elapsed)
+        self.events += events
+
+
+class Profiler:
+    ''' Measures the wall time spent in, and the number of Events handled by,
+        the preprocess, process and postprocess phases of each Module, the
+        pull, push and transfer_events calls of each Socket and the updates
+        of each display of a Simulation. While enabled, the measured methods
+        of each Model are replaced by timed wrappers on the instance, and
+        the Profiler observes the Simulation to wrap Models added later. When
+        disabled, the wrappers are removed, so profiling costs nothing. Socket
+        times are also counted in the Module phase that calls them.
+
+        The Events counted are those moved into or out of the Module's queue
+        for preprocess and postprocess, those queued in the Module plus those
+        generated into its outlet Sockets, as Sources and Tanks do, for
+        process, those moved into or out of the Socket's queue for Sockets,
+        and the updates that changed the displayed text for displays.'''
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.stats = {}
+        # (Model, method name) pairs that have been wrapped.
+        self.wrapped = set()
+        self.iterations = 0
+        self.enabled = False
+
+    def enable(self):
+        ''' Starts profiling.'''
+        with self.simulation.lock:
+            if self.enabled:
+                return
+            self.enabled = True
+            self.wrap_models()
+            self.simulation.observers.append(self)
+
+    def disable(self):
+        ''' Stops profiling and removes every wrapper. The stats recorded so
+            far are kept.'''
+        with self.simulation.lock:
+            if not self.enabled:
+                return
+            self.enabled = False
+            self.simulation.observers.remove(self)
+            for model, method_name in self.wrapped:
+                delattr(model, method_name)
+            self.wrapped.clear()
+
+    def reset(self):
+        ''' Forgets all recorded stats.'''
+        with self.simulation.lock:
+            for stats in self.stats.values():
+                stats.calls = stats.events = 0
+                stats.total = stats.longest = 0.0
+            self.iterations = 0
+
+    def observe(self, simulation):
+        self.iterations += 1
+        self.wrap_models()
+
+    def wrap_models(self):
+        ''' Wraps the measured methods of any Model of the Simulation that has
+            not been wrapped yet.'''
+        for module in self.simulation.modules:
+            outlet_queues = [socket.queue for socket in module.outlet_sockets]
+            self.wrap('module', module, 'preprocess', module.queue)
+            self.wrap('module', module, 'process', module.queue, generated=outlet_queues)
+            self.wrap('module', module, 'postprocess', module.queue)
+            for socket in module.inlet_sockets + module.outlet_sockets:
+                for phase in ('pull', 'push', 'transfer_events'):
+                    self.wrap('socket', socket, phase, socket.queue)
+        for display in self.simulation.displays:
+            self.wrap('display', display, 'update')
+
+    def wrap(self, kind, model, phase, queue=None, generated=None):
+        ''' Replaces the phase method of model with a wrapper that records its
+            TimingStats. If queue is given, the change in its length is
+            counted as Events; otherwise calls that return True are. If the
+            list of queues generated is given, the length of queue after the
+            call plus the number of Events added to those queues is counted
+            instead.'''
+        if (model, phase) in self.wrapped:
+            return
+        method = getattr(model, phase)
+        key = (model, phase)
+        if key not in self.stats:
+            self.stats[key] = TimingStats(kind, model, phase)
+        stats = self.stats[key]
+        perf_counter = time.perf_counter
+
+        if queue is None:
+            def timed(*args, **kwargs):
+                start = perf_counter()
+                result = method(*args, **kwargs)
+                stats.add(perf_counter() - start, 1 if result else 0)
+                return result
+        elif generated is None:
+            def timed(*args, **kwargs):
+                length = queue.length()
+                start = perf_counter()
+                result = method(*args, **kwargs)
+                elapsed = perf_counter() - start
+                stats.add(elapsed, abs(queue.length() - length))
+                return result
+        else:
+            def timed(*args, **kwargs):
+                lengths = [generated_queue.length() for generated_queue in generated]
+                start = perf_counter()
+                result = method(*args, **kwargs)
+                elapsed = perf_counter() - start
+                events = queue.length() + sum(
+                    max(0, generated_queue.length() - length)
+                    for generated_queue, length in zip(generated, lengths))
+                stats.add(elapsed, events)
+                return result
+
+        setattr(model, phase, timed)
+        self.wrapped.add(key)
+
+    def table(self, kind=None):
+        ''' Returns a list with a dict of the stats of each measured phase, or
+            only of those of the given kind ('module', 'socket' or
+            'display'), that has been called, slowest first.'''
+        with self.simulation.lock:
+            rows = [{'kind': stats.kind, 'name': stats.name, 'phase': stats.phase,
+                     'calls': stats.calls, 'total': stats.total, 'mean': stats.mean,
+                     'longest': stats.longest, 'events': stats.events}
+                    for stats in self.stats.values()
+                    if stats.calls and (kind is None or stats.kind == kind)]
+        return sorted(rows, key=lambda row: row['total'], reverse=True)
+
+    def report(self, limit=20):
+        ''' Returns a text table of the limit slowest phases.'''
+        lines = [f'{"kind":<8} {"name":<24} {"phase":<16} {"calls":>8} {"total ms":>10} '
+                 f'{"mean us":>9} {"events":>10}']
+        for row in self.table()[:limit]:
+            lines.append(f'{row["kind"]:<8} {row["name"]:<24} {row["phase"]:<16} '
+                         f'{row["calls"]:>8} {row["total"] * 1e3:>10.2f} '
+                         f'{row["mean"] * 1e6:>9.1f} {row["events"]:>10}')
+        return '\n'.join(lines)
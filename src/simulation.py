@@ -1,27 +1,246 @@
+import threading
+from collections import deque
+
 from .event import Event
+from .event_queue import EventQueue
 from .species import Species
+from .models import Stream, Readout, PushInletSocket, PullInletSocket
+from .steady_state import SteadyStateSolver
+from .acceleration import Wegstein
+from .flowsheet_graph import execution_order
+from .convergence import SteadyStateMonitor
+from .profiling import Profiler
 
 
 class Simulation:
-    def __init__(self, gui):
+    def __init__(self, gui=None, queue_class=EventQueue, event_pool=None, freezer=None):
         self.gui = gui
-        Event.register_species([
-            Species('water', {'state': 'liquid', 'density': 997.5}), 
-            Species('fiber', {'state': 'solid', 'density': 1200})
-        ])
+        # Type of EventQueue used by every Socket and Module added to this 
+        # Simulation.
+        self.queue_class = queue_class
+        # Optional EventPool that recycles purged Events into generated ones.
+        self.event_pool = event_pool
+        # Optional SubgraphFreezer that skips Modules whose inputs have 
+        # stopped changing.
+        self.freezer = freezer
+        # This Simulation holds no Events yet, so Species may be registered
+        # for it until it runs. Simulations made before must not be run
+        # once new Species are registered.
+        Event.registry.unfreeze()
+        if not Event.registered_species:
+            Event.register_species([
+                Species('water', {'state': 'liquid', 'density': 997.5}),
+                Species('fiber', {'state': 'solid', 'density': 1200})
+            ])
 
         self.iteration = 1
+        self.running = False
         self.modules = []
         self.streams = []
         self.displays = []
+        self._schedule = None
+
+        # Held while an iteration runs. Anything that changes the Modules or 
+        # Streams while a SimulationThread is running must hold it too.
+        self.lock = threading.RLock()
+        # Parameter edits waiting to be applied between iterations.
+        self.edits = deque()
+        # SimulationThread currently running this Simulation, if any.
+        self.thread = None
+
+        # Objects notified through their observe method after the Modules 
+        # have been processed in each iteration.
+        self.monitor = SteadyStateMonitor()
+        self.observers = [self.monitor]
+        # Times Module phases, Socket transfers and display updates once
+        # enabled.
+        self.profiler = Profiler(self)
+
+    @property
+    def headless(self):
+        ''' Property. Returns True if this Simulation is not attached to an
+            ApplicationWindow.'''
+        return self.gui is None
+
+    def species(self, name):
+        ''' Returns the registered Species with the given name.'''
+        for species in Event.registered_species:
+            if species.name == name:
+                return species
+        raise KeyError(f'No Species named {name} has been registered.')
+
+    def module(self, name):
+        ''' Returns the first Module added to this Simulation with the given 
+            name.'''
+        for module in self.modules:
+            if module.name == name:
+                return module
+        raise KeyError(f'No Module named {name} has been added.')
+
+    def stream(self, name):
+        ''' Returns the first Stream added to this Simulation with the given 
+            name.'''
+        for stream in self.streams:
+            if stream.name == name:
+                return stream
+        raise KeyError(f'No Stream named {name} has been added.')
+
+    def connect(self, outlet_socket, inlet_socket, name='Stream'):
+        ''' Creates a Stream that carries flow from outlet_socket to
+            inlet_socket and returns it. Raises a ValueError if the two
+            Sockets cannot be connected.'''
+        stream = Stream(self, name)
+        if not stream.add_socket(outlet_socket) or not stream.add_socket(inlet_socket):
+            stream.cleanup()
+            raise ValueError(f'Cannot connect {outlet_socket.name} of '
+                             f'{outlet_socket.module.name} to {inlet_socket.name} '
+                             f'of {inlet_socket.module.name}.')
+        return stream
+
+    def add_readout(self, stream, readout_class=Readout, name='Readout'):
+        ''' Creates a Readout of type readout_class, connects it to stream and
+            returns it.'''
+        readout = readout_class(self, name)
+        if not readout.connect_to_stream(stream):
+            readout.cleanup()
+            raise ValueError(f'{stream.name} already has a Readout.')
+        return readout
+
+    def topology_changed(self):
+        ''' Marks the execution order of this Simulation's Modules as stale. 
+            Called whenever a Module is added or removed or a Socket is 
+            connected or disconnected, and must be called after modifying 
+            the modules list directly.'''
+        self._schedule = None
+        if self.freezer:
+            self.freezer.reset()
+
+    @property
+    def schedule(self):
+        ''' Property. Returns the Modules of this Simulation in the order they
+            are simulated each iteration. The order is only recomputed after 
+            the topology has changed.'''
+        if self._schedule is None:
+            self._schedule = execution_order(self.modules)
+        return self._schedule
+
+    def live_events(self):
+        ''' Returns the number of Events currently queued in the Modules and 
+            Sockets of this Simulation.'''
+        count = 0
+        for module in self.modules:
+            count += module.queue.length()
+            for socket in module.inlet_sockets + module.outlet_sockets:
+                count += socket.queue.length()
+        return count
+
+    def queue_edit(self, function, *args):
+        ''' Queues a call of function with args, e.g. a parameter change made 
+            in a dialog, to be applied before the next iteration. If no 
+            SimulationThread is running the edit is applied immediately.'''
+        self.edits.append((function, args))
+        if self.thread is None:
+            self.apply_edits()
+
+    def apply_edits(self):
+        ''' Applies all queued edits in the order they were made.'''
+        with self.lock:
+            while self.edits:
+                function, args = self.edits.popleft()
+                function(*args)
+
+    def step(self):
+        ''' Applies queued edits and processes all Modules that have been 
+            added to this Simulation for the current iteration, without 
+            updating displays.'''
+        with self.lock:
+            self.apply_edits()
+            Event.registry.freeze()
+            if self.freezer:
+                self.freezer.simulate(self)
+            else:
+                for module in self.schedule:
+                    module.simulate()
+
+            for observer in self.observers:
+                observer.observe(self)
+
+            self.iteration += 1
+
+    def update_displays(self):
+        ''' Updates all displays from the current flowrates. Returns the 
+            number of displays whose output changed.'''
+        Event.registry.freeze()
+        changed = 0
+        for display in self.displays:
+            if display.update():
+                changed += 1
+        return changed
 
     def run(self):
         ''' Processes all Modules and displays that have been added to this
             Simulation for the current iteration.'''
-        for module in self.modules:
-            module.simulate()
+        self.step()
+        self.update_displays()
 
-        for display in self.displays:
-            display.update()
+    def solve_steady_state(self, **kwargs):
+        ''' Solves this Simulation for steady state with a 
+            SteadyStateSolver, updates all displays and returns the solver. 
+            Keyword arguments are passed to the SteadyStateSolver.'''
+        solver = SteadyStateSolver(self, **kwargs)
+        Event.registry.freeze()
+        with self.lock:
+            solver.solve()
+        self.update_displays()
+        return solver
+
+    def warm_start(self, event_count=1000, **kwargs):
+        ''' Solves this Simulation for steady state and seeds its dynamic 
+            state with the result, so that run settles in a fraction of the 
+            iterations it takes from empty queues. Each recycle Stream, i.e. 
+            one feeding a Module scheduled no later than the Module it comes 
+            from, is given event_count queued Events carrying its steady 
+            state flows, and pull Sockets are given the capacities they 
+            settle at. Keyword arguments are passed to the SteadyStateSolver, 
+            which uses Wegstein acceleration unless another accelerator is 
+            given. Returns the solver.'''
+        kwargs.setdefault('accelerator', Wegstein())
+        with self.lock:
+            solver = self.solve_steady_state(**kwargs)
+            order = {module: i for i, module in enumerate(self.schedule)}
+            for stream in self.streams:
+                outlet_socket, inlet_socket = stream.inlet_socket, stream.outlet_socket
+                if not outlet_socket or not inlet_socket:
+                    continue
+                if (isinstance(inlet_socket, PushInletSocket)
+                    and order[inlet_socket.module] <= order[outlet_socket.module]):
+                    inlet_socket.queue.clear()
+                    inlet_socket.queue.enqueue_uniform(
+                        {species: flowrate / event_count
+                         for species, flowrate in stream.flowrates.items()},
+                        event_count, self.event_pool)
+                elif isinstance(inlet_socket, PullInletSocket):
+                    inlet_socket.capacity = sum(stream.flowrates.values())
+                    outlet_socket.capacity = inlet_socket.capacity
+            self.monitor.reset()
+            if self.freezer:
+                self.freezer.reset()
+        return solver
+
+    def run_iterations(self, iterations):
+        ''' Calls run the specified number of times.'''
+        for _ in range(iterations):
+            self.run()
 
-        self.iteration += 1     
\ No newline at end of file
+    def run_until_steady(self, max_iterations=10000):
+        ''' Runs iterations until the SteadyStateMonitor detects steady state, 
+            max_iterations have been run or running is cleared. Returns the 
+            iteration at which steady state was reached, or None if it was 
+            not.'''
+        self.running = True
+        for _ in range(max_iterations):
+            self.run()
+            if self.monitor.steady or not self.running:
+                break
+        self.running = False
+        return self.monitor.steady_iteration
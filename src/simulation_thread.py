@@ -0,0 +1,115 @@
+import threading
+import time
+
+
+class Snapshot:
+    ''' Copy of the state of a Simulation after an iteration, safe to read
+        from another thread while the Simulation keeps running.'''
+    def __init__(self, simulation, iterations_per_second=0):
+        self.iteration = simulation.iteration - 1
+        self.iterations_per_second = iterations_per_second
+        self.flowrates = {stream: dict(stream.flowrates) for stream in simulation.streams}
+        self.steady = simulation.monitor.steady
+        self.message = simulation.monitor.message
+        self.running = simulation.running
+
+
+class SimulationThread:
+    ''' Runs a Simulation on a background thread in frames of interval
+        seconds. Normally one iteration is run per frame. In max_speed mode,
+        iterations are run until frame_budget seconds of the frame have been
+        used. After each frame a Snapshot is passed to the on_snapshot
+        callable, on the background thread; the GUI relays it to the UI
+        thread through a Qt signal, so displays are refreshed once per frame
+        however many iterations were run. Parameter edits queued with
+        Simulation.queue_edit are applied between iterations. The thread
+        stops when stop is called or when the Simulation's running flag is
+        cleared, e.g. by the SteadyStateMonitor's auto-stop.'''
+    def __init__(self, simulation, interval=0.1, on_snapshot=None, max_speed=False, 
+                 frame_budget=0.08):
+        self.simulation = simulation
+        self.interval = interval
+        self.on_snapshot = on_snapshot
+        self.max_speed = max_speed
+        self.frame_budget = frame_budget
+        self.iterations_per_second = 0
+        # Iterations still to be run as fast as possible by fast_forward.
+        self.pending_iterations = 0
+        self._stop_when_done = False
+        self._pending_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def alive(self):
+        ''' Property. Returns True while the background thread is running.'''
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, stop_when_done=False):
+        ''' Starts running the Simulation on a new background thread. If 
+            stop_when_done is True, the thread stops once no fast-forward 
+            iterations are pending.'''
+        self._stop_when_done = stop_when_done
+        if self.alive:
+            return
+        self._stop_event.clear()
+        self.simulation.running = True
+        self.simulation.thread = self
+        self._thread = threading.Thread(target=self.loop, name='SimulationThread', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        ''' Stops the background thread after its current iteration and waits
+            for it to finish.'''
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def fast_forward(self, iterations):
+        ''' Runs iterations more iterations as fast as possible, still 
+            publishing a Snapshot every frame. If the thread was not running 
+            it is started, and stops again once they are done.'''
+        with self._pending_lock:
+            self.pending_iterations += iterations
+        if not self.alive:
+            self.start(stop_when_done=True)
+
+    def run_frame(self, started):
+        ''' Runs the iterations of one frame and returns how many were run.'''
+        simulation = self.simulation
+        iterations = 0
+        while simulation.running and not self._stop_event.is_set():
+            with self._pending_lock:
+                fast_forwarding = self.pending_iterations > 0
+                if fast_forwarding:
+                    self.pending_iterations -= 1
+            if self._stop_when_done and not fast_forwarding:
+                break
+            simulation.step()
+            iterations += 1
+            if not (fast_forwarding or self.max_speed):
+                break
+            if time.perf_counter() - started >= self.frame_budget:
+                break
+        return iterations
+
+    def loop(self):
+        simulation = self.simulation
+        try:
+            while not self._stop_event.is_set() and simulation.running:
+                started = time.perf_counter()
+                iterations = self.run_frame(started)
+                with simulation.lock:
+                    snapshot = Snapshot(simulation, self.iterations_per_second)
+                if self.on_snapshot:
+                    self.on_snapshot(snapshot)
+                if self._stop_when_done and not self.pending_iterations:
+                    break
+                self._stop_event.wait(max(0, self.interval - (time.perf_counter() - started)))
+                self.iterations_per_second = iterations / (time.perf_counter() - started)
+        finally:
+            with simulation.lock:
+                simulation.running = False
+                simulation.thread = None
+                # Edits queued after the last iteration are applied now.
+                simulation.apply_edits()
@@ -1,4 +1,67 @@
+from array import array
+
+
 class Species:
     def __init__(self, name, properties=None):
         self.name = name
-        self.properties = properties
\ No newline at end of file
+        self.properties = properties
+        # Position in the SpeciesRegistry, set when the Species is registered.
+        self.index = None
+
+
+class SpeciesRegistry:
+    ''' Ordered registry of the Species carried by Events. Each Species is
+        given a stable integer index, its position in species. The registry
+        is frozen before a Simulation runs, after which no Species can be
+        added and vectors of the Species' properties, indexed the same way,
+        are available to Module kernels and Readouts. It is unfrozen again
+        when a new Simulation is created. Species without a
+        'state' of 'liquid' or 'solid' are in neither mask, and those without
+        a 'density' have a density of nan.'''
+    def __init__(self):
+        self.species = []
+        self.indices = {}
+        self.frozen = False
+
+    def __len__(self):
+        return len(self.species)
+
+    def __iter__(self):
+        return iter(self.species)
+
+    def register(self, species):
+        ''' Adds species to the end of the registry. Raises a RuntimeError if 
+            the registry has been frozen.'''
+        if self.frozen:
+            raise RuntimeError('Species cannot be registered once the registry is frozen.')
+        if species in self.indices:
+            return
+        species.index = len(self.species)
+        self.indices[species] = species.index
+        self.species.append(species)
+
+    def freeze(self):
+        ''' Freezes the registry and precomputes the property vectors. Does
+            nothing if it is already frozen.'''
+        if self.frozen:
+            return
+        states = [(species.properties or {}).get('state') for species in self.species]
+        self.densities = array('d', [(species.properties or {}).get('density', float('nan'))
+                                     for species in self.species])
+        self.liquid_mask = tuple(state == 'liquid' for state in states)
+        self.solid_mask = tuple(state == 'solid' for state in states)
+        self.liquid_indices = tuple(i for i, liquid in enumerate(self.liquid_mask) if liquid)
+        self.solid_indices = tuple(i for i, solid in enumerate(self.solid_mask) if solid)
+        self.frozen = True
+
+    def unfreeze(self):
+        ''' Allows Species to be registered again. Only safe while no Events
+            are live, since Events and queues made before have no room for
+            Species registered after them. The property vectors are kept
+            until the next freeze recomputes them.'''
+        self.frozen = False
+
+    def vector(self, species_values, default=0):
+        ''' Returns the values of the species_values dict as a list in index 
+            order.'''
+        return [species_values.get(species, default) for species in self.species]
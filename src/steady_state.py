@@ -0,0 +1,102 @@
+from .event import Event
+from .flowsheet_graph import (strongly_connected_components, is_cyclic,
+                              order_component, inlet_streams)
+
+
+class SteadyStateSolver:
+    ''' Sequential-modular steady state solver. Species flow vectors, rather
+        than Events, are passed through the steady_state method of each
+        Module of a Simulation, one strongly connected component at a time in
+        upstream to downstream order. Recycle loops are broken at tear
+        Streams, and each loop is evaluated repeatedly until every Stream in
+        it changes by less than the tolerance between sweeps. If an
+        accelerator, such as a Wegstein or Aitken object, is given, the flows
+        of the tear Streams are extrapolated by it after every sweep.'''
+    def __init__(self, simulation, rel_tol=1e-9, abs_tol=1e-12, max_iterations=1000,
+                 accelerator=None):
+        self.simulation = simulation
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.max_iterations = max_iterations
+        self.accelerator = accelerator
+        self.stream_flows = {}
+        self.tear_streams = []
+        self.iterations = 0
+
+    def zero_flows(self):
+        return {species: 0 for species in Event.registered_species}
+
+    def evaluate(self, module):
+        ''' Runs the steady_state method of module on the current flows of its
+            inlet Streams and stores the flows it returns.'''
+        inlet_flows = [self.stream_flows.get(socket.stream) or self.zero_flows()
+                       for socket in module.inlet_sockets]
+        for socket, species_flows in module.steady_state(inlet_flows).items():
+            if socket.stream:
+                self.stream_flows[socket.stream] = species_flows
+
+    def converged(self, previous_flows, streams):
+        ''' Returns True if none of streams has changed from previous_flows by
+            more than the tolerance.'''
+        for stream in streams:
+            before = previous_flows.get(stream) or self.zero_flows()
+            after = self.stream_flows.get(stream) or self.zero_flows()
+            for species in Event.registered_species:
+                difference = abs(after[species] - before[species])
+                if difference > self.abs_tol + self.rel_tol * abs(after[species]):
+                    return False
+        return True
+
+    def accelerate(self, previous_flows, tear_streams):
+        ''' Replaces the flows of tear_streams with those extrapolated by the
+            accelerator from their flows before and after the last sweep.'''
+        species = Event.registered_species
+        x = [(previous_flows.get(stream) or self.zero_flows())[s]
+             for stream in tear_streams for s in species]
+        gx = [(self.stream_flows.get(stream) or self.zero_flows())[s]
+              for stream in tear_streams for s in species]
+        flows = iter(self.accelerator.accelerate(x, gx))
+        for stream in tear_streams:
+            self.stream_flows[stream] = {s: next(flows) for s in species}
+
+    def solve_component(self, order, tear_streams):
+        ''' Evaluates the Modules of a recycle loop in order until its Streams
+            converge. Returns the number of sweeps made.'''
+        streams = set(tear_streams)
+        for module in order:
+            streams.update(inlet_streams(module))
+        if self.accelerator:
+            self.accelerator.reset()
+
+        for sweep in range(1, self.max_iterations + 1):
+            previous_flows = {stream: self.stream_flows.get(stream) for stream in streams}
+            for module in order:
+                self.evaluate(module)
+            if self.converged(previous_flows, streams):
+                return sweep
+            if self.accelerator:
+                self.accelerate(previous_flows, tear_streams)
+
+        raise RuntimeError(f'Steady state did not converge within {self.max_iterations} '
+                           f'iterations.')
+
+    def solve(self):
+        ''' Solves the Simulation for steady state, assigns the resulting flows
+            to the flowrates of its Streams and returns them as a dict mapping
+            each Stream to its species flows.'''
+        self.stream_flows = {}
+        self.tear_streams = []
+        self.iterations = 0
+
+        modules = self.simulation.modules
+        for component in strongly_connected_components(modules):
+            order, tear_streams = order_component(component, modules)
+            if is_cyclic(component):
+                self.tear_streams.extend(tear_streams)
+                self.iterations = max(self.iterations, self.solve_component(order, tear_streams))
+            else:
+                self.evaluate(component[0])
+
+        for stream in self.simulation.streams:
+            stream.flowrates = dict(self.stream_flows.get(stream) or self.zero_flows())
+        return self.stream_flows
@@ -0,0 +1,164 @@
+''' Parameter sweeps over headless Simulations. A flowsheet is defined by a
+    builder function such as flowsheets.single_stage, which adds its Modules
+    and Streams to a Simulation and returns a dict of the Streams of
+    interest. Every combination of the values in a parameter grid is built
+    into its own Simulation, run to steady state and reduced to the
+    flowrates of those Streams. The cases are independent, so they are
+    spread over the cores of the machine with a ProcessPoolExecutor. The
+    builder must be defined at module level so that it can be pickled.'''
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .event import Event
+from .simulation import Simulation
+from .array_event_queue import ArrayEventQueue
+from .acceleration import Wegstein
+
+
+def expand_grid(grid):
+    ''' Returns a list of dicts holding every combination of the values in
+        grid, a dict of lists of values. Later keys vary fastest.'''
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+def apply_setting(simulation, name, value):
+    ''' Sets the setting of simulation named 'Module.attribute' to value,
+        through the Module's set_attribute method if it has one. Module is
+        the name of a Module, or else the name of a Module class, such as
+        Hydrocyclone, in which case the setting is applied to every Module of
+        that class. Species names in a dict value, e.g. for
+        volumetric_fractions, are replaced by the registered Species.'''
+    module_name, _, attribute = name.partition('.')
+    modules = ([module for module in simulation.modules if module.name == module_name]
+               or [module for module in simulation.modules
+                   if type(module).__name__ == module_name])
+    if not modules:
+        raise KeyError(f'No Module or Module class named {module_name} has been added.')
+    if isinstance(value, dict):
+        value = {simulation.species(key) if isinstance(key, str) else key: fraction
+                 for key, fraction in value.items()}
+
+    for module in modules:
+        setter = getattr(module, f'set_{attribute}', None)
+        if setter is not None:
+            setter(value)
+        elif hasattr(module, attribute):
+            setattr(module, attribute, value)
+        else:
+            raise AttributeError(f'Module {module.name} has no setting named {attribute}.')
+
+def build_case(builder, settings, queue_class=ArrayEventQueue):
+    ''' Builds a headless Simulation with builder and returns it along with
+        the dict of Streams builder returns. Settings named 'Module.attribute'
+        are applied to the built Modules and all other settings are passed to
+        builder as keyword arguments.'''
+    simulation = Simulation(queue_class=queue_class)
+    streams = builder(simulation, **{name: value for name, value in settings.items()
+                                     if '.' not in name})
+    for name, value in settings.items():
+        if '.' in name:
+            apply_setting(simulation, name, value)
+    return simulation, streams
+
+def solve_case(simulation, method='dynamic', max_iterations=2000, rel_tol=1e-3, window=10):
+    ''' Runs simulation to steady state. With method 'dynamic' it is run until
+        its SteadyStateMonitor, with the given rel_tol and window, detects
+        steady state or max_iterations have been run. With method 'solver' it
+        is solved by a SteadyStateSolver instead, which gives up after
+        max_iterations sweeps of any recycle loop. Returns the number of
+        iterations or sweeps and whether steady state was reached.'''
+    if method == 'dynamic':
+        simulation.monitor.rel_tol = rel_tol
+        simulation.monitor.window = window
+        steady_iteration = simulation.run_until_steady(max_iterations)
+        return simulation.iteration - 1, steady_iteration is not None
+    if method == 'solver':
+        try:
+            solver = simulation.solve_steady_state(max_iterations=max_iterations,
+                                                   accelerator=Wegstein())
+        except RuntimeError:
+            return max_iterations, False
+        return solver.iterations, True
+    raise ValueError(f'Unknown steady state method {method}.')
+
+def run_case(builder, settings, queue_class=ArrayEventQueue, **options):
+    ''' Builds a case with build_case and runs it to steady state with
+        solve_case, which is given the keyword arguments. Returns the column
+        names, the flowrates of each Species in each returned Stream, the
+        number of iterations or sweeps and whether steady state was
+        reached.'''
+    simulation, streams = build_case(builder, settings, queue_class)
+    iterations, steady = solve_case(simulation, **options)
+    columns = [f'{name}.{species.name}' for name in streams
+               for species in Event.registered_species]
+    flowrates = [stream.flowrates[species] for stream in streams.values()
+                 for species in Event.registered_species]
+    return columns, flowrates, iterations, steady
+
+def _run_case(arguments):
+    builder, settings, options = arguments
+    return run_case(builder, settings, **options)
+
+
+class SweepResult:
+    ''' Results of a parameter sweep, one row per case. cases holds the
+        settings of each case, flowrates is a (cases, columns) array of the
+        flowrate of each column, named 'stream.species', or nan if the
+        Stream was not built for that case, and iterations and
+        steady hold the iterations each case was run for and whether it
+        reached steady state.'''
+    def __init__(self, cases, columns, flowrates, iterations, steady):
+        self.cases = cases
+        self.columns = columns
+        self.flowrates = flowrates
+        self.iterations = iterations
+        self.steady = steady
+
+    def __len__(self):
+        return len(self.cases)
+
+    def column(self, name):
+        ''' Returns the flowrates of the column with the given name across all
+            cases.'''
+        return self.flowrates[:, self.columns.index(name)]
+
+    def rows(self):
+        ''' Returns a list of dicts holding the settings and flowrates of each
+            case.'''
+        return [{**settings, **dict(zip(self.columns, flowrates))}
+                for settings, flowrates in zip(self.cases, self.flowrates.tolist())]
+
+
+def sweep(builder, grid, fixed=None, workers=None, chunksize=1, **options):
+    ''' Runs a case for every combination of the values in grid, a dict of
+        lists of settings, and returns a SweepResult. The settings in fixed
+        are applied to every case. Cases are run on a ProcessPoolExecutor
+        with the given number of worker processes, by default one per core,
+        or in this process if workers is 1. Other keyword arguments are
+        passed to run_case.'''
+    cases = [{**(fixed or {}), **settings} for settings in expand_grid(grid)]
+    arguments = [(builder, settings, options) for settings in cases]
+    if workers == 1:
+        results = list(map(_run_case, arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_run_case, arguments, chunksize=chunksize))
+
+    # Cases may build different Streams, e.g. when the number of stages is
+    # swept, so the columns are the union of those of every case.
+    columns = list(dict.fromkeys(column for case_columns, _, _, _ in results
+                                 for column in case_columns))
+    flowrates = np.full((len(cases), len(columns)), np.nan)
+    indices = {column: index for index, column in enumerate(columns)}
+    for row, (case_columns, case_flowrates, _, _) in enumerate(results):
+        flowrates[row, [indices[column] for column in case_columns]] = case_flowrates
+    return SweepResult(
+        cases,
+        columns,
+        flowrates,
+        np.array([iterations for _, _, iterations, _ in results], dtype=int),
+        np.array([steady for _, _, _, steady in results], dtype=bool)
+    )
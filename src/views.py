@@ -6,15 +6,33 @@ from PyQt5.QtCore import Qt, QPoint, QRectF, QLineF, QPointF
 
 import src.models as models
 from src.graphics_module_items import GraphicsModuleItem, GraphicsPushSocketItem, GraphicsPullSocketItem
+from src.dialogs import ModelDialog, PumpDialog, TankDialog, SourceDialog, HydrocycloneDialog
+
+
+def scene_bounds(item):
+    ''' Returns the scene rect of item and its children as [x, y, width, 
+        height].'''
+    rect = item.mapRectToScene(item.boundingRect() | item.childrenBoundingRect())
+    return [rect.x(), rect.y(), rect.width(), rect.height()]
+
+def line_coordinates(line):
+    return [line.x1(), line.y1(), line.x2(), line.y2()]
 
 
 class View:
+    dialog_class = ModelDialog
+    # Pixmaps loaded so far, by image path. QPixmaps are implicitly shared, 
+    # so every View of a type shares one image.
+    pixmaps = {}
+
     def __init__(self, model, image_path=None):
         self.model = model
         self.model.gui.views.append(self)
         self.image_path = image_path
         if self.image_path:
-            self.pixmap = QPixmap(self.image_path)
+            if self.image_path not in View.pixmaps:
+                View.pixmaps[self.image_path] = QPixmap(self.image_path)
+            self.pixmap = View.pixmaps[self.image_path]
         else:
             self.pixmap = None
         self.graphics_item = None
@@ -29,6 +47,18 @@ class View:
         self.model.gui.scene.removeItem(self.graphics_item)
         self.model.gui.views.remove(self)
 
+    def layout(self):
+        ''' Returns a dict of the position and scene bounds of this View, as 
+            saved in flowsheet files.'''
+        position = self.graphics_item.pos()
+        return {'position': [position.x(), position.y()], 
+                'bounds': scene_bounds(self.graphics_item)}
+
+    def restore(self, scene, layout):
+        ''' Adds this View to scene and places it as described by layout.'''
+        self.add_to_scene(scene)
+        self.graphics_item.setPos(QPointF(*layout['position']))
+
 
 class ReadoutView(View):
     class Orientation(Enum):
@@ -44,6 +74,8 @@ class ReadoutView(View):
         inner_rect_item.setBrush(Qt.white)
 
         self.text_item = None
+        # Text last set on text_item, so unchanged text is not set again.
+        self.shown_text = None
         self.orientation = ReadoutView.Orientation.horizontal
 
     def line(self):
@@ -61,6 +93,27 @@ class ReadoutView(View):
         height = self.graphics_item.boundingRect().height()
         self.text_item = QGraphicsTextItem(self.graphics_item)
         self.text_item.setPos(width / 2 + 2, -height)
+        self.shown_text = None
+
+    def layout(self):
+        layout = super().layout()
+        line = self.line()
+        layout['line'] = line_coordinates(line) if line else None
+        layout['orientation'] = self.orientation.name
+        return layout
+
+    def restore(self, scene, layout):
+        scene.addItem(self.graphics_item)
+        self.graphics_item.setPos(QPointF(*layout['position']))
+        self.orientation = ReadoutView.Orientation[layout['orientation']]
+        if layout['line']:
+            line_item = QGraphicsLineItem(QLineF(*layout['line']), self.graphics_item)
+            pen = QPen()
+            pen.setWidth(2)
+            line_item.setPen(pen)
+            line_item.setZValue(-1)
+        self.init_text()
+        self.model.set_text(self.model.text)
      
 
 class StreamView(View):
@@ -75,6 +128,20 @@ class StreamView(View):
     def set_lines(self, *args):
         for line in args:
             self.add_graphics_line_item(line)
+
+    def layout(self):
+        bounds = None
+        for line_item in self.line_items:
+            rect = line_item.sceneBoundingRect()
+            bounds = rect if bounds is None else bounds | rect
+        return {'lines': [line_coordinates(line_item.line()) for line_item in self.line_items],
+                'bounds': [bounds.x(), bounds.y(), bounds.width(), bounds.height()] 
+                          if bounds else None}
+
+    def restore(self, scene, layout):
+        self.set_lines(*(QLineF(*line) for line in layout['lines']))
+        if self.line_items:
+            self.graphics_item = self.line_items[0]
   
     @property
     def line_items(self):
@@ -148,7 +215,7 @@ class StreamView(View):
 
     def adjust_connected_views(self):
         readout = self.model.readout
-        if not readout:
+        if not readout or not readout.view:
             return
 
         left_line_item = self.get_left_line_item()
@@ -320,6 +387,8 @@ class ModuleView(View):
 
 
 class SourceView(ModuleView):
+    dialog_class = SourceDialog
+
     def __init__(self, model):
         super().__init__(model, 'assets/source.png')
 
@@ -330,6 +399,8 @@ class SourceView(ModuleView):
 
 
 class TankView(ModuleView):
+    dialog_class = TankDialog
+
     def __init__(self, model):
         super().__init__(model, 'assets/tank.png')
 
@@ -368,6 +439,8 @@ class SplitterView(ModuleView):
 
 
 class HydrocycloneView(ModuleView):
+    dialog_class = HydrocycloneDialog
+
     def __init__(self, model):
         super().__init__(model, 'assets/hydrocyclone.png')
 
@@ -402,6 +475,8 @@ class JoinerView(ModuleView):
         socket.view.set_pos(QPoint(49, 20))
 
 class PumpView(ModuleView):
+    dialog_class = PumpDialog
+
     def __init__(self, model):
         super().__init__(model, 'assets/pump.png')
 
@@ -416,4 +491,44 @@ class PumpView(ModuleView):
 
         socket = self.model.outlet_sockets[0]
         socket.view.graphics_item.setParentItem(self.graphics_item)
-        socket.view.set_pos(QPoint(76, 2))
\ No newline at end of file
+        socket.view.set_pos(QPoint(76, 2))
+
+
+# Maps Model types to the View types that display them. Subclasses of a Model
+# type use its View unless they have an entry of their own.
+view_classes = {
+    models.Readout: ReadoutView,
+    models.Stream: StreamView,
+    models.Socket: SocketView,
+    models.Source: SourceView,
+    models.Tank: TankView,
+    models.Sink: SinkView,
+    models.Splitter: SplitterView,
+    models.Hydrocyclone: HydrocycloneView,
+    models.Joiner: JoinerView,
+    models.Pump: PumpView
+}
+
+def attach_view(model):
+    ''' Creates the View for model, along with the Views of any Sockets 
+        belonging to it, and assigns it to model.view. Returns the View.'''
+    for socket in getattr(model, 'inlet_sockets', []) + getattr(model, 'outlet_sockets', []):
+        if not socket.view:
+            attach_view(socket)
+
+    for model_class in type(model).__mro__:
+        if model_class in view_classes:
+            model.view = view_classes[model_class](model)
+            if isinstance(model, models.Socket):
+                model.view.set_connected(model.stream is not None)
+            return model.view
+
+    raise TypeError(f'No View is defined for {type(model).__name__}.')
+
+def restore_view(model, scene):
+    ''' Creates the View for model, adds it to scene as described by the 
+        layout model was loaded with and returns it.'''
+    view = attach_view(model)
+    view.restore(scene, model.layout)
+    model.layout = None
+    return view
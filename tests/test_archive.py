@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.simulation import Simulation
+from src.models import Source, Sink
+from src.flowsheets import single_stage
+from src.archive import TrajectoryWriter, TrajectoryReader
+
+
+class TestTrajectoryArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'trajectory')
+        self.simulation = Simulation()
+        self.streams = single_stage(self.simulation, event_rate=10)
+        self.water = self.simulation.species('water')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, iterations, chunk_size=4):
+        feed_water = []
+        with TrajectoryWriter(self.path, chunk_size=chunk_size) as writer:
+            self.simulation.observers.append(writer)
+            for _ in range(iterations):
+                self.simulation.run()
+                feed_water.append(self.streams['stage1_feed'].flowrates[self.water])
+        return feed_water
+
+    def test_read_range(self):
+        feed_water = self.record(10)
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(len(reader), 10)
+        self.assertEqual(len(reader.blocks), 3)
+        self.assertListEqual(reader.stream_names,
+                             ['Feed', 'Dilution1', 'Stage1Feed', 'Accepts', 'Rejects'])
+
+        iterations, values = reader.read_streams(['Stage1Feed', 'Accepts'], start=3, stop=8)
+        self.assertListEqual(iterations.tolist(), [3, 4, 5, 6, 7])
+        self.assertEqual(values.shape, (2, 5, 3))
+        water = reader.species.index('water')
+        self.assertListEqual(values[0, :, water].tolist(), feed_water[2:7])
+        self.assertListEqual(values[1, :, -1].tolist(),
+                             [float(self.streams['accepts'].event_count)] * 5)
+
+        iterations, values = reader.read_streams(start=100)
+        self.assertEqual(len(iterations), 0)
+        self.assertEqual(values.shape, (5, 0, 3))
+
+    def test_modules(self):
+        self.record(6)
+        iterations, values = TrajectoryReader(self.path).read_modules(['Tank1', 'Stage1'])
+        self.assertListEqual(iterations.tolist(), list(range(1, 7)))
+        self.assertEqual(values.shape, (2, 6, 2))
+        self.assertTrue((values >= 0).all())
+
+    def test_topology_change(self):
+        with TrajectoryWriter(self.path, chunk_size=100) as writer:
+            self.simulation.observers.append(writer)
+            self.simulation.run_iterations(3)
+            source = Source(self.simulation, 'Source2', 100)
+            sink = Sink(self.simulation, 'Sink2')
+            self.simulation.connect(source.outlet_sockets[0], sink.inlet_sockets[0], 'Feed')
+            self.simulation.run_iterations(2)
+
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(len(reader.blocks), 2)
+        self.assertIn('Feed (2)', reader.stream_names)
+        iterations, values = reader.read_streams(['Feed (2)'])
+        self.assertListEqual(iterations.tolist(), [1, 2, 3, 4, 5])
+        self.assertTrue(np.isnan(values[0, :3]).all())
+        self.assertFalse(np.isnan(values[0, 3:]).any())
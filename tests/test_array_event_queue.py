@@ -0,0 +1,43 @@
+from src.event import Event
+from src.event_queue import EventQueue
+from src.array_event_queue import ArrayEventQueue
+from tests import test_event_queue
+
+
+class TestArrayEventQueue(test_event_queue.TestEventQueue):
+    queue_class = ArrayEventQueue
+
+    def test_growth(self):
+        queue = ArrayEventQueue(initial_capacity=2)
+        for i in range(100):
+            queue.enqueue(Event([(self.water, i), (self.fiber, 0)]))
+            if i % 3 == 0:
+                queue.dequeue()
+        self.assertEqual(queue.length(), 66)
+        self.assertEqual(queue.peek().species_magnitude(self.water), 34)
+        self.assertEqual(queue.magnitude, sum(range(34, 100)))
+
+    def test_transfer_to_event_queue(self):
+        destination = EventQueue()
+        transferred = self.queue.transfer(destination, 35)
+        self.assertEqual(transferred, {self.water: 27, self.fiber: 3})
+        self.assertEqual(destination.species_magnitudes, {self.water: 27, self.fiber: 3})
+
+    def test_set_event_species_magnitude(self):
+        with self.assertRaises(NotImplementedError):
+            self.queue.set_event_species_magnitude(self.queue.peek(), self.fiber, 6)
+
+    def test_debug_detects_untracked_edit(self):
+        self.queue.rows[self.queue.head, 0] = 0
+        EventQueue.debug = True
+        try:
+            with self.assertRaises(RuntimeError):
+                self.queue.magnitude
+        finally:
+            EventQueue.debug = False
+
+    def test_transfer_uniform_to_event_queue(self):
+        destination = EventQueue()
+        self.assertEqual(self.queue.transfer_uniform(destination, 2, {self.water: 1, self.fiber: 1}), 2)
+        self.assertEqual(destination.magnitude, 4)
+        self.assertEqual(self.queue.magnitude, 70)
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.simulation import Simulation
+from src.event_queue import EventQueue
+from src.array_event_queue import ArrayEventQueue
+from src.flowsheets import cascade, single_stage
+from src.checkpoint import save_checkpoint, load_checkpoint, queues
+
+
+def stream_flowrates(simulation):
+    return [dict(stream.flowrates) for stream in simulation.streams]
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cascade.chk')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check_resume(self, queue_class):
+        simulation = Simulation(queue_class=queue_class)
+        cascade(simulation, event_rate=50)
+        simulation.run_iterations(30)
+        save_checkpoint(simulation, self.path)
+
+        restored = Simulation(queue_class=queue_class)
+        cascade(restored, event_rate=50)
+        load_checkpoint(restored, self.path)
+        self.assertEqual(restored.iteration, simulation.iteration)
+        self.assertEqual(restored.live_events(), simulation.live_events())
+        self.assertListEqual(stream_flowrates(restored), stream_flowrates(simulation))
+        for queue, restored_queue in zip(queues(simulation), queues(restored)):
+            np.testing.assert_array_equal(np.asarray(restored_queue.queued_rows()),
+                                          np.asarray(queue.queued_rows()))
+            self.assertDictEqual(restored_queue.species_magnitudes, queue.species_magnitudes)
+
+        # The restored run continues exactly like the original one.
+        simulation.run_iterations(20)
+        restored.run_iterations(20)
+        self.assertListEqual(stream_flowrates(restored), stream_flowrates(simulation))
+
+    def test_resume_event_queue(self):
+        self.check_resume(EventQueue)
+
+    def test_resume_array_event_queue(self):
+        self.check_resume(ArrayEventQueue)
+
+    def test_empty(self):
+        simulation = Simulation()
+        single_stage(simulation)
+        save_checkpoint(simulation, self.path)
+        load_checkpoint(simulation, self.path)
+        self.assertEqual(simulation.live_events(), 0)
+
+    def test_incompatible(self):
+        simulation = Simulation()
+        single_stage(simulation)
+        save_checkpoint(simulation, self.path)
+        other = Simulation()
+        cascade(other)
+        with self.assertRaises(ValueError):
+            load_checkpoint(other, self.path)
+
+        with open(self.path, 'wb') as file:
+            file.write(b'not a checkpoint')
+        with self.assertRaises(ValueError):
+            load_checkpoint(simulation, self.path)
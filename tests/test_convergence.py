@@ -0,0 +1,44 @@
+import unittest
+
+from src.simulation import Simulation
+from src.flowsheets import single_stage, cascade
+
+
+class TestSteadyStateMonitor(unittest.TestCase):
+    def test_single_stage(self):
+        simulation = Simulation()
+        single_stage(simulation, event_rate=10)
+        simulation.monitor.window = 5
+        iteration = simulation.run_until_steady(100)
+
+        # Pump makeup flow arrives in iteration 3, after which nothing changes.
+        self.assertEqual(iteration, 8)
+        self.assertEqual(simulation.iteration, 9)
+        self.assertFalse(simulation.running)
+        self.assertEqual(simulation.monitor.message, 'Steady state reached at iteration 8')
+
+    def test_reset_on_change(self):
+        simulation = Simulation()
+        single_stage(simulation, event_rate=10)
+        simulation.run_until_steady(100)
+        simulation.module('Stage1').rrv = 0.1
+        simulation.run_iterations(2)
+        self.assertFalse(simulation.monitor.steady)
+        self.assertIsNone(simulation.monitor.steady_iteration)
+        self.assertIsNotNone(simulation.run_until_steady(100))
+
+    def test_auto_stop(self):
+        simulation = Simulation()
+        single_stage(simulation, event_rate=10)
+        simulation.monitor.auto_stop = True
+        simulation.running = True
+        while simulation.running and simulation.iteration < 100:
+            simulation.run()
+        self.assertTrue(simulation.monitor.steady)
+        self.assertEqual(simulation.iteration, simulation.monitor.steady_iteration + 1)
+
+    def test_max_iterations(self):
+        simulation = Simulation()
+        cascade(simulation, event_rate=10)
+        self.assertIsNone(simulation.run_until_steady(3))
+        self.assertEqual(simulation.iteration, 4)
@@ -0,0 +1,55 @@
+import unittest
+
+from array import array
+
+from src.event import Event
+from src.event_pool import EventPool
+from src.event_queue import EventQueue
+from src.simulation import Simulation
+from src.models import Source, Sink
+
+
+class TestEventPool(unittest.TestCase):
+    def setUp(self):
+        simulation = Simulation()
+        self.water = simulation.species('water')
+        self.fiber = simulation.species('fiber')
+        self.pool = EventPool(max_size=2)
+
+    def test_acquire_miss(self):
+        event = self.pool.acquire([(self.water, 3)])
+        self.assertEqual(list(event.magnitudes), [3, 0])
+        self.assertEqual((self.pool.hits, self.pool.misses), (0, 1))
+
+    def test_acquire_hit(self):
+        released = Event([(self.water, 3), (self.fiber, 4)])
+        self.pool.release(released)
+        event = self.pool.acquire([(self.fiber, 1)])
+        self.assertIs(event, released)
+        self.assertEqual(list(event.magnitudes), [0, 1])
+        self.assertEqual((self.pool.hits, self.pool.misses), (1, 0))
+
+        self.pool.release(event)
+        event = self.pool.acquire_magnitudes(array('d', [5, 6]))
+        self.assertIs(event, released)
+        self.assertEqual(list(event.magnitudes), [5, 6])
+        self.assertEqual(self.pool.hit_rate, 1)
+
+    def test_bounded(self):
+        queue = EventQueue()
+        for _ in range(3):
+            queue.enqueue(Event([(self.water, 1)]))
+        queue.purge(self.pool)
+        self.assertTrue(queue.empty())
+        self.assertEqual(len(self.pool), 2)
+        self.assertEqual(self.pool.dropped, 1)
+
+    def test_recycling(self):
+        simulation = Simulation(event_pool=EventPool())
+        source = Source(simulation, event_rate=10)
+        sink = Sink(simulation)
+        stream = simulation.connect(source.outlet_sockets[0], sink.inlet_sockets[0])
+        simulation.run_iterations(5)
+        self.assertEqual(simulation.event_pool.misses, 10)
+        self.assertEqual(simulation.event_pool.hits, 40)
+        self.assertAlmostEqual(sum(stream.flowrates.values()), 10000)
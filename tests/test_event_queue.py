@@ -1,6 +1,118 @@
 import unittest
 
+from src.event import Event
 from src.event_queue import EventQueue
+from src.simulation import Simulation
+
 
 class TestEventQueue(unittest.TestCase):
-    pass
\ No newline at end of file
+    queue_class = EventQueue
+
+    def setUp(self):
+        simulation = Simulation()
+        self.water = simulation.species('water')
+        self.fiber = simulation.species('fiber')
+        self.queue = self.queue_class()
+        for i in range(1, 5):
+            self.queue.enqueue(Event([(self.water, 9 * i), (self.fiber, i)]))
+
+    def test_enqueue_dequeue(self):
+        self.assertEqual(self.queue.length(), 4)
+        self.assertEqual(self.queue.peek().aggregate_magnitude(), 10)
+        event = self.queue.dequeue()
+        self.assertEqual(event.species_magnitude(self.water), 9)
+        self.assertEqual(event.species_magnitude(self.fiber), 1)
+        self.assertEqual(self.queue.length(), 3)
+
+    def test_magnitudes(self):
+        self.assertEqual(self.queue.magnitude, 100)
+        self.assertEqual(self.queue.species_magnitudes, {self.water: 90, self.fiber: 10})
+
+    def test_clear(self):
+        self.queue.clear()
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(self.queue.magnitude, 0)
+
+    def test_transfer(self):
+        destination = self.queue_class()
+        transferred = self.queue.transfer(destination, 35)
+        self.assertEqual(transferred, {self.water: 27, self.fiber: 3})
+        self.assertEqual(destination.length(), 2)
+        self.assertEqual(self.queue.length(), 2)
+
+        transferred = self.queue.transfer(destination)
+        self.assertEqual(transferred, {self.water: 63, self.fiber: 7})
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(destination.magnitude, 100)
+
+    def test_transfer_at_running_total(self):
+        # The running total of these Events differs from the sum of their 
+        # magnitudes in the last bit, so every queue class must count them one 
+        # by one to agree on how many fit.
+        magnitudes = [(0.814466863291336, 0.540283606970324),
+                      (0.9638385459738009, 0.603185627961383),
+                      (0.5876170641754364, 0.4449890262755162),
+                      (0.5962868615831063, 0.38490114597266045),
+                      (0.5756510141648885, 0.290329502402758)]
+        queue = self.queue_class()
+        for water, fiber in magnitudes:
+            queue.enqueue(Event([(self.water, water), (self.fiber, fiber)]))
+        capacity = queue.magnitude
+        expected = 0
+        total = 0
+        for water, fiber in magnitudes:
+            if total + (water + fiber) > capacity:
+                break
+            total += water + fiber
+            expected += 1
+
+        destination = self.queue_class()
+        queue.transfer(destination, capacity)
+        self.assertEqual(destination.length(), expected)
+
+    def test_transfer_uniform(self):
+        destination = self.queue_class()
+        transferred = self.queue.transfer_uniform(destination, 3, {self.water: 4, self.fiber: 1})
+        self.assertEqual(transferred, 3)
+        self.assertEqual(destination.species_magnitudes, {self.water: 12, self.fiber: 3})
+        self.assertEqual(self.queue.magnitude, 40)
+
+        transferred = self.queue.transfer_uniform(destination, 3, {self.water: 0, self.fiber: 0})
+        self.assertEqual(transferred, 1)
+        self.assertTrue(self.queue.empty())
+
+    def test_set_event_species_magnitude(self):
+        event = self.queue.peek()
+        self.queue.set_event_species_magnitude(event, self.fiber, 6)
+        self.assertEqual(event.species_magnitude(self.fiber), 6)
+        self.assertEqual(self.queue.species_magnitudes, {self.water: 90, self.fiber: 15})
+
+    def test_running_totals(self):
+        EventQueue.debug = True
+        try:
+            destination = self.queue_class()
+            self.queue.transfer(destination, 50)
+            self.queue.transfer_uniform(destination, 1, {self.water: .1, self.fiber: .2})
+            destination.dequeue()
+            self.assertAlmostEqual(self.queue.magnitude, 40)
+            self.assertAlmostEqual(destination.magnitude, 20.3)
+            destination.clear()
+            self.assertEqual(destination.species_magnitudes, {self.water: 0, self.fiber: 0})
+        finally:
+            EventQueue.debug = False
+
+    def test_debug_detects_untracked_edit(self):
+        self.queue.peek().set_species_magnitude(self.water, 0)
+        EventQueue.debug = True
+        try:
+            with self.assertRaises(RuntimeError):
+                self.queue.magnitude
+        finally:
+            EventQueue.debug = False
+
+    def test_enqueue_uniform(self):
+        queue = self.queue_class()
+        queue.enqueue_uniform({self.water: 2, self.fiber: .5}, 1000)
+        self.assertEqual(queue.length(), 1000)
+        self.assertEqual(queue.species_magnitudes, {self.water: 2000, self.fiber: 500})
+        self.assertEqual(queue.dequeue().aggregate_magnitude(), 2.5)
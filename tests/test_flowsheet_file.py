@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+from src.event import Event
+from src.simulation import Simulation
+from src.models import FiberReadout, Readout
+from src.flowsheets import cascade
+from src.flowsheet_file import (flowsheet_to_dict, flowsheet_from_dict, save_flowsheet,
+                                load_flowsheet, VERSION)
+
+
+def describe(simulation):
+    ''' Returns the topology and settings of simulation's Modules, Streams and
+        Readouts.'''
+    return ([(type(module).__name__, module.name, module.parameters(),
+              [socket.capacity for socket in module.inlet_sockets + module.outlet_sockets])
+             for module in simulation.modules],
+            [(stream.name, stream.inlet_socket.module.name, stream.inlet_socket.name,
+              stream.outlet_socket.module.name, stream.outlet_socket.name)
+             for stream in simulation.streams],
+            [(type(readout).__name__, readout.name, readout.stream.name)
+             for readout in simulation.displays])
+
+
+class TestFlowsheetFile(unittest.TestCase):
+    def setUp(self):
+        self.simulation = Simulation()
+        self.streams = cascade(self.simulation, event_rate=100)
+        self.simulation.module('Stage2').rrv = 0.12
+        self.simulation.module('Pump3').set_capacity(250)
+        self.simulation.add_readout(self.streams['accepts'], FiberReadout, 'AcceptsReadout')
+        self.simulation.add_readout(self.streams['rejects'], Readout, 'RejectsReadout')
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cascade.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        save_flowsheet(self.simulation, self.path)
+        loaded = load_flowsheet(self.path)
+        self.assertIsNot(loaded, self.simulation)
+        self.assertTrue(loaded.headless)
+        self.assertEqual(describe(loaded), describe(self.simulation))
+        self.assertNotIn('PyQt5', sys.modules)
+
+        # Both flowsheets solve to the same steady state.
+        self.simulation.solve_steady_state()
+        loaded.solve_steady_state()
+        for stream, loaded_stream in zip(self.simulation.streams, loaded.streams):
+            self.assertDictEqual(loaded_stream.flowrates, stream.flowrates)
+
+        self.assertEqual(flowsheet_to_dict(loaded), flowsheet_to_dict(self.simulation))
+
+    def test_layout(self):
+        data = flowsheet_to_dict(self.simulation)
+        self.assertIsNone(data['modules'][0]['layout'])
+        data['modules'][0]['layout'] = {'position': [10, 20], 'bounds': [5, 15, 100, 100]}
+        data['streams'][0]['layout'] = {'lines': [[0, 0, 10, 0]], 'bounds': [0, -1, 10, 2]}
+
+        loaded = flowsheet_from_dict(json.loads(json.dumps(data)), Simulation())
+        self.assertEqual(loaded.modules[0].layout['position'], [10, 20])
+        self.assertEqual(loaded.streams[0].layout['lines'], [[0, 0, 10, 0]])
+        # Layouts of Models without Views are saved unchanged.
+        self.assertEqual(flowsheet_to_dict(loaded), data)
+
+    def test_version(self):
+        data = flowsheet_to_dict(self.simulation)
+        self.assertEqual(data['version'], VERSION)
+        data['version'] = VERSION + 1
+        with self.assertRaises(ValueError):
+            flowsheet_from_dict(data, Simulation())
+        with self.assertRaises(ValueError):
+            flowsheet_from_dict({'modules': []}, Simulation())
+
+    def test_strict_json(self):
+        save_flowsheet(self.simulation, self.path)
+        with open(self.path) as file:
+            data = json.load(file, parse_constant=lambda constant: self.fail(constant))
+        accepts = next(record for record in data['modules'] if record['name'] == 'Accepts')
+        self.assertEqual(accepts['capacity'], 'inf')
+        loaded = load_flowsheet(self.path)
+        self.assertEqual(loaded.module('Accepts').capacity(), float('inf'))
+
+    def test_new_species_after_run(self):
+        data = flowsheet_to_dict(self.simulation)
+        data['species'].append({'name': 'clay', 'properties': {'state': 'solid'}})
+        self.simulation.run()
+        with self.assertRaises(ValueError):
+            flowsheet_from_dict(data, self.simulation)
+        # A new Simulation can take new Species again.
+        Simulation()
+        self.assertFalse(Event.registry.frozen)
@@ -0,0 +1,48 @@
+import random
+import unittest
+import warnings
+
+import numpy as np
+
+from src.formatting import round_sigfigs
+
+try:
+    import sigfig
+except ImportError:
+    sigfig = None
+
+
+class TestRoundSigfigs(unittest.TestCase):
+    def test_values(self):
+        self.assertEqual(round_sigfigs(4590.918, 3), 4590.0)
+        self.assertEqual(round_sigfigs(0.19787, 3), 0.198)
+        self.assertEqual(round_sigfigs(999.6, 3), 1000.0)
+        self.assertEqual(round_sigfigs(-45.678, 3), -45.7)
+        self.assertEqual(round_sigfigs(2.675, 3), 2.68)
+        self.assertEqual(round_sigfigs(0.125, 2), 0.13)
+        self.assertEqual(round_sigfigs(1e-20, 3), 1e-20)
+        self.assertEqual(round_sigfigs(0.0, 3), 0.0)
+
+    def test_ints(self):
+        self.assertEqual(round_sigfigs(12345, 2), 12000)
+        self.assertIsInstance(round_sigfigs(12345, 2), int)
+        self.assertIsInstance(round_sigfigs(12345.0, 2), float)
+
+    def test_numpy_scalars(self):
+        self.assertEqual(round_sigfigs(np.float64(0.19787), 3), 0.198)
+        self.assertIsInstance(round_sigfigs(np.float64(0.19787), 3), float)
+        self.assertEqual(round_sigfigs(np.float32(4590.918), 3), 4590.0)
+        self.assertEqual(round_sigfigs(np.float32(0.5), 3), 0.5)
+        self.assertEqual(round_sigfigs(np.int64(12345), 2), 12000)
+        self.assertIsInstance(round_sigfigs(np.int64(12345), 2), int)
+
+    @unittest.skipIf(sigfig is None, 'sigfig is not installed')
+    def test_matches_sigfig(self):
+        rng = random.Random(0)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for _ in range(2000):
+                value = 10 ** rng.uniform(-6, 6) * rng.choice([1, -1])
+                for sigfigs in (1, 3, 5):
+                    self.assertEqual(repr(round_sigfigs(value, sigfigs)), 
+                                     repr(sigfig.round(value, sigfigs=sigfigs)))
@@ -0,0 +1,97 @@
+import importlib.util
+import multiprocessing
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+
+def count_paints():
+    ''' Shows a Snapshot three times in an ApplicationWindow, the second time
+        unchanged and the third time with a changed flowrate, and returns the
+        number of times the viewport was painted after each. Imports PyQt5,
+        so it is run in a fresh process to keep the other tests headless.'''
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtCore import QEvent, QObject
+    from PyQt5.QtWidgets import QApplication
+    from src.gui import ApplicationWindow
+    from src.models import Source, Sink
+    from src.simulation_thread import Snapshot
+    from src.views import attach_view
+
+    class PaintCounter(QObject):
+        def __init__(self):
+            super().__init__()
+            self.paints = 0
+
+        def eventFilter(self, source, event):
+            if event.type() == QEvent.Paint:
+                self.paints += 1
+            return False
+
+    application = QApplication([])
+    window = ApplicationWindow()
+    simulation = window.simulation
+    source = Source(simulation, 'Source', 1000, event_rate=10)
+    sink = Sink(simulation, 'Sink')
+    stream = simulation.connect(source.outlet_sockets[0], sink.inlet_sockets[0])
+    readout = simulation.add_readout(stream)
+    attach_view(readout)
+    window.scene.addItem(readout.view.graphics_item)
+    simulation.run()
+    counter = PaintCounter()
+    window.ui.graphicsView.viewport().installEventFilter(counter)
+
+    snapshot = Snapshot(simulation)
+    paints = []
+    for _ in range(2):
+        counter.paints = 0
+        window.show_snapshot(snapshot)
+        application.processEvents()
+        paints.append(counter.paints)
+    water = simulation.species('water')
+    snapshot.flowrates[stream][water] *= 2
+    counter.paints = 0
+    window.show_snapshot(snapshot)
+    application.processEvents()
+    paints.append(counter.paints)
+    return paints
+
+
+def edit_unset_fractions():
+    ''' Accepts a SourceDialog for a Source without volumetric_fractions,
+        with its fractions changed, and returns the Source's fractions once
+        the queued edits are applied.'''
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    from src.dialogs import SourceDialog
+    from src.models import Source
+    from src.simulation import Simulation
+
+    application = QApplication([])
+    simulation = Simulation()
+    source = Source(simulation)
+    dialog = SourceDialog(source)
+    dialog.fields_table.cellWidget(2, 1).setText('0.75')
+    dialog.fields_table.cellWidget(3, 1).setText('0.25')
+    accepted = dialog.ok()
+    simulation.apply_edits()
+    return accepted, {species.name: fraction
+                      for species, fraction in source.volumetric_fractions.items()}
+
+
+@unittest.skipIf(importlib.util.find_spec('PyQt5') is None, 'PyQt5 is not installed')
+class TestGui(unittest.TestCase):
+    def test_unchanged_snapshot_not_painted(self):
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            first, unchanged, changed = executor.submit(count_paints).result()
+        self.assertGreater(first, 0)
+        self.assertEqual(unchanged, 0)
+        self.assertGreater(changed, 0)
+
+    def test_edit_unset_fractions(self):
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            accepted, fractions = executor.submit(edit_unset_fractions).result()
+        self.assertTrue(accepted)
+        self.assertDictEqual(fractions, {'water': 0.75, 'fiber': 0.25})
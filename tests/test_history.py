@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.simulation import Simulation
+from src.models import Source, Sink
+from src.flowsheets import single_stage
+from src.history import FlowrateHistory
+
+
+class TestFlowrateHistory(unittest.TestCase):
+    def setUp(self):
+        self.simulation = Simulation()
+        self.streams = single_stage(self.simulation, event_rate=10)
+        self.history = FlowrateHistory(capacity=5)
+        self.simulation.observers.append(self.history)
+        self.water = self.simulation.species('water')
+
+    def test_ring(self):
+        feed = self.streams['stage1_feed']
+        recorded = []
+        for _ in range(12):
+            self.simulation.run()
+            recorded.append(feed.flowrates[self.water])
+            self.assertEqual(len(self.history), min(len(recorded), 5))
+            self.assertListEqual(self.history.series(feed, self.water).tolist(), recorded[-5:])
+
+        self.assertListEqual(self.history.iterations.tolist(), list(range(8, 13)))
+        self.assertEqual(self.history.flowrates.shape, (5, 2, 5))
+        self.assertEqual(self.history.stream_flowrates(feed).shape, (2, 5))
+        # The buffer never grows.
+        self.assertEqual(self.history.data.shape[-1], 10)
+
+    def test_views(self):
+        self.simulation.run_iterations(7)
+        view = self.history.flowrates
+        self.assertIs(view.base, self.history.data)
+        self.assertTrue(view[0, 0].flags.c_contiguous)
+        with self.assertRaises(ValueError):
+            view[0, 0, 0] = 1
+
+    def test_topology_change(self):
+        self.simulation.run_iterations(3)
+        source = Source(self.simulation, 'Source2', 100)
+        sink = Sink(self.simulation, 'Sink2')
+        self.simulation.connect(source.outlet_sockets[0], sink.inlet_sockets[0])
+        self.simulation.run()
+        self.assertEqual(len(self.history), 1)
+        self.assertEqual(self.history.flowrates.shape, (6, 2, 1))
+
+    def test_save(self):
+        self.simulation.run_iterations(7)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'history.npz')
+            self.history.save(path)
+            with np.load(path) as saved:
+                np.testing.assert_array_equal(saved['flowrates'], self.history.flowrates)
+                self.assertListEqual(saved['iterations'].tolist(), [3, 4, 5, 6, 7])
+                self.assertEqual(saved['streams'][0], 'Feed')
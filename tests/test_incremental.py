@@ -0,0 +1,73 @@
+import unittest
+
+from src.simulation import Simulation
+from src.array_event_queue import ArrayEventQueue
+from src.flowsheets import single_stage, cascade
+from src.incremental import SubgraphFreezer
+
+
+def water_flowrates(simulation, streams):
+    water = simulation.species('water')
+    return {name: stream.flowrates[water] for name, stream in streams.items()}
+
+
+class TestSubgraphFreezer(unittest.TestCase):
+    def setUp(self):
+        self.simulation = Simulation(freezer=SubgraphFreezer(window=5))
+        self.streams = single_stage(self.simulation, event_rate=10)
+        self.frozen = self.simulation.freezer.frozen
+
+    def frozen_names(self):
+        return {module.name for module in self.frozen}
+
+    def test_freeze(self):
+        self.simulation.run_iterations(20)
+        self.assertSetEqual(self.frozen, set(self.simulation.modules))
+        flowrates = water_flowrates(self.simulation, self.streams)
+        self.simulation.run_iterations(5)
+        self.assertDictEqual(water_flowrates(self.simulation, self.streams), flowrates)
+
+    def test_thaw_downstream_of_edit(self):
+        self.simulation.run_iterations(20)
+        self.simulation.module('Stage1').rrv = 0.2
+        self.simulation.run()
+        self.assertSetEqual(self.frozen_names(), {'Source', 'Tank1', 'Pump1'})
+        self.simulation.run_iterations(20)
+        self.assertSetEqual(self.frozen, set(self.simulation.modules))
+
+        reference = Simulation()
+        reference_streams = single_stage(reference, event_rate=10)
+        reference.module('Stage1').rrv = 0.2
+        reference.run_iterations(5)
+        for name, flowrate in water_flowrates(reference, reference_streams).items():
+            self.assertAlmostEqual(water_flowrates(self.simulation, self.streams)[name], flowrate)
+
+    def test_thaw_pull_supplier(self):
+        self.simulation.run_iterations(20)
+        self.simulation.module('Pump1').set_capacity(4000)
+        self.simulation.run()
+        self.assertSetEqual(self.frozen_names(), {'Source'})
+        self.simulation.run_iterations(5)
+        self.assertAlmostEqual(sum(self.streams['stage1_feed'].flowrates.values()), 4000)
+
+    def test_topology_change(self):
+        self.simulation.run_iterations(20)
+        self.simulation.topology_changed()
+        self.assertFalse(self.frozen)
+
+    def test_cascade_recycle(self):
+        simulation = Simulation(queue_class=ArrayEventQueue,
+                                freezer=SubgraphFreezer(rel_tol=1e-3, window=5))
+        cascade(simulation, event_rate=1000)
+        frozen = simulation.freezer.frozen
+        simulation.run_iterations(40)
+        self.assertSetEqual(frozen, set(simulation.modules))
+
+        # Stage2's accepts are recycled to Stage1, so the whole loop thaws.
+        simulation.module('Stage2').rrv = 0.1
+        simulation.run()
+        self.assertIn(simulation.module('Source'), frozen)
+        for name in ('Stage1', 'Stage2', 'Stage3', 'Pump1', 'Tank1', 'Joiner1'):
+            self.assertNotIn(simulation.module(name), frozen)
+        simulation.run_iterations(60)
+        self.assertSetEqual(frozen, set(simulation.modules))
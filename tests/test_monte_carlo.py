@@ -0,0 +1,76 @@
+import math
+import random
+import statistics
+import unittest
+
+import numpy as np
+
+from src.flowsheets import single_stage
+from src.monte_carlo import (Normal, Uniform, Triangular, Fractions, RunningStatistics,
+                             monte_carlo)
+
+
+distributions = {
+    'Source.volumetric_fractions': Fractions('fiber', Normal(0.01, 0.001, low=0)),
+    'Source.capacity': Triangular(900, 1000, 1100),
+    'Hydrocyclone.rrv': Uniform(0.06, 0.1),
+    'Hydrocyclone.rrw': Normal(0.14, 0.01)
+}
+
+
+class TestRunningStatistics(unittest.TestCase):
+    def test_merge(self):
+        values = [random.Random(0).gauss(5, 2) for _ in range(100)]
+        whole = RunningStatistics(bins=[0, 5, 10])
+        first, second = RunningStatistics(bins=[0, 5, 10]), RunningStatistics(bins=[0, 5, 10])
+        for i, value in enumerate(values):
+            whole.add(value)
+            (first if i < 30 else second).add(value)
+        first.merge(second)
+
+        for running in (whole, first):
+            self.assertEqual(running.count, 100)
+            self.assertAlmostEqual(running.mean, statistics.mean(values))
+            self.assertAlmostEqual(running.std, statistics.stdev(values))
+            self.assertEqual(running.minimum, min(values))
+            self.assertEqual(running.maximum, max(values))
+        self.assertListEqual(first.histogram.tolist(), whole.histogram.tolist())
+        self.assertEqual(whole.histogram.sum(), sum(0 <= value <= 10 for value in values))
+
+    def test_empty(self):
+        running = RunningStatistics()
+        running.merge(RunningStatistics())
+        self.assertEqual(running.count, 0)
+        self.assertTrue(math.isnan(running.variance))
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def test_incremental(self):
+        results = monte_carlo(single_stage, distributions, 12, seed=1, chunk_size=5,
+                              workers=1, method='solver')
+        self.assertListEqual([result.samples for result in results], [5, 10, 12])
+
+    def test_statistics(self):
+        *_, result = monte_carlo(single_stage, distributions, 40, seed=2, workers=1,
+                                 method='solver',
+                                 bins={'accepts.consistency': np.linspace(0, 2, 21)})
+        self.assertEqual(result.unsteady, 0)
+        feed_flow = result.statistics['feed.flow']
+        self.assertEqual(feed_flow.count, 40)
+        self.assertTrue(900 <= feed_flow.minimum < feed_flow.mean < feed_flow.maximum <= 1100)
+        self.assertGreater(feed_flow.std, 0)
+        consistency = result.statistics['feed.consistency']
+        self.assertAlmostEqual(consistency.mean, 1, delta=0.1)
+        self.assertEqual(result.statistics['accepts.consistency'].histogram.sum(), 40)
+        self.assertEqual(result.summary()['accepts.tonnage']['count'], 40)
+
+    def test_reproducible_across_workers(self):
+        *_, inline = monte_carlo(single_stage, distributions, 12, seed=3, chunk_size=4,
+                                 workers=1, method='solver')
+        *_, pooled = monte_carlo(single_stage, distributions, 12, seed=3, chunk_size=4,
+                                 workers=2, method='solver')
+        self.assertEqual(pooled.samples, 12)
+        for name, running in inline.statistics.items():
+            self.assertAlmostEqual(pooled.statistics[name].mean, running.mean)
+            self.assertEqual(pooled.statistics[name].minimum, running.minimum)
+            self.assertEqual(pooled.statistics[name].maximum, running.maximum)
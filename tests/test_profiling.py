@@ -0,0 +1,87 @@
+import unittest
+
+from src.simulation import Simulation
+from src.models import Source, Sink
+from src.flowsheets import single_stage
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.simulation = Simulation()
+        self.streams = single_stage(self.simulation, event_rate=10)
+        self.simulation.add_readout(self.streams['stage1_feed'])
+        self.profiler = self.simulation.profiler
+
+    def test_disabled(self):
+        self.simulation.run_iterations(5)
+        self.assertListEqual(self.profiler.table(), [])
+        for module in self.simulation.modules:
+            self.assertNotIn('process', vars(module))
+
+    def test_stats(self):
+        self.profiler.enable()
+        self.simulation.run_iterations(5)
+        rows = self.profiler.table()
+        kinds = {row['kind'] for row in rows}
+        self.assertSetEqual(kinds, {'module', 'socket', 'display'})
+        for module in self.simulation.modules:
+            for phase in ('preprocess', 'process', 'postprocess'):
+                [row] = [row for row in self.profiler.table('module')
+                         if row['name'] == module.name and row['phase'] == phase]
+                self.assertEqual(row['calls'], 5)
+                self.assertGreater(row['total'], 0)
+        self.assertEqual(self.profiler.iterations, 5)
+        self.assertListEqual([row['total'] for row in rows],
+                             sorted((row['total'] for row in rows), reverse=True))
+
+        # The Events a Module's postprocess moves out of its queue are those
+        # its outlet Sockets transfer.
+        rows = {(row['name'], row['phase']): row['events'] for row in self.profiler.table()}
+        moved = 0
+        for module in self.simulation.modules:
+            transferred = sum(rows[(f'{module.name}.{socket.name}', 'transfer_events')]
+                              for socket in module.outlet_sockets)
+            self.assertEqual(rows[(module.name, 'postprocess')], transferred)
+            moved += transferred
+        self.assertGreater(moved, 0)
+
+        # Sources and Tanks generate their Events into their outlet Sockets.
+        for name in ('Source', 'Tank1'):
+            self.assertEqual(rows[(name, 'process')], 5 * 10)
+
+        self.assertIn('preprocess', self.profiler.report())
+
+    def test_disable_and_reset(self):
+        self.profiler.enable()
+        self.simulation.run_iterations(3)
+        self.profiler.disable()
+        calls = {(row['name'], row['phase']): row['calls'] for row in self.profiler.table()}
+        self.simulation.run_iterations(3)
+        self.assertDictEqual(calls, {(row['name'], row['phase']): row['calls']
+                                     for row in self.profiler.table()})
+        for module in self.simulation.modules:
+            self.assertNotIn('process', vars(module))
+        self.assertNotIn(self.profiler, self.simulation.observers)
+
+        self.profiler.reset()
+        self.assertListEqual(self.profiler.table(), [])
+
+    def test_added_modules(self):
+        self.profiler.enable()
+        self.simulation.run()
+        source = Source(self.simulation, name='Extra source')
+        sink = Sink(self.simulation, name='Extra sink')
+        self.simulation.connect(source.outlet_sockets[0], sink.inlet_sockets[0])
+        self.simulation.run_iterations(3)
+        names = {row['name'] for row in self.profiler.table('module')}
+        self.assertIn('Extra source', names)
+        self.assertIn('Extra sink', names)
+
+    def test_results_unchanged(self):
+        other = Simulation()
+        other_streams = single_stage(other, event_rate=10)
+        self.profiler.enable()
+        self.simulation.run_iterations(10)
+        other.run_iterations(10)
+        for name, stream in self.streams.items():
+            self.assertDictEqual(stream.flowrates, other_streams[name].flowrates)
@@ -0,0 +1,137 @@
+import sys
+import random
+import unittest
+
+from src.simulation import Simulation
+from src.models import Source, Sink, Splitter, FiberReadout
+from src.flowsheets import cascade
+
+
+class TestHeadlessSimulation(unittest.TestCase):
+    def setUp(self):
+        self.simulation = Simulation()
+        self.source = Source(self.simulation, 'Source', 1000, event_rate=100)
+        self.splitter = Splitter(self.simulation, split_fraction=.25)
+        self.sink1 = Sink(self.simulation, 'Sink1')
+        self.sink2 = Sink(self.simulation, 'Sink2')
+        self.feed = self.simulation.connect(self.source.outlet_sockets[0], 
+                                            self.splitter.inlet_sockets[0])
+        self.outlet1 = self.simulation.connect(self.splitter.outlet_sockets[0], 
+                                               self.sink1.inlet_sockets[0])
+        self.outlet2 = self.simulation.connect(self.splitter.outlet_sockets[1], 
+                                               self.sink2.inlet_sockets[0])
+
+    def test_init(self):
+        self.assertTrue(self.simulation.headless)
+        self.assertListEqual(self.simulation.modules, 
+                             [self.source, self.splitter, self.sink1, self.sink2])
+        self.assertListEqual(self.simulation.streams, [self.feed, self.outlet1, self.outlet2])
+        self.assertIsNone(self.source.view)
+        self.assertNotIn('PyQt5', sys.modules)
+
+    def test_connect(self):
+        self.assertIs(self.feed.inlet_socket, self.source.outlet_sockets[0])
+        self.assertIs(self.feed.outlet_socket, self.splitter.inlet_sockets[0])
+        self.assertIs(self.source.outlet_sockets[0].mate, self.splitter.inlet_sockets[0])
+
+    def test_connect_invalid(self):
+        with self.assertRaises(ValueError):
+            self.simulation.connect(self.sink1.inlet_sockets[0], self.sink2.inlet_sockets[0])
+        self.assertEqual(len(self.simulation.streams), 3)
+
+    def test_run(self):
+        readout = self.simulation.add_readout(self.outlet1, FiberReadout)
+        self.simulation.run_iterations(3)
+        self.assertEqual(self.simulation.iteration, 4)
+        self.assertAlmostEqual(sum(self.feed.flowrates.values()), 1000)
+        self.assertAlmostEqual(sum(self.outlet1.flowrates.values()), 250)
+        self.assertAlmostEqual(sum(self.outlet2.flowrates.values()), 750)
+        self.assertTrue(readout.text.startswith('250.0'))
+
+    def test_live_events(self):
+        self.assertEqual(self.simulation.live_events(), 0)
+        self.simulation.run()
+        self.assertEqual(self.simulation.live_events(), 0)
+        self.source.process()
+        self.assertEqual(self.simulation.live_events(), 100)
+
+    def test_source_generation(self):
+        self.source.process()
+        queue = self.source.outlet_sockets[0].queue
+        self.assertEqual(queue.length(), 100)
+        self.assertAlmostEqual(queue.magnitude, 1000)
+        self.assertEqual(queue.peek().aggregate_magnitude(), 10)
+
+    def test_schedule(self):
+        self.simulation.modules.reverse()
+        self.simulation.topology_changed()
+        schedule = self.simulation.schedule
+        self.assertListEqual(schedule[:2], [self.source, self.splitter])
+        self.assertIs(self.simulation.schedule, schedule)
+
+        # Flow reaches the Sinks in the first iteration regardless of the 
+        # order the Modules were added in.
+        self.simulation.run()
+        self.assertAlmostEqual(sum(self.outlet2.flowrates.values()), 750)
+
+        sink3 = Sink(self.simulation, 'Sink3')
+        self.assertIsNot(self.simulation.schedule, schedule)
+        self.assertIn(sink3, self.simulation.schedule)
+        schedule = self.simulation.schedule
+        self.outlet2.remove_socket(self.sink2.inlet_sockets[0])
+        self.assertIsNot(self.simulation.schedule, schedule)
+
+
+class TestScheduling(unittest.TestCase):
+    def run_cascade(self, seed):
+        simulation = Simulation()
+        streams = cascade(simulation, event_rate=10)
+        random.Random(seed).shuffle(simulation.modules)
+        simulation.topology_changed()
+        simulation.run_iterations(10)
+        return {name: stream.flowrates for name, stream in streams.items()}
+
+    def test_order_independent(self):
+        flowrates = self.run_cascade(0)
+        for seed in range(1, 5):
+            self.assertDictEqual(self.run_cascade(seed), flowrates)
+
+
+class TextItem:
+    def __init__(self):
+        self.texts = []
+
+    def setPlainText(self, text):
+        self.texts.append(text)
+
+
+class ReadoutViewStub:
+    def __init__(self):
+        self.text_item = TextItem()
+        self.shown_text = None
+
+
+class TestReadoutUpdates(unittest.TestCase):
+    def setUp(self):
+        self.simulation = Simulation()
+        source = Source(self.simulation, 'Source', 1000, event_rate=10)
+        sink = Sink(self.simulation, 'Sink')
+        self.stream = self.simulation.connect(source.outlet_sockets[0], sink.inlet_sockets[0])
+        self.readout = self.simulation.add_readout(self.stream)
+        self.readout.view = ReadoutViewStub()
+
+    def test_unchanged_text_not_set(self):
+        self.assertEqual(self.simulation.update_displays(), 1)
+        self.assertEqual(self.simulation.update_displays(), 0)
+        self.simulation.run_iterations(3)
+        self.assertEqual(len(self.readout.view.text_item.texts), 2)
+        self.assertEqual(self.readout.view.text_item.texts[-1], self.readout.text)
+
+    def test_change_below_display_precision(self):
+        water = self.simulation.species('water')
+        flowrates = dict(self.stream.flowrates)
+        flowrates[water] = 1.0
+        self.assertTrue(self.readout.update(flowrates))
+        flowrates[water] = 1.0001
+        self.assertFalse(self.readout.update(flowrates))
+        self.assertEqual(len(self.readout.view.text_item.texts), 1)
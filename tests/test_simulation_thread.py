@@ -0,0 +1,84 @@
+import time
+import unittest
+
+from src.simulation import Simulation
+from src.simulation_thread import SimulationThread
+from src.flowsheets import single_stage
+
+
+class TestSimulationThread(unittest.TestCase):
+    def setUp(self):
+        self.simulation = Simulation()
+        self.streams = single_stage(self.simulation, event_rate=10)
+        self.snapshots = []
+
+    def on_snapshot(self, snapshot):
+        self.snapshots.append(snapshot)
+
+    def wait_for_ticks(self, count):
+        target = len(self.snapshots) + count
+        deadline = time.perf_counter() + 5
+        while len(self.snapshots) < target:
+            self.assertLess(time.perf_counter(), deadline)
+            time.sleep(0.001)
+
+    def test_snapshots(self):
+        thread = SimulationThread(self.simulation, 0, self.on_snapshot)
+        thread.start()
+        self.assertIs(self.simulation.thread, thread)
+        self.wait_for_ticks(5)
+        thread.stop()
+        self.assertFalse(thread.alive)
+        self.assertIsNone(self.simulation.thread)
+        self.assertFalse(self.simulation.running)
+
+        iterations = [snapshot.iteration for snapshot in self.snapshots]
+        self.assertListEqual(iterations, list(range(1, len(iterations) + 1)))
+        flowrates = self.snapshots[-1].flowrates[self.streams['stage1_feed']]
+        self.assertAlmostEqual(sum(flowrates.values()), 5000)
+        self.assertIsNot(flowrates, self.streams['stage1_feed'].flowrates)
+
+    def test_queued_edits(self):
+        thread = SimulationThread(self.simulation, 0, self.on_snapshot)
+        hydrocyclone = self.simulation.module('Stage1')
+        thread.start()
+        self.wait_for_ticks(3)
+        self.simulation.queue_edit(setattr, hydrocyclone, 'rrv', 0.2)
+        self.wait_for_ticks(5)
+        thread.stop()
+        self.assertEqual(hydrocyclone.rrv, 0.2)
+        self.assertAlmostEqual(sum(self.streams['rejects'].flowrates.values()), 1000)
+
+    def test_edits_applied_when_idle(self):
+        self.simulation.queue_edit(setattr, self.simulation.module('Stage1'), 'rrv', 0.2)
+        self.assertEqual(self.simulation.module('Stage1').rrv, 0.2)
+        self.assertFalse(self.simulation.edits)
+
+    def test_auto_stop(self):
+        self.simulation.monitor.auto_stop = True
+        self.simulation.monitor.window = 3
+        thread = SimulationThread(self.simulation, 0, self.on_snapshot)
+        thread.start()
+        thread._thread.join(timeout=5)
+        self.assertFalse(thread.alive)
+        self.assertTrue(self.snapshots[-1].steady)
+        self.assertFalse(self.snapshots[-1].running)
+
+    def test_max_speed(self):
+        thread = SimulationThread(self.simulation, 0.05, self.on_snapshot, max_speed=True, 
+                                  frame_budget=0.04)
+        thread.start()
+        self.wait_for_ticks(3)
+        thread.stop()
+        # Many iterations run in each frame, with one Snapshot per frame.
+        self.assertGreater(self.simulation.iteration - 1, 3 * len(self.snapshots))
+        self.assertGreater(self.snapshots[-1].iterations_per_second, 1 / 0.05)
+
+    def test_fast_forward(self):
+        thread = SimulationThread(self.simulation, 0.05, self.on_snapshot)
+        thread.fast_forward(500)
+        thread._thread.join(timeout=10)
+        self.assertFalse(thread.alive)
+        self.assertEqual(self.simulation.iteration, 501)
+        self.assertEqual(self.snapshots[-1].iteration, 500)
+        self.assertFalse(self.simulation.running)
@@ -0,0 +1,42 @@
+import math
+import unittest
+
+from src.species import Species, SpeciesRegistry
+
+
+class TestSpeciesRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = SpeciesRegistry()
+        self.water = Species('water', {'state': 'liquid', 'density': 997.5})
+        self.fiber = Species('fiber', {'state': 'solid', 'density': 1200})
+        self.dye = Species('dye')
+        for species in (self.water, self.fiber, self.dye):
+            self.registry.register(species)
+
+    def test_indices(self):
+        self.assertEqual([species.index for species in self.registry], [0, 1, 2])
+        self.registry.register(self.water)
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(self.registry.indices[self.fiber], 1)
+
+    def test_freeze(self):
+        self.registry.freeze()
+        self.assertEqual(list(self.registry.densities[:2]), [997.5, 1200])
+        self.assertTrue(math.isnan(self.registry.densities[2]))
+        self.assertEqual(self.registry.liquid_mask, (True, False, False))
+        self.assertEqual(self.registry.solid_indices, (1,))
+        with self.assertRaises(RuntimeError):
+            self.registry.register(Species('clay'))
+
+    def test_unfreeze(self):
+        self.registry.freeze()
+        self.registry.unfreeze()
+        clay = Species('clay', {'state': 'solid', 'density': 2600})
+        self.registry.register(clay)
+        self.registry.freeze()
+        self.assertEqual(clay.index, 3)
+        self.assertEqual(self.registry.solid_indices, (1, 3))
+        self.assertEqual(self.registry.densities[3], 2600)
+
+    def test_vector(self):
+        self.assertEqual(self.registry.vector({self.fiber: 2.5}), [0, 2.5, 0])
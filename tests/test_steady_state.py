@@ -0,0 +1,142 @@
+import unittest
+
+from src.simulation import Simulation
+from src.array_event_queue import ArrayEventQueue
+from src.flowsheets import single_stage, cascade
+from src.flowsheet_graph import strongly_connected_components, is_cyclic, execution_order
+from src.acceleration import Wegstein, Aitken
+
+
+def total(flows):
+    return sum(flows.values())
+
+
+class TestFlowsheetGraph(unittest.TestCase):
+    def test_single_stage_components(self):
+        simulation = Simulation()
+        single_stage(simulation)
+        components = strongly_connected_components(simulation.modules)
+        self.assertEqual(len(components), len(simulation.modules))
+        self.assertFalse(any(is_cyclic(component) for component in components))
+        order = [component[0].name for component in components]
+        self.assertLess(order.index('Tank1'), order.index('Pump1'))
+        self.assertLess(order.index('Pump1'), order.index('Stage1'))
+        self.assertLess(order.index('Stage1'), order.index('Accepts'))
+
+    def test_cascade_components(self):
+        simulation = Simulation()
+        cascade(simulation, stages=3)
+        cyclic = [component for component in strongly_connected_components(simulation.modules)
+                  if is_cyclic(component)]
+        self.assertEqual(len(cyclic), 1)
+        self.assertSetEqual({module.name for module in cyclic[0]}, 
+                            {'Joiner1', 'Pump1', 'Stage1', 'Joiner2', 'Pump2', 'Stage2', 
+                             'Pump3', 'Stage3'})
+
+    def test_execution_order(self):
+        simulation = Simulation()
+        cascade(simulation, stages=3)
+        order = [module.name for module in execution_order(simulation.modules)]
+        self.assertListEqual(order, ['Source', 'Joiner1', 'Tank1', 'Pump1', 'Stage1', 
+                                     'Joiner2', 'Tank2', 'Pump2', 'Stage2', 
+                                     'Tank3', 'Pump3', 'Stage3', 'Rejects', 'Accepts'])
+
+
+class TestSteadyStateSolver(unittest.TestCase):
+    def test_single_stage(self):
+        simulation = Simulation()
+        streams = single_stage(simulation)
+        solver = simulation.solve_steady_state()
+        water = simulation.species('water')
+        fiber = simulation.species('fiber')
+
+        self.assertEqual(solver.iterations, 0)
+        self.assertAlmostEqual(total(streams['stage1_feed'].flowrates), 5000)
+        self.assertAlmostEqual(total(streams['dilution1'].flowrates), 4000)
+        self.assertAlmostEqual(total(streams['rejects'].flowrates), 400)
+        self.assertAlmostEqual(streams['rejects'].flowrates[fiber], 
+                               .14 * streams['stage1_feed'].flowrates[fiber])
+        self.assertAlmostEqual(streams['accepts'].flowrates[water] 
+                               + streams['rejects'].flowrates[water], 
+                               streams['stage1_feed'].flowrates[water])
+
+    def test_cascade(self):
+        simulation = Simulation()
+        streams = cascade(simulation, stages=3)
+        solver = simulation.solve_steady_state()
+        self.assertEqual(len(solver.tear_streams), 2)
+        self.assertGreater(solver.iterations, 1)
+
+        # Overall mass balance: everything fed by the Source and the Tanks 
+        # leaves through the accepts and rejects.
+        for species in streams['feed'].flowrates:
+            inflow = streams['feed'].flowrates[species] + sum(
+                streams[f'dilution{stage}'].flowrates[species] for stage in range(1, 4))
+            outflow = streams['accepts'].flowrates[species] + streams['rejects'].flowrates[species]
+            self.assertAlmostEqual(inflow, outflow, places=6)
+
+    def test_matches_dynamic_simulation(self):
+        simulation = Simulation()
+        streams = single_stage(simulation, event_rate=10)
+        simulation.run_iterations(5)
+        dynamic = dict(streams['accepts'].flowrates)
+        simulation.solve_steady_state()
+        for species, flowrate in streams['accepts'].flowrates.items():
+            self.assertAlmostEqual(flowrate, dynamic[species])
+
+
+    def test_warm_start(self):
+        iterations = []
+        flowrates = []
+        for warm in (False, True):
+            simulation = Simulation(queue_class=ArrayEventQueue)
+            streams = cascade(simulation, stages=5)
+            if warm:
+                simulation.warm_start()
+            iterations.append(simulation.run_until_steady(500))
+            flowrates.append({name: total(stream.flowrates) for name, stream in streams.items()})
+
+        self.assertLess(iterations[1] * 3, iterations[0])
+        for name, flowrate in flowrates[0].items():
+            self.assertAlmostEqual(flowrates[1][name], flowrate, delta=1e-2 * flowrate + 1e-6)
+
+
+class TestAcceleration(unittest.TestCase):
+    def solve(self, accelerator):
+        simulation = Simulation()
+        streams = cascade(simulation, stages=3)
+        solver = simulation.solve_steady_state(accelerator=accelerator)
+        return streams, solver
+
+    def test_accelerators(self):
+        reference, plain = self.solve(None)
+        for accelerator in (Wegstein(), Aitken()):
+            streams, solver = self.solve(accelerator)
+            self.assertLess(solver.iterations * 2, plain.iterations)
+            for name, stream in streams.items():
+                for species, flowrate in stream.flowrates.items():
+                    self.assertAlmostEqual(flowrate, reference[name].flowrates[species], places=6)
+
+            for species in streams['feed'].flowrates:
+                inflow = streams['feed'].flowrates[species] + sum(
+                    streams[f'dilution{stage}'].flowrates[species] for stage in range(1, 4))
+                outflow = streams['accepts'].flowrates[species] + streams['rejects'].flowrates[species]
+                self.assertAlmostEqual(inflow, outflow, places=6)
+
+    def test_linear_map(self):
+        # g(x) = 0.9 * x + 1 has its fixed point at 10 and converges slowly 
+        # by substitution. Both accelerators solve it exactly when their 
+        # bounds allow it.
+        for accelerator in (Wegstein(q_min=-10), Aitken(max_factor=10)):
+            x = [0, 0]
+            for _ in range(3):
+                x = accelerator.accelerate(x, [0.9 * xi + 1 for xi in x])
+            for xi in x:
+                self.assertAlmostEqual(xi, 10)
+
+    def test_bounds(self):
+        wegstein = Wegstein(q_min=-2)
+        wegstein.accelerate([0], [1])
+        wegstein.accelerate([1], [1.99])
+        self.assertEqual(wegstein.q, -2)
+        self.assertEqual(wegstein.accelerate([2], [-1]), [0])
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from src.flowsheets import single_stage, cascade
+from src.sweep import expand_grid, run_case, sweep
+
+
+class TestSweep(unittest.TestCase):
+    def test_expand_grid(self):
+        self.assertListEqual(expand_grid({'rrv': [0.1, 0.2], 'rrw': [0.3, 0.4]}), [
+            {'rrv': 0.1, 'rrw': 0.3}, {'rrv': 0.1, 'rrw': 0.4},
+            {'rrv': 0.2, 'rrw': 0.3}, {'rrv': 0.2, 'rrw': 0.4}
+        ])
+
+    def test_module_settings(self):
+        # Module settings and builder arguments give the same results.
+        _, by_module, _, _ = run_case(single_stage, {'Stage1.rrv': 0.2, 'Pump1.capacity': 3000},
+                                      method='solver')
+        _, by_builder, _, _ = run_case(single_stage, {'rrv': 0.2, 'pump_capacity': 3000},
+                                       method='solver')
+        self.assertListEqual(by_module, by_builder)
+
+        with self.assertRaises(AttributeError):
+            run_case(single_stage, {'Stage1.missing': 1}, method='solver')
+
+    def test_sweep(self):
+        result = sweep(single_stage, {'rrv': [0.05, 0.1, 0.2]}, fixed={'event_rate': 100},
+                       workers=1)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result.flowrates.shape, (3, len(result.columns)))
+        self.assertTrue(result.steady.all())
+        feed = result.column('stage1_feed.water')
+        rejects = result.column('rejects.water')
+        for rrv, feed_water, rejects_water in zip([0.05, 0.1, 0.2], feed, rejects):
+            self.assertAlmostEqual(rejects_water / feed_water, rrv, delta=0.01)
+        self.assertEqual(result.rows()[1]['rrv'], 0.1)
+
+    def test_process_pool(self):
+        grid = {'rrv': [0.05, 0.1], 'stages': [2, 3]}
+        pooled = sweep(cascade, grid, workers=2, method='solver')
+        inline = sweep(cascade, grid, workers=1, method='solver')
+        self.assertListEqual(pooled.cases, inline.cases)
+        self.assertListEqual(pooled.columns, inline.columns)
+        np.testing.assert_array_equal(pooled.flowrates, inline.flowrates)
+        # The 2 stage cascades have no third stage.
+        self.assertTrue(np.isnan(pooled.column('stage3_feed.water')[::2]).all())
+        self.assertTrue(pooled.steady.all())
+
+    def test_unconverged_solver(self):
+        # Too few sweeps for the recycle loops of the 3 stage cascades, but
+        # enough for the single stage, which has none.
+        result = sweep(cascade, {'stages': [1, 3]}, workers=2, method='solver', max_iterations=2)
+        self.assertListEqual(result.steady.tolist(), [True, False])
+        self.assertListEqual(result.iterations.tolist(), [0, 2])